@@ -0,0 +1,76 @@
+"""
+Inference backend interface.
+
+ChatService talks to a backend rather than to an SDK client directly. A
+backend takes OpenAI-style chat completion arguments and returns OpenAI
+response objects (ChatCompletion, or an async iterator of
+ChatCompletionChunk with an async close() when streaming), so caching,
+coalescing, hedging and metrics work the same whichever engine answers.
+
+Implementations:
+    NIMClient (client.py): hosted NVIDIA NIM endpoint over HTTP
+    LocalBackend (local_backend.py): quantised model run in-process on the CPU
+"""
+
+from abc import ABC, abstractmethod
+from typing import Any, Dict
+
+
+class InferenceBackend(ABC):
+    """Base class of chat completion engines."""
+
+    name = "backend"
+
+    @abstractmethod
+    def create(self, **request) -> Any:
+        """
+        Create a chat completion, blocking until it is done.
+
+        Args:
+            **request: OpenAI chat completion arguments (messages, model, temperature, ...)
+
+        Returns:
+            The completion, or a stream of chunks when request['stream'] is true
+
+        Raises:
+            ChatServiceError: Typed by cause
+        """
+
+    @abstractmethod
+    async def acreate(self, **request) -> Any:
+        """
+        Create a chat completion without blocking the event loop.
+
+        Args:
+            **request: OpenAI chat completion arguments (messages, model, temperature, ...)
+
+        Returns:
+            The completion, or an async stream of chunks when request['stream'] is true
+
+        Raises:
+            ChatServiceError: Typed by cause
+        """
+
+    def serves(self, model: str) -> bool:
+        """
+        Check whether this backend can run a model.
+
+        Args:
+            model: Model name from a request
+
+        Returns:
+            bool: True if requests for the model should be sent here
+        """
+        return True
+
+    async def acheck_upstream(self) -> Dict[str, Any]:
+        """
+        Check that the backend can take requests.
+
+        Returns:
+            Dict[str, Any]: 'ready' flag, backend state and the error if the check failed
+        """
+        return {"ready": True, "upstream": self.name}
+
+    async def aclose(self):
+        """Release connections, threads or models held by the backend."""
@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+"""
+Offline load test for the chatbot HTTP server.
+
+Starts fake_nim.py as the upstream, starts the chatbot server pointed at it
+through NVIDIA_BASE_URL, then drives /generate (or /generate/stream) at each
+concurrency level and writes throughput, latency percentiles and server
+memory as JSON, so changes to serving mode, caching or pooling can be
+compared run against run:
+
+    python benchmark.py --concurrency 1 8 32 128 --requests 500 --output bench.json
+    python benchmark.py --server gunicorn --workers 4 --prompt-pool 20 --temperature 0
+    python benchmark.py --target http://127.0.0.1:8000 --stream
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+import httpx
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+PROMPT = "Benchmark prompt {n}: I have been feeling really stressed about my exams and cannot sleep."
+
+
+def free_port() -> int:
+    """An unused local TCP port."""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_until_up(url: str, process: Optional[subprocess.Popen], timeout: float = 30.0):
+    """
+    Poll a URL until it answers.
+
+    Args:
+        url: URL to GET
+        process: Process serving it, checked for an early exit
+        timeout: Seconds to wait
+
+    Raises:
+        RuntimeError: The process exited or the URL never answered
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f"{' '.join(process.args)} exited with {process.returncode}")
+        try:
+            httpx.get(url, timeout=1.0)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    raise RuntimeError(f"{url} did not come up within {timeout}s")
+
+
+def process_tree_rss(pid: int) -> Optional[float]:
+    """
+    Resident memory of a process and all its descendants, in MB (Linux only).
+
+    Args:
+        pid: Root process id
+
+    Returns:
+        Optional[float]: Total RSS, or None where /proc is unavailable
+    """
+    if not os.path.isdir("/proc"):
+        return None
+    children: Dict[int, List[int]] = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # The command name may contain spaces; fields resume after its ')'
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+
+    total_kb = 0
+    stack = [pid]
+    while stack:
+        current = stack.pop()
+        stack.extend(children.get(current, []))
+        try:
+            with open(f"/proc/{current}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total_kb += int(line.split()[1])
+                        break
+        except OSError:
+            continue
+    return round(total_kb / 1024, 1)
+
+
+def summarize(values: List[float]) -> Optional[Dict[str, float]]:
+    """
+    Percentiles of a list of seconds, in milliseconds.
+
+    Args:
+        values: Observed durations in seconds
+
+    Returns:
+        Optional[Dict[str, float]]: p50/p95/p99/mean/max, or None when empty
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+
+    def pct(p: float) -> float:
+        return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+    return {
+        "p50": round(pct(50) * 1000, 2),
+        "p95": round(pct(95) * 1000, 2),
+        "p99": round(pct(99) * 1000, 2),
+        "mean": round(sum(ordered) / len(ordered) * 1000, 2),
+        "max": round(ordered[-1] * 1000, 2),
+    }
+
+
+async def send(client: httpx.AsyncClient, url: str, body: Dict[str, Any], stream: bool) -> Dict[str, Any]:
+    """
+    Issue one request and time it.
+
+    Args:
+        client: Shared HTTP client
+        url: Base URL of the chatbot server
+        body: /generate request body
+        stream: Use /generate/stream and time the first content event
+
+    Returns:
+        Dict[str, Any]: 'status', 'latency' and, for streams, 'ttft' (seconds)
+    """
+    start = time.perf_counter()
+    result: Dict[str, Any] = {"status": None, "latency": None, "ttft": None}
+    try:
+        if stream:
+            async with client.stream("POST", f"{url}/generate/stream", json=body) as response:
+                result["status"] = response.status_code
+                async for line in response.aiter_lines():
+                    if line.startswith("event: error"):
+                        result["status"] = "stream_error"
+                    elif result["ttft"] is None and line.startswith("data:") and '"content"' in line:
+                        result["ttft"] = time.perf_counter() - start
+        else:
+            response = await client.post(f"{url}/generate", json=body)
+            result["status"] = response.status_code
+    except httpx.HTTPError as e:
+        result["status"] = type(e).__name__
+    result["latency"] = time.perf_counter() - start
+    return result
+
+
+async def run_level(
+    url: str,
+    concurrency: int,
+    total: int,
+    bodies: "itertools.count",
+    make_body,
+    stream: bool,
+    server_pid: Optional[int]
+) -> Dict[str, Any]:
+    """
+    Drive the server with a fixed number of concurrent clients.
+
+    Args:
+        url: Base URL of the chatbot server
+        concurrency: Requests kept in flight
+        total: Requests to send at this level
+        bodies: Counter numbering the prompts
+        make_body: Builds a request body from a prompt number
+        stream: Whether to use the streaming endpoint
+        server_pid: Server process to sample memory from, if started here
+
+    Returns:
+        Dict[str, Any]: Results of the level
+    """
+    results: List[Dict[str, Any]] = []
+    remaining = iter(range(total))
+    peak_rss = None
+    done = asyncio.Event()
+
+    async def worker(client: httpx.AsyncClient):
+        for _ in remaining:
+            results.append(await send(client, url, make_body(next(bodies)), stream))
+
+    async def sample_memory():
+        nonlocal peak_rss
+        while not done.is_set():
+            rss = process_tree_rss(server_pid)
+            if rss is not None:
+                peak_rss = max(peak_rss or 0.0, rss)
+            try:
+                await asyncio.wait_for(done.wait(), 0.25)
+            except asyncio.TimeoutError:
+                pass
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=120.0) as client:
+        sampler = asyncio.ensure_future(sample_memory()) if server_pid else None
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        if sampler is not None:
+            await sampler
+
+    ok = [r for r in results if r["status"] == 200]
+    statuses: Dict[str, int] = {}
+    for r in results:
+        statuses[str(r["status"])] = statuses.get(str(r["status"]), 0) + 1
+
+    level = {
+        "concurrency": concurrency,
+        "requests": len(results),
+        "ok": len(ok),
+        "errors": len(results) - len(ok),
+        "status_counts": statuses,
+        "seconds": round(elapsed, 3),
+        "rps": round(len(ok) / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": summarize([r["latency"] for r in ok]),
+        "server_peak_rss_mb": peak_rss,
+    }
+    if stream:
+        level["ttft_ms"] = summarize([r["ttft"] for r in ok if r["ttft"] is not None])
+    return level
+
+
+def start_upstream(args: argparse.Namespace) -> (subprocess.Popen, str):
+    """Start fake_nim.py with the requested behaviour; returns the process and its base URL."""
+    port = free_port()
+    process = subprocess.Popen([
+        sys.executable, os.path.join(HERE, "fake_nim.py"),
+        "--port", str(port),
+        "--latency", str(args.upstream_latency),
+        "--token-rate", str(args.upstream_token_rate),
+        "--tokens", str(args.upstream_tokens),
+        "--error-rate", str(args.upstream_error_rate),
+    ])
+    base_url = f"http://127.0.0.1:{port}/v1"
+    wait_until_up(f"{base_url}/models", process)
+    return process, base_url
+
+
+def start_server(args: argparse.Namespace, upstream_url: str, workdir: str) -> (subprocess.Popen, str):
+    """Start the chatbot server against the fake upstream; returns the process and its URL."""
+    port = free_port()
+    env = dict(
+        os.environ,
+        NVIDIA_BASE_URL=upstream_url,
+        NVIDIA_API_KEY="benchmark",
+        CHATBOT_CACHE_PATH=os.path.join(workdir, "completion_cache.db"),
+        CHATBOT_LOG_LEVEL=args.log_level,
+        PROMETHEUS_MULTIPROC_DIR=os.path.join(workdir, "metrics"),
+    )
+    if not args.retrieval:
+        env["CHATBOT_RETRIEVAL_DIR"] = os.path.join(workdir, "no-retrieval-index")
+
+    if args.server == "gunicorn":
+        env.update(CHATBOT_BIND=f"127.0.0.1:{port}", CHATBOT_WORKERS=str(args.workers))
+        command = [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "http_server:app"]
+    else:
+        env.pop("PROMETHEUS_MULTIPROC_DIR")
+        command = [sys.executable, "http_server.py", str(port)]
+
+    process = subprocess.Popen(command, cwd=HERE, env=env, stdout=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}"
+    wait_until_up(f"{url}/health", process)
+    return process, url
+
+
+def stop(process: Optional[subprocess.Popen]):
+    """Terminate a child process and wait for it."""
+    if process is None or process.poll() is not None:
+        return
+    process.terminate()
+    try:
+        process.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Load test the chatbot server against a fake NIM upstream")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 128], help="concurrency levels to run")
+    parser.add_argument("--requests", type=int, default=400, help="requests per concurrency level")
+    parser.add_argument("--warmup", type=int, default=20, help="requests sent before measuring")
+    parser.add_argument("--stream", action="store_true", help="use /generate/stream and report time to first token")
+    parser.add_argument("--prompt-pool", type=int, default=0, help="cycle through this many prompts (0: every prompt unique)")
+    parser.add_argument("--temperature", type=float, default=0.5, help="temperature sent with each request")
+    parser.add_argument("--max-tokens", type=int, default=100)
+    parser.add_argument("--retrieval", action="store_true", help="keep retrieval on (uses the configured index)")
+    parser.add_argument("--server", choices=("uvicorn", "gunicorn"), default="uvicorn", help="how to serve the chatbot")
+    parser.add_argument("--workers", type=int, default=2, help="gunicorn workers")
+    parser.add_argument("--target", help="benchmark an already running server instead of starting one")
+    parser.add_argument("--log-level", default="WARNING", help="CHATBOT_LOG_LEVEL of the started server")
+    parser.add_argument("--upstream-latency", type=float, default=0.3, help="fake upstream seconds to first token")
+    parser.add_argument("--upstream-token-rate", type=float, default=0.0, help="fake upstream tokens/s, 0 for instant")
+    parser.add_argument("--upstream-tokens", type=int, default=32, help="fake upstream completion length")
+    parser.add_argument("--upstream-error-rate", type=float, default=0.0, help="fraction of fake upstream calls that fail")
+    parser.add_argument("--output", help="write the JSON report here as well as to stdout")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> Dict[str, Any]:
+    args = parse_args(argv)
+
+    def make_body(n: int) -> Dict[str, Any]:
+        prompt_number = n % args.prompt_pool if args.prompt_pool else n
+        return {
+            "prompt": PROMPT.format(n=prompt_number),
+            "temperature": args.temperature,
+            "max_tokens": args.max_tokens,
+            "retrieval": args.retrieval,
+        }
+
+    upstream = server = None
+    report: Dict[str, Any] = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "config": vars(args),
+        "host": {"cpus": os.cpu_count(), "python": platform.python_version(), "platform": platform.platform()},
+        "levels": [],
+    }
+
+    with tempfile.TemporaryDirectory(prefix="chatbot-bench-") as workdir:
+        try:
+            if args.target:
+                url = args.target.rstrip("/")
+            else:
+                upstream, upstream_url = start_upstream(args)
+                server, url = start_server(args, upstream_url, workdir)
+                report["server_idle_rss_mb"] = process_tree_rss(server.pid)
+
+            bodies = itertools.count()
+            server_pid = server.pid if server else None
+            if args.warmup:
+                asyncio.run(run_level(url, min(args.warmup, 8), args.warmup, bodies, make_body, args.stream, None))
+            for concurrency in args.concurrency:
+                level = asyncio.run(run_level(url, concurrency, args.requests, bodies, make_body, args.stream, server_pid))
+                report["levels"].append(level)
+                print(
+                    f"c={concurrency:<4} {level['rps']:>8} req/s  "
+                    f"p50={(level['latency_ms'] or {}).get('p50')}ms p99={(level['latency_ms'] or {}).get('p99')}ms  "
+                    f"errors={level['errors']}",
+                    file=sys.stderr
+                )
+        finally:
+            stop(server)
+            stop(upstream)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    print(output)
+    return report
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,236 @@
+"""
+Completion cache module with an in-memory LRU tier backed by SQLite.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from config import (
+    CACHE_DB_PATH, CACHE_TTL, CACHE_MEMORY_MAX_ENTRIES, CACHE_MAX_BYTES
+)
+
+
+class CompletionCache:
+    """
+    Two-tier cache for serialized completions.
+
+    Lookups hit a bounded in-memory LRU first and fall back to a SQLite table
+    that survives restarts. Entries expire after ``ttl`` seconds and the
+    persistent tier evicts least recently used rows once it exceeds
+    ``max_bytes``. The persistent tier is shared by every server worker, so
+    its size is kept in the database (updated by triggers in the same
+    transaction as each write) rather than counted per process.
+    """
+
+    def __init__(
+        self,
+        path: str = None,
+        ttl: float = None,
+        max_memory_entries: int = None,
+        max_bytes: int = None
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            path: SQLite file for the persistent tier, ':memory:' for none
+            ttl: Seconds an entry stays valid
+            max_memory_entries: Size of the in-memory LRU tier
+            max_bytes: Maximum payload bytes kept in the persistent tier
+        """
+        self.path = path or CACHE_DB_PATH
+        self.ttl = ttl if ttl is not None else CACHE_TTL
+        self.max_memory_entries = max_memory_entries or CACHE_MEMORY_MAX_ENTRIES
+        self.max_bytes = max_bytes or CACHE_MAX_BYTES
+        self._memory: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = self._connect()
+        self.hits = {"memory": 0, "disk": 0}
+        self.misses = 0
+        self.evictions = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Open the persistent tier and create its table if needed.
+
+        Returns:
+            sqlite3.Connection: Connection shared by all threads of this process
+        """
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS completion_cache (
+                key TEXT PRIMARY KEY,
+                payload TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_completion_cache_access ON completion_cache (last_access)"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS completion_cache_size (id INTEGER PRIMARY KEY CHECK (id = 0), bytes INTEGER NOT NULL)"
+        )
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS completion_cache_size_insert AFTER INSERT ON completion_cache
+            BEGIN UPDATE completion_cache_size SET bytes = bytes + NEW.size WHERE id = 0; END
+        """)
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS completion_cache_size_delete AFTER DELETE ON completion_cache
+            BEGIN UPDATE completion_cache_size SET bytes = bytes - OLD.size WHERE id = 0; END
+        """)
+        conn.execute("INSERT OR IGNORE INTO completion_cache_size (id, bytes) VALUES (0, 0)")
+        # Recount, in case rows were written before the triggers existed
+        self._sync_size(conn)
+        return conn
+
+    @staticmethod
+    def _sync_size(conn: sqlite3.Connection):
+        """Set the stored size of the persistent tier to the sum of its rows."""
+        conn.execute(
+            "UPDATE completion_cache_size SET bytes = (SELECT COALESCE(SUM(size), 0) FROM completion_cache) WHERE id = 0"
+        )
+
+    def _disk_bytes(self) -> int:
+        """Payload bytes in the persistent tier, across all processes sharing it."""
+        return self._conn.execute("SELECT bytes FROM completion_cache_size WHERE id = 0").fetchone()[0]
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached payload.
+
+        Args:
+            key: Canonical request key
+
+        Returns:
+            Optional[str]: The cached payload, or None on a miss or expiry
+        """
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires_at, payload = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    self.hits["memory"] += 1
+                    return payload
+                del self._memory[key]
+
+            row = self._conn.execute(
+                "SELECT payload, expires_at FROM completion_cache WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None or row[1] <= now:
+                if row is not None:
+                    self._delete(key)
+                self.misses += 1
+                return None
+
+            payload, expires_at = row
+            self._conn.execute(
+                "UPDATE completion_cache SET last_access = ? WHERE key = ?", (now, key)
+            )
+            self._remember(key, expires_at, payload)
+            self.hits["disk"] += 1
+            return payload
+
+    def set(self, key: str, payload: str):
+        """
+        Store a payload in both tiers.
+
+        Args:
+            key: Canonical request key
+            payload: Serialized completion
+        """
+        now = time.time()
+        expires_at = now + self.ttl
+        size = len(payload.encode("utf-8"))
+
+        with self._lock:
+            self._remember(key, expires_at, payload)
+            self._delete(key)
+            self._conn.execute(
+                "INSERT INTO completion_cache (key, payload, size, expires_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, payload, size, expires_at, now)
+            )
+            if self._disk_bytes() > self.max_bytes:
+                self._evict(now)
+
+    def _remember(self, key: str, expires_at: float, payload: str):
+        """Insert into the memory tier, dropping the least recently used entry when full."""
+        self._memory[key] = (expires_at, payload)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _delete(self, key: str):
+        """Remove a key from the persistent tier; the size triggers update the byte count."""
+        self._conn.execute("DELETE FROM completion_cache WHERE key = ?", (key,))
+
+    def _evict(self, now: float):
+        """Drop expired rows, then least recently used rows until under max_bytes."""
+        # IMMEDIATE takes the write lock first, so workers evicting at once do not both trim
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._sync_size(self._conn)
+            self.evictions += self._conn.execute(
+                "DELETE FROM completion_cache WHERE expires_at <= ?", (now,)
+            ).rowcount
+
+            total = self._disk_bytes()
+            rows = self._conn.execute(
+                "SELECT key, size FROM completion_cache ORDER BY last_access"
+            ).fetchall()
+            doomed = []
+            for key, size in rows:
+                if total <= self.max_bytes:
+                    break
+                doomed.append((key,))
+                total -= size
+                self._memory.pop(key, None)
+            self._conn.executemany("DELETE FROM completion_cache WHERE key = ?", doomed)
+            self.evictions += len(doomed)
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    def clear(self):
+        """Remove every entry from both tiers."""
+        with self._lock:
+            self._memory.clear()
+            self._conn.execute("DELETE FROM completion_cache")
+
+    def reopen(self):
+        """Replace the SQLite connection, e.g. in a worker forked after the cache was opened; recounts the tier size."""
+        with self._lock:
+            self._conn.close()
+            self._conn = self._connect()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get hit/miss counters and tier sizes.
+
+        Returns:
+            Dict[str, Any]: Cache statistics suitable for a health endpoint
+        """
+        hits = self.hits["memory"] + self.hits["disk"]
+        lookups = hits + self.misses
+        return {
+            "hits": dict(self.hits),
+            "misses": self.misses,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "memory_entries": len(self._memory),
+            "disk_bytes": self._disk_bytes(),
+        }
@@ -2,27 +2,375 @@
 Chat service module for handling NVIDIA NIM chat completions.
 """
 
-import sys
-from typing import List, Dict, Any, Optional
+import json
+import logging
+import time
+from types import SimpleNamespace
+from typing import List, Dict, Any, Optional, AsyncIterator, Tuple
+from openai.types.chat import ChatCompletion
+from backend import InferenceBackend
+from cache import CompletionCache
 from client import NIMClient
+from coalescer import RequestCoalescer
+from errors import ChatServiceError
+from local_backend import LocalBackend
+from metrics import (
+    CACHE_LOOKUPS, SEMANTIC_CACHE_LOOKUPS, TIME_TO_FIRST_TOKEN, UPSTREAM_LATENCY,
+    get_logger, log_event, record_usage, track_request
+)
+from resilience import translate_error
+from retrieval import RetrievalIndex, get_index, format_context
+from router import ModelRouter
+from semantic_cache import SemanticCache
+from suggestions import SuggestionParser
 from config import (
     DEFAULT_MODEL, DEFAULT_TEMPERATURE, DEFAULT_TOP_P, 
-    DEFAULT_MAX_TOKENS, DEFAULT_STREAM
+    DEFAULT_MAX_TOKENS, DEFAULT_STREAM, REQUEST_TIMEOUT,
+    CACHE_ENABLED, CACHE_MAX_TEMPERATURE, HISTORY_SUMMARY_MAX_TOKENS,
+    RETRIEVAL_ENABLED, RETRIEVAL_TOP_K, SLOW_REQUEST_SECONDS, STREAM_INCLUDE_USAGE,
+    SEMANTIC_CACHE_ENABLED, SEMANTIC_CACHE_TURNS, SUGGESTION_COUNT, SUGGESTIONS_SYSTEM_PROMPT,
+    ROUTING_ENABLED, HEDGE_BASE_URL, LOCAL_MODEL_PATH
 )
+from utils import make_request_key, create_system_message, create_user_message
+
+logger = get_logger("chat_service")
 
 
 class ChatService:
     """Service class for handling chat completions with NVIDIA NIM."""
     
-    def __init__(self, client: NIMClient = None):
+    def __init__(
+        self,
+        client: InferenceBackend = None,
+        coalescer: RequestCoalescer = None,
+        cache: CompletionCache = None,
+        retriever: RetrievalIndex = None,
+        semantic_cache: SemanticCache = None,
+        router: ModelRouter = None,
+        hedge_client: InferenceBackend = None,
+        local_backend: InferenceBackend = None
+    ):
         """
         Initialize the chat service.
         
         Args:
-            client: NIM client instance, creates default if None
+            client: Backend for hosted models, creates a NIM client if None
+            coalescer: Request coalescer for async calls, creates default if None
+            cache: Completion cache, creates default if None and CACHE_ENABLED
+            retriever: Passage index, opens the built index if None and RETRIEVAL_ENABLED
+            semantic_cache: Conversation-scoped similarity cache, creates default if None and SEMANTIC_CACHE_ENABLED
+            router: Model tier router, creates default if None and ROUTING_ENABLED
+            hedge_client: Backend for hedged calls, one for HEDGE_BASE_URL if set, else the main client
+            local_backend: In-process engine for the models it serves, creates one if None and LOCAL_MODEL_PATH is set
         """
         self.client = client or NIMClient()
-        self.openai_client = self.client.get_client()
+        self.coalescer = coalescer or RequestCoalescer()
+        if cache is None and CACHE_ENABLED:
+            cache = CompletionCache()
+        self.cache = cache
+        if retriever is None and RETRIEVAL_ENABLED:
+            retriever = get_index()
+        self.retriever = retriever
+        if semantic_cache is None and SEMANTIC_CACHE_ENABLED:
+            semantic_cache = SemanticCache()
+        self.semantic_cache = semantic_cache
+        if router is None and ROUTING_ENABLED:
+            router = ModelRouter()
+        self.router = router
+        if hedge_client is None:
+            hedge_client = NIMClient(base_url=HEDGE_BASE_URL) if HEDGE_BASE_URL else self.client
+        self.hedge_client = hedge_client
+        if local_backend is None and LOCAL_MODEL_PATH:
+            local_backend = LocalBackend()
+        self.local_backend = local_backend
+    
+    def after_fork(self):
+        """
+        Reopen per-process resources in a server worker forked after this service was built.
+        
+        SQLite connections must not be shared across fork. The HTTP clients
+        need nothing: they open connections lazily and none are opened before fork.
+        """
+        if self.cache is not None:
+            self.cache.reopen()
+        if self.retriever is not None:
+            self.retriever.reopen()
+    
+    async def aclose(self):
+        """Release the connections and engines of all backends."""
+        for backend in {self.client, self.hedge_client, self.local_backend} - {None}:
+            await backend.aclose()
+    
+    def _backend_for(self, model: str, hedge: bool = False) -> InferenceBackend:
+        """
+        Pick the backend that runs a model.
+        
+        Args:
+            model: Model of the call
+            hedge: Whether the call is a hedge, which goes to the hedge endpoint
+            
+        Returns:
+            InferenceBackend: The local engine if it serves the model, else the hosted one
+        """
+        if self.local_backend is not None and self.local_backend.serves(model):
+            return self.local_backend
+        return self.hedge_client if hedge else self.client
+    
+    def add_retrieved_context(
+        self,
+        messages: List[Dict[str, str]],
+        k: int = RETRIEVAL_TOP_K
+    ) -> List[Dict[str, str]]:
+        """
+        Add passages relevant to the latest user turn as a system message just before it.
+        
+        Args:
+            messages: List of message dictionaries with 'role' and 'content'
+            k: Number of passages to retrieve
+            
+        Returns:
+            List[Dict[str, str]]: The messages, with context added if anything relevant was found
+        """
+        if self.retriever is None:
+            return messages
+        
+        last_user = next((i for i in range(len(messages) - 1, -1, -1) if messages[i]["role"] == "user"), None)
+        if last_user is None:
+            return messages
+        
+        passages = self.retriever.search(messages[last_user]["content"], k=k)
+        if not passages:
+            return messages
+        return messages[:last_user] + [format_context(passages)] + messages[last_user:]
+    
+    def _route(
+        self,
+        task: str,
+        messages: List[Dict[str, str]],
+        model: Optional[str]
+    ) -> Tuple[str, Optional[str]]:
+        """
+        Choose the model of a request and the model to hedge it with.
+        
+        Args:
+            task: Task type used for routing, e.g. 'chat', 'suggestions', 'summary'
+            messages: Messages of the request
+            model: Model requested by the caller, which bypasses routing
+            
+        Returns:
+            Tuple of (model, hedge model or None when the call is not hedged)
+        """
+        if self.router is None:
+            return model or DEFAULT_MODEL, None
+        if model is not None:
+            hedge_model = model if self.router.hedge_enabled else None
+        else:
+            model, hedge_model = self.router.route(task, messages)
+        if hedge_model is not None and self._backend_for(hedge_model) is self.local_backend:
+            # A local hedge would queue behind its primary on the same cores
+            hedge_model = None
+        return model, hedge_model
+    
+    def _resolve_parameters(
+        self,
+        model: str = None,
+        temperature: float = None,
+        top_p: float = None,
+        max_tokens: int = None,
+        stream: bool = None
+    ) -> Dict[str, Any]:
+        """
+        Fill in default values for any completion parameters not provided.
+        
+        Args:
+            model: Model to use for completion
+            temperature: Sampling temperature
+            top_p: Top-p sampling parameter
+            max_tokens: Maximum tokens to generate
+            stream: Whether to stream the response
+            
+        Returns:
+            Dict[str, Any]: Resolved parameters keyed by API argument name
+        """
+        return {
+            "model": model or DEFAULT_MODEL,
+            "temperature": temperature if temperature is not None else DEFAULT_TEMPERATURE,
+            "top_p": top_p if top_p is not None else DEFAULT_TOP_P,
+            "max_tokens": max_tokens if max_tokens is not None else DEFAULT_MAX_TOKENS,
+            "stream": stream if stream is not None else DEFAULT_STREAM,
+        }
+    
+    def _is_cacheable(self, params: Dict[str, Any]) -> bool:
+        """
+        Check whether a request is deterministic enough to serve from cache.
+        
+        Args:
+            params: Resolved completion parameters
+            
+        Returns:
+            bool: True if the completion may be cached
+        """
+        return (
+            self.cache is not None
+            and not params["stream"]
+            and params["temperature"] <= CACHE_MAX_TEMPERATURE
+        )
+    
+    def _semantic_key(
+        self,
+        conversation_id: Optional[str],
+        messages: List[Dict[str, str]],
+        context: Optional[List[str]],
+        params: Dict[str, Any],
+        **extra
+    ) -> Optional[Tuple[str, str, str, str]]:
+        """
+        Build the semantic cache key of a request, if it may use the cache.
+        
+        Args:
+            conversation_id: Conversation the request belongs to
+            messages: Messages of the request
+            context: Recent conversation turns supplied by the caller, used
+                instead of the messages when the prompt wraps them in a template
+            params: Resolved completion parameters
+            **extra: Other request options that must match exactly
+            
+        Returns:
+            Optional[Tuple[str, str, str, str]]: (scope, text of the last SEMANTIC_CACHE_TURNS
+                turns, parameter fingerprint, newest turn), or None if the cache does not apply
+        """
+        if (
+            self.semantic_cache is None
+            or conversation_id is None
+            or params["temperature"] > CACHE_MAX_TEMPERATURE
+        ):
+            return None
+        turns = context if context else [f"{m['role']}: {m['content']}" for m in messages]
+        fingerprint = make_request_key([], **{**params, "stream": False}, **extra)
+        return str(conversation_id), "\n".join(turns[-SEMANTIC_CACHE_TURNS:]), fingerprint, turns[-1]
+    
+    def _coalesce_key(self, key: str, semantic_key: Optional[Tuple[str, str, str, str]]) -> str:
+        """
+        Build the key under which identical in-flight requests share one upstream call.
+        
+        The shared call stores its result in the semantic cache of the
+        conversation that started it, so requests that use the semantic cache
+        are only shared within a conversation, as the cache itself is.
+        
+        Args:
+            key: Canonical request key
+            semantic_key: Key from _semantic_key, None if the semantic cache does not apply
+            
+        Returns:
+            str: The coalescing key
+        """
+        return key if semantic_key is None else f"{key}:{semantic_key[0]}"
+    
+    def _get_semantic(self, semantic_key: Tuple[str, str, str, str]) -> Optional[str]:
+        """
+        Fetch a payload stored for similar recent turns.
+        
+        Args:
+            semantic_key: Key from _semantic_key
+            
+        Returns:
+            Optional[str]: The stored payload, or None on a miss
+        """
+        found = self.semantic_cache.get(*semantic_key)
+        SEMANTIC_CACHE_LOOKUPS.labels("miss" if found is None else "hit").inc()
+        return found[0] if found is not None else None
+    
+    def _get_cached_payload(self, key: str) -> Optional[str]:
+        """
+        Fetch a cached payload.
+        
+        Args:
+            key: Canonical request key
+            
+        Returns:
+            Optional[str]: The cached payload, or None on a miss
+        """
+        payload = self.cache.get(key)
+        CACHE_LOOKUPS.labels("miss" if payload is None else "hit").inc()
+        return payload
+    
+    def _get_cached(self, key: str) -> Optional[ChatCompletion]:
+        """
+        Fetch a cached completion.
+        
+        Args:
+            key: Canonical request key
+            
+        Returns:
+            Optional[ChatCompletion]: The cached completion, or None on a miss
+        """
+        payload = self._get_cached_payload(key)
+        if payload is None:
+            return None
+        return ChatCompletion.model_validate_json(payload)
+    
+    def _store_cached(self, key: str, completion: ChatCompletion):
+        """
+        Store a completion in the cache.
+        
+        Args:
+            key: Canonical request key
+            completion: Completion returned by the upstream
+        """
+        self.cache.set(key, completion.model_dump_json())
+    
+    def _record_upstream(
+        self,
+        mode: str,
+        messages: List[Dict[str, str]],
+        params: Dict[str, Any],
+        elapsed: float,
+        usage: Any
+    ):
+        """
+        Record metrics and a log line for a finished upstream call.
+        
+        Slow calls are logged as warnings with a fingerprint of the request
+        (not its text), so the prompts behind them can be found in traffic.
+        
+        Args:
+            mode: 'sync', 'async', 'stream' or 'suggestions'
+            messages: Messages sent upstream
+            params: Resolved completion parameters
+            elapsed: Seconds the call took, retries included
+            usage: Token usage reported by the upstream, may be None
+        """
+        UPSTREAM_LATENCY.labels(params["model"]).observe(elapsed)
+        record_usage(params["model"], usage)
+        log_event(
+            logger, "upstream_completion",
+            logging.WARNING if elapsed >= SLOW_REQUEST_SECONDS else logging.INFO,
+            mode=mode,
+            model=params["model"],
+            latency_ms=round(elapsed * 1000, 1),
+            prompt_tokens=getattr(usage, "prompt_tokens", None),
+            completion_tokens=getattr(usage, "completion_tokens", None),
+            prompt_chars=sum(len(m["content"]) for m in messages),
+            max_tokens=params["max_tokens"],
+            temperature=params["temperature"],
+            request_key=make_request_key(messages, **params)[:16],
+        )
+    
+    def _log_upstream_error(self, params: Dict[str, Any], error: Exception):
+        """
+        Log a failed upstream call.
+        
+        Args:
+            params: Resolved completion parameters
+            error: The exception raised by the call
+        """
+        translated = translate_error(error)
+        log_event(
+            logger, "upstream_error", logging.ERROR,
+            model=params["model"],
+            error_type=type(translated).__name__,
+            error=str(translated),
+        )
     
     def create_completion(
         self,
@@ -32,6 +380,7 @@ class ChatService:
         top_p: float = None,
         max_tokens: int = None,
         stream: bool = None,
+        task: str = "chat",
         **kwargs
     ) -> Dict[str, Any]:
         """
@@ -39,43 +388,490 @@ class ChatService:
         
         Args:
             messages: List of message dictionaries with 'role' and 'content'
-            model: Model to use for completion
+            model: Model to use for completion, routed by task if None
             temperature: Sampling temperature
             top_p: Top-p sampling parameter
             max_tokens: Maximum tokens to generate
             stream: Whether to stream the response
+            task: Task type used to pick the model tier
             **kwargs: Additional parameters to pass to the API
             
         Returns:
             Dict containing the completion response
+            
+        Raises:
+            ChatServiceError: Typed by cause (rate limit, timeout, unavailable)
         """
-        # Use default values if not provided
-        model = model or DEFAULT_MODEL
-        temperature = temperature if temperature is not None else DEFAULT_TEMPERATURE
-        top_p = top_p if top_p is not None else DEFAULT_TOP_P
-        max_tokens = max_tokens if max_tokens is not None else DEFAULT_MAX_TOKENS
-        stream = stream if stream is not None else DEFAULT_STREAM
+        model, _ = self._route(task, messages, model)
+        params = self._resolve_parameters(model, temperature, top_p, max_tokens, stream)
         
-        try:
-            print(f"🚀 [NVIDIA API] Calling NVIDIA NIMs API with model: {model}", file=sys.stderr)
-            print(f"📊 [NVIDIA API] Parameters: temp={temperature}, top_p={top_p}, max_tokens={max_tokens}", file=sys.stderr)
+        with track_request("sync"):
+            cacheable = self._is_cacheable(params)
+            if cacheable:
+                key = make_request_key(messages, **params, **kwargs)
+                cached = self._get_cached(key)
+                if cached is not None:
+                    return cached
+            
+            start = time.perf_counter()
+            try:
+                completion = self._backend_for(params["model"]).create(
+                    messages=messages,
+                    timeout=REQUEST_TIMEOUT,
+                    **params,
+                    **kwargs
+                )
+            except Exception as e:
+                self._log_upstream_error(params, e)
+                raise translate_error(e) from e
             
-            completion = self.openai_client.chat.completions.create(
-                model=model,
+            if not params["stream"]:
+                self._record_upstream("sync", messages, params, time.perf_counter() - start, completion.usage)
+            if cacheable:
+                self._store_cached(key, completion)
+            return completion
+    
+    async def acreate_completion(
+        self,
+        messages: List[Dict[str, str]],
+        model: str = None,
+        temperature: float = None,
+        top_p: float = None,
+        max_tokens: int = None,
+        stream: bool = None,
+        conversation_id: str = None,
+        context: List[str] = None,
+        task: str = "chat",
+        **kwargs
+    ) -> Dict[str, Any]:
+        """
+        Create a chat completion using NVIDIA NIM without blocking the event loop.
+        
+        Requests with a conversation_id may be answered from the semantic
+        cache when the conversation's recent turns barely changed since an
+        earlier request with the same parameters. Non-streaming calls that
+        outlast the router's hedge delay are hedged.
+        
+        Args:
+            messages: List of message dictionaries with 'role' and 'content'
+            model: Model to use for completion, routed by task if None
+            temperature: Sampling temperature
+            top_p: Top-p sampling parameter
+            max_tokens: Maximum tokens to generate
+            stream: Whether to stream the response
+            conversation_id: Conversation the request belongs to, scopes the semantic cache
+            context: Recent turns ("role: content") to match on, defaults to the messages
+            task: Task type used to pick the model tier
+            **kwargs: Additional parameters to pass to the API
+            
+        Returns:
+            Dict containing the completion response
+            
+        Raises:
+            ChatServiceError: Typed by cause (rate limit, timeout, unavailable)
+        """
+        model, hedge_model = self._route(task, messages, model)
+        params = self._resolve_parameters(model, temperature, top_p, max_tokens, stream)
+        
+        if params["stream"]:
+            # Streams are measured by their consumer, see astream_completion
+            return await self._acall_upstream(messages, params, kwargs)
+        
+        with track_request("async"):
+            key = make_request_key(messages, **params, **kwargs)
+            cacheable = self._is_cacheable(params)
+            if cacheable:
+                cached = self._get_cached(key)
+                if cached is not None:
+                    return cached
+            
+            semantic_key = self._semantic_key(conversation_id, messages, context, params, **kwargs)
+            if semantic_key is not None:
+                payload = self._get_semantic(semantic_key)
+                if payload is not None:
+                    return ChatCompletion.model_validate_json(payload)
+            
+            async def call():
+                completion = await self._acall_hedged(messages, params, kwargs, hedge_model)
+                if cacheable:
+                    self._store_cached(key, completion)
+                if semantic_key is not None:
+                    self.semantic_cache.set(*semantic_key, completion.model_dump_json())
+                return completion
+            
+            # Identical non-streaming requests share one upstream call
+            return await self.coalescer.submit(self._coalesce_key(key, semantic_key), call)
+    
+    async def _acall_upstream(
+        self,
+        messages: List[Dict[str, str]],
+        params: Dict[str, Any],
+        kwargs: Dict[str, Any],
+        client: InferenceBackend = None
+    ):
+        """
+        Issue a single asynchronous completion call to the model's backend.
+        
+        Args:
+            messages: List of message dictionaries with 'role' and 'content'
+            params: Resolved completion parameters
+            kwargs: Additional parameters to pass to the API
+            client: Backend to call, the one serving params['model'] if None
+            
+        Returns:
+            The completion response, or an async stream when streaming
+        """
+        client = client or self._backend_for(params["model"])
+        start = time.perf_counter()
+        try:
+            completion = await client.acreate(
                 messages=messages,
-                temperature=temperature,
-                top_p=top_p,
-                max_tokens=max_tokens,
-                stream=stream,
-                timeout=30.0,  # Add 30 second timeout
+                timeout=REQUEST_TIMEOUT,
+                **params,
                 **kwargs
             )
+        except Exception as e:
+            self._log_upstream_error(params, e)
+            raise translate_error(e) from e
+        
+        if not params["stream"]:
+            elapsed = time.perf_counter() - start
+            if self.router is not None:
+                self.router.observe(params["model"], elapsed)
+            self._record_upstream("async", messages, params, elapsed, completion.usage)
+        return completion
+    
+    async def _acall_hedged(
+        self,
+        messages: List[Dict[str, str]],
+        params: Dict[str, Any],
+        kwargs: Dict[str, Any],
+        hedge_model: Optional[str]
+    ):
+        """
+        Make a non-streaming call, duplicating it to the hedge model if it is slow.
+        
+        Args:
+            messages: List of message dictionaries with 'role' and 'content'
+            params: Resolved completion parameters
+            kwargs: Additional parameters to pass to the API
+            hedge_model: Model for the duplicate call, None to never hedge
             
-            print(f"✅ [NVIDIA API] Successfully received response from NVIDIA NIMs", file=sys.stderr)
-            return completion
+        Returns:
+            The completion of whichever call answered first
+        """
+        if self.router is None or hedge_model is None:
+            return await self._acall_upstream(messages, params, kwargs)
+        
+        hedge_params = {**params, "model": hedge_model}
+        completion, _ = await self.router.run(
+            lambda: self._acall_upstream(messages, params, kwargs),
+            lambda: self._acall_upstream(messages, hedge_params, kwargs, self._backend_for(hedge_model, hedge=True)),
+            self.router.hedge_delay(params["model"])
+        )
+        return completion
+    
+    async def _aopen_stream(
+        self,
+        messages: List[Dict[str, str]],
+        params: Dict[str, Any],
+        kwargs: Dict[str, Any],
+        client: InferenceBackend = None
+    ) -> Tuple[Any, List[Any], AsyncIterator[Any]]:
+        """
+        Open a stream and read it up to its first content chunk.
+        
+        Args:
+            messages: List of message dictionaries with 'role' and 'content'
+            params: Resolved completion parameters (streaming)
+            kwargs: Additional parameters to pass to the API
+            client: Backend to call, the one serving params['model'] if None
+            
+        Returns:
+            Tuple of (stream, chunks read so far, iterator over the remaining chunks)
+        """
+        start = time.perf_counter()
+        stream = await self._acall_upstream(messages, params, kwargs, client)
+        chunks = []
+        iterator = stream.__aiter__()
+        try:
+            async for chunk in iterator:
+                chunks.append(chunk)
+                if chunk.choices and chunk.choices[0].delta.content:
+                    break
+        except BaseException:
+            # Includes cancellation after losing a hedge race
+            await stream.close()
+            raise
+        if self.router is not None:
+            self.router.observe(f"{params['model']}:first-token", time.perf_counter() - start)
+        return stream, chunks, iterator
+    
+    async def _aopen_hedged_stream(
+        self,
+        messages: List[Dict[str, str]],
+        params: Dict[str, Any],
+        kwargs: Dict[str, Any],
+        hedge_model: Optional[str]
+    ) -> Tuple[Any, AsyncIterator[Any], str]:
+        """
+        Open a stream, hedging it if its first content is slow to arrive.
+        
+        Args:
+            messages: List of message dictionaries with 'role' and 'content'
+            params: Resolved completion parameters (streaming)
+            kwargs: Additional parameters to pass to the API
+            hedge_model: Model for the duplicate stream, None to never hedge
+            
+        Returns:
+            Tuple of (winning stream to close when done, iterator over all its
+            chunks, model that serves it)
+        """
+        if self.router is None or hedge_model is None:
+            opened, hedge_won = await self._aopen_stream(messages, params, kwargs), False
+        else:
+            hedge_params = {**params, "model": hedge_model}
+            
+            async def discard(result):
+                await result[0].close()
+            
+            opened, hedge_won = await self.router.run(
+                lambda: self._aopen_stream(messages, params, kwargs),
+                lambda: self._aopen_stream(messages, hedge_params, kwargs, self._backend_for(hedge_model, hedge=True)),
+                self.router.hedge_delay(f"{params['model']}:first-token"),
+                discard
+            )
+        stream, chunks, iterator = opened
+        
+        async def all_chunks():
+            for chunk in chunks:
+                yield chunk
+            async for chunk in iterator:
+                yield chunk
+        
+        return stream, all_chunks(), hedge_model if hedge_won else params["model"]
+    
+    async def astream_completion(
+        self,
+        messages: List[Dict[str, str]],
+        model: str = None,
+        temperature: float = None,
+        top_p: float = None,
+        max_tokens: int = None,
+        task: str = "chat",
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """
+        Stream a chat completion, yielding content deltas as they arrive.
+        
+        A stream whose first content is slower than the router's hedge delay
+        is hedged; the first to produce content is kept.
+        
+        Args:
+            messages: List of message dictionaries with 'role' and 'content'
+            model: Model to use for completion, routed by task if None
+            temperature: Sampling temperature
+            top_p: Top-p sampling parameter
+            max_tokens: Maximum tokens to generate
+            task: Task type used to pick the model tier
+            **kwargs: Additional parameters to pass to the API
+            
+        Yields:
+            str: Content fragments in the order the upstream produces them
+        """
+        model, hedge_model = self._route(task, messages, model)
+        params = self._resolve_parameters(model, temperature, top_p, max_tokens, stream=True)
+        if STREAM_INCLUDE_USAGE:
+            kwargs.setdefault("stream_options", {"include_usage": True})
+        
+        with track_request("stream"):
+            start = time.perf_counter()
+            stream, chunks, served_by = await self._aopen_hedged_stream(messages, params, kwargs, hedge_model)
+            params = {**params, "model": served_by}
+            
+            usage = None
+            first_token_at = None
+            try:
+                async for chunk in chunks:
+                    # With include_usage the last chunk carries usage and no choices
+                    usage = getattr(chunk, "usage", None) or usage
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        if first_token_at is None:
+                            first_token_at = time.perf_counter()
+                            TIME_TO_FIRST_TOKEN.labels(params["model"]).observe(first_token_at - start)
+                        yield delta
+            except Exception as e:
+                log_event(logger, "stream_interrupted", logging.ERROR, model=params["model"], error=str(e))
+                raise ChatServiceError(f"Error streaming chat completion: {str(e)}") from e
+            finally:
+                await stream.close()
+            
+            self._record_upstream("stream", messages, params, time.perf_counter() - start, usage)
+    
+    async def agenerate_suggestions(
+        self,
+        messages: List[Dict[str, str]],
+        count: int = SUGGESTION_COUNT,
+        model: str = None,
+        temperature: float = None,
+        top_p: float = None,
+        max_tokens: int = None,
+        conversation_id: str = None,
+        context: List[str] = None,
+        **kwargs
+    ) -> List[str]:
+        """
+        Generate short reply suggestions, one per line of a streamed completion.
+        
+        The reply is parsed while it streams and the upstream stream is closed
+        as soon as ``count`` distinct suggestions are complete, so no tokens
+        are spent on lines beyond them. Results share the exact and semantic
+        caches and in-flight coalescing with acreate_completion.
+        
+        Args:
+            messages: List of message dictionaries with 'role' and 'content'
+            count: Number of suggestions wanted
+            model: Model to use for completion
+            temperature: Sampling temperature
+            top_p: Top-p sampling parameter
+            max_tokens: Maximum tokens to generate
+            conversation_id: Conversation the request belongs to, scopes the semantic cache
+            context: Recent turns ("role: content") to match on, defaults to the messages
+            **kwargs: Additional parameters to pass to the API
+            
+        Returns:
+            List[str]: Up to count distinct suggestions
+            
+        Raises:
+            ChatServiceError: Typed by cause, or when the reply held no usable suggestion
+        """
+        model, hedge_model = self._route("suggestions", messages, model)
+        params = self._resolve_parameters(model, temperature, top_p, max_tokens, stream=True)
+        messages = [create_system_message(SUGGESTIONS_SYSTEM_PROMPT)] + messages
+        if STREAM_INCLUDE_USAGE:
+            kwargs.setdefault("stream_options", {"include_usage": True})
+        
+        with track_request("suggestions"):
+            key = make_request_key(messages, mode="suggestions", count=count, **params, **kwargs)
+            cacheable = self.cache is not None and params["temperature"] <= CACHE_MAX_TEMPERATURE
+            if cacheable:
+                payload = self._get_cached_payload(key)
+                if payload is not None:
+                    return json.loads(payload)
+            
+            semantic_key = self._semantic_key(
+                conversation_id, messages, context, params, mode="suggestions", count=count, **kwargs
+            )
+            if semantic_key is not None:
+                payload = self._get_semantic(semantic_key)
+                if payload is not None:
+                    return json.loads(payload)
+            
+            async def call():
+                suggestions = await self._astream_suggestions(messages, params, kwargs, count, hedge_model)
+                payload = json.dumps(suggestions)
+                if cacheable:
+                    self.cache.set(key, payload)
+                if semantic_key is not None:
+                    self.semantic_cache.set(*semantic_key, payload)
+                return suggestions
+            
+            # Coalesced callers share the list, so each gets its own copy
+            return list(await self.coalescer.submit(self._coalesce_key(key, semantic_key), call))
+    
+    async def _astream_suggestions(
+        self,
+        messages: List[Dict[str, str]],
+        params: Dict[str, Any],
+        kwargs: Dict[str, Any],
+        count: int,
+        hedge_model: Optional[str] = None
+    ) -> List[str]:
+        """
+        Stream one completion and collect suggestions until enough are complete.
+        
+        Args:
+            messages: Messages to send upstream
+            params: Resolved completion parameters (streaming)
+            kwargs: Additional parameters to pass to the API
+            count: Number of suggestions wanted
+            hedge_model: Model to hedge a slow stream with, None to never hedge
+            
+        Returns:
+            List[str]: Up to count distinct suggestions
+        """
+        start = time.perf_counter()
+        stream, stream_chunks, served_by = await self._aopen_hedged_stream(messages, params, kwargs, hedge_model)
+        params = {**params, "model": served_by}
+        parser = SuggestionParser(count)
+        usage = None
+        chunks = 0
+        try:
+            async for chunk in stream_chunks:
+                usage = getattr(chunk, "usage", None) or usage
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if not delta:
+                    continue
+                if chunks == 0:
+                    TIME_TO_FIRST_TOKEN.labels(params["model"]).observe(time.perf_counter() - start)
+                chunks += 1
+                if parser.feed(delta):
+                    break
         except Exception as e:
-            print(f"❌ [NVIDIA API] Error calling NVIDIA NIMs: {str(e)}", file=sys.stderr)
-            raise Exception(f"Error creating chat completion: {str(e)}")
+            log_event(logger, "stream_interrupted", logging.ERROR, model=params["model"], error=str(e))
+            raise ChatServiceError(f"Error streaming chat completion: {str(e)}") from e
+        finally:
+            # Closing the response stops the upstream generating the rest
+            await stream.close()
+        
+        suggestions = parser.finish()
+        # Stopped streams never reach the usage chunk; a content chunk is about one token
+        self._record_upstream(
+            "suggestions", messages, params, time.perf_counter() - start,
+            usage or SimpleNamespace(prompt_tokens=None, completion_tokens=chunks)
+        )
+        if not suggestions:
+            raise ChatServiceError("Upstream reply contained no usable suggestions")
+        return suggestions
+    
+    def summarize_history(
+        self,
+        previous_summary: Optional[str],
+        messages: List[Dict[str, str]]
+    ) -> str:
+        """
+        Fold turns that left the history window into a rolling summary.
+        
+        Suitable as the summarizer of a history.ConversationHistory.
+        
+        Args:
+            previous_summary: The existing summary, if any
+            messages: Turns to add to the summary
+            
+        Returns:
+            str: The updated summary
+        """
+        transcript = "\n".join(f"{m['role']}: {m['content']}" for m in messages)
+        prompt = (
+            "Update the summary of this support conversation with the new turns. "
+            "Keep facts about the person, their feelings and anything agreed. "
+            "Reply with the summary only.\n\n"
+            f"Current summary:\n{previous_summary or '(none)'}\n\n"
+            f"New turns:\n{transcript}"
+        )
+        completion = self.create_completion(
+            [create_system_message("You write concise conversation summaries."), create_user_message(prompt)],
+            temperature=0.2,
+            max_tokens=HISTORY_SUMMARY_MAX_TOKENS,
+            stream=False,
+            task="summary"
+        )
+        return self.get_response_content(completion).strip()
     
     def get_response_content(self, completion) -> str:
         """
@@ -2,35 +2,95 @@
 Client module for NVIDIA NIM API client setup.
 """
 
-from openai import OpenAI
-from config import NVIDIA_BASE_URL, NVIDIA_API_KEY
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Optional
+import httpx
+from openai import OpenAI, AsyncOpenAI
+from backend import InferenceBackend
+from config import (
+    NVIDIA_BASE_URL, NVIDIA_API_KEY, REQUEST_TIMEOUT,
+    HTTP2_ENABLED, HTTP_MAX_CONNECTIONS, HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    HTTP_KEEPALIVE_EXPIRY, CONNECT_TIMEOUT, RETRY_MAX_ATTEMPTS, RETRY_MAX_DELAY,
+    READY_CHECK_TIMEOUT, READY_CHECK_INTERVAL
+)
+from metrics import RETRIES, get_logger, log_event
+from resilience import (
+    CircuitBreaker, translate_error, is_retryable, trips_breaker,
+    get_retry_after, backoff_delay
+)
 
+logger = get_logger("client")
 
-class NIMClient:
+
+class NIMClient(InferenceBackend):
     """Client class for interacting with NVIDIA NIM API."""
     
-    def __init__(self, base_url: str = None, api_key: str = None):
+    name = "nim"
+    
+    def __init__(self, base_url: str = None, api_key: str = None, breaker: CircuitBreaker = None):
         """
         Initialize the NIM client.
         
         Args:
             base_url: The base URL for the NVIDIA API
             api_key: The API key for authentication
+            breaker: Circuit breaker shared by all calls, creates default if None
         """
         self.base_url = base_url or NVIDIA_BASE_URL
         self.api_key = api_key or NVIDIA_API_KEY
+        self.breaker = breaker or CircuitBreaker()
         self.client = self._create_client()
+        self.async_client = self._create_async_client()
+        self._last_check: Optional[dict] = None
+        self._last_check_at = 0.0
+    
+    def _transport_options(self) -> dict:
+        """
+        Build the connection pool settings shared by the sync and async transports.
+        
+        Returns:
+            dict: Keyword arguments for httpx.Client / httpx.AsyncClient
+        """
+        return {
+            "http2": HTTP2_ENABLED,
+            "limits": httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=HTTP_KEEPALIVE_EXPIRY
+            ),
+            "timeout": httpx.Timeout(REQUEST_TIMEOUT, connect=CONNECT_TIMEOUT),
+        }
     
     def _create_client(self) -> OpenAI:
         """
         Create and return an OpenAI client configured for NVIDIA NIM.
         
+        Retries are handled by call_with_retry, so the SDK's own retries are off.
+        
         Returns:
             OpenAI: Configured OpenAI client
         """
         return OpenAI(
             base_url=self.base_url,
-            api_key=self.api_key
+            api_key=self.api_key,
+            max_retries=0,
+            http_client=httpx.Client(**self._transport_options())
+        )
+    
+    def _create_async_client(self) -> AsyncOpenAI:
+        """
+        Create and return an AsyncOpenAI client configured for NVIDIA NIM.
+        
+        Returns:
+            AsyncOpenAI: Configured asynchronous OpenAI client
+        """
+        return AsyncOpenAI(
+            base_url=self.base_url,
+            api_key=self.api_key,
+            max_retries=0,
+            http_client=httpx.AsyncClient(**self._transport_options())
         )
     
     def get_client(self) -> OpenAI:
@@ -40,4 +100,168 @@ class NIMClient:
         Returns:
             OpenAI: The configured client
         """
-        return self.client 
\ No newline at end of file
+        return self.client
+    
+    def get_async_client(self) -> AsyncOpenAI:
+        """
+        Get the configured asynchronous OpenAI client.
+        
+        Returns:
+            AsyncOpenAI: The configured async client
+        """
+        return self.async_client
+    
+    def create(self, **request) -> Any:
+        """
+        Create a chat completion through call_with_retry.
+        
+        Args:
+            **request: OpenAI chat completion arguments
+        
+        Returns:
+            The completion, or a stream when request['stream'] is true
+        """
+        return self.call_with_retry(self.client.chat.completions.create, **request)
+    
+    async def acreate(self, **request) -> Any:
+        """
+        Create a chat completion through acall_with_retry.
+        
+        Args:
+            **request: OpenAI chat completion arguments
+        
+        Returns:
+            The completion, or an async stream when request['stream'] is true
+        """
+        return await self.acall_with_retry(self.async_client.chat.completions.create, **request)
+    
+    async def aclose(self):
+        """Close pooled upstream connections of both the async and the sync client."""
+        await self.async_client.close()
+        self.client.close()
+    
+    async def acheck_upstream(self) -> dict:
+        """
+        Check that the upstream API is reachable and accepts our key.
+        
+        Lists the available models, which costs no tokens. The result is reused
+        for READY_CHECK_INTERVAL seconds so frequent probes from every worker
+        do not turn into upstream traffic, and no call is made while the
+        circuit is open.
+        
+        Returns:
+            dict: 'ready' flag, circuit state and the error if the check failed
+        """
+        now = time.monotonic()
+        if self._last_check is not None and now - self._last_check_at < READY_CHECK_INTERVAL:
+            return self._last_check
+        
+        result = {"ready": True, "upstream": self.breaker.state}
+        if result["upstream"] == CircuitBreaker.OPEN:
+            result.update(ready=False, error="Circuit open after repeated upstream failures")
+        else:
+            try:
+                await self.async_client.models.list(timeout=READY_CHECK_TIMEOUT)
+            except Exception as e:
+                result.update(ready=False, error=str(translate_error(e)))
+        
+        self._last_check, self._last_check_at = result, now
+        return result
+    
+    def _handle_failure(self, error: Exception, attempt: int) -> Optional[float]:
+        """
+        Record a failed attempt and decide whether to retry it.
+        
+        Args:
+            error: Exception raised by the OpenAI client
+            attempt: Zero-based index of the failed attempt
+        
+        Returns:
+            Optional[float]: Seconds to wait before retrying, or None to give up
+        """
+        translated = translate_error(error)
+        if trips_breaker(translated):
+            self.breaker.record_failure()
+        else:
+            # The upstream answered, so it is not degraded
+            self.breaker.record_success()
+        
+        if not is_retryable(translated) or attempt + 1 >= RETRY_MAX_ATTEMPTS:
+            return None
+        
+        retry_after = get_retry_after(error)
+        if retry_after is not None and retry_after > RETRY_MAX_DELAY:
+            return None
+        
+        delay = backoff_delay(attempt, retry_after)
+        RETRIES.labels(type(translated).__name__).inc()
+        log_event(
+            logger, "upstream_retry", logging.WARNING,
+            attempt=attempt + 1, delay_s=round(delay, 2),
+            error_type=type(translated).__name__, error=str(error),
+        )
+        return delay
+    
+    def call_with_retry(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Call the upstream with jittered exponential retry and circuit breaking.
+        
+        Args:
+            func: OpenAI client method to call
+            *args: Positional arguments for func
+            **kwargs: Keyword arguments for func
+        
+        Returns:
+            The value returned by func
+        
+        Raises:
+            ChatServiceError: Typed error once retries are exhausted or the circuit is open
+        """
+        attempt = 0
+        while True:
+            self.breaker.before_call()
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                delay = self._handle_failure(e, attempt)
+                if delay is None:
+                    raise translate_error(e) from e
+                time.sleep(delay)
+                attempt += 1
+            else:
+                self.breaker.record_success()
+                return result
+    
+    async def acall_with_retry(self, func: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """
+        Asynchronous variant of call_with_retry.
+        
+        Args:
+            func: AsyncOpenAI client method to call
+            *args: Positional arguments for func
+            **kwargs: Keyword arguments for func
+        
+        Returns:
+            The value returned by func
+        
+        Raises:
+            ChatServiceError: Typed error once retries are exhausted or the circuit is open
+        """
+        attempt = 0
+        while True:
+            self.breaker.before_call()
+            try:
+                result = await func(*args, **kwargs)
+            except asyncio.CancelledError:
+                # Cancelled (lost a hedge, client went away): no verdict on the upstream
+                self.breaker.release_trial()
+                raise
+            except Exception as e:
+                delay = self._handle_failure(e, attempt)
+                if delay is None:
+                    raise translate_error(e) from e
+                await asyncio.sleep(delay)
+                attempt += 1
+            else:
+                self.breaker.record_success()
+                return result
@@ -0,0 +1,125 @@
+"""
+Request coalescing module for sharing and batching upstream completion calls.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+from config import COALESCE_WINDOW, COALESCE_MAX_BATCH, COALESCE_MAX_CONCURRENCY
+
+
+class RequestCoalescer:
+    """
+    Deduplicates identical in-flight requests and dispatches the rest in micro-batches.
+
+    Callers that submit a key already in flight wait on the existing future
+    instead of issuing a new upstream call. New keys are held for up to
+    ``window`` seconds so that prompts arriving together are dispatched as
+    one concurrent batch, bounded by ``max_concurrency``.
+    """
+
+    def __init__(
+        self,
+        window: float = None,
+        max_batch_size: int = None,
+        max_concurrency: int = None
+    ):
+        """
+        Initialize the coalescer.
+
+        Args:
+            window: Seconds to wait for more prompts before dispatching a batch
+            max_batch_size: Number of pending prompts that triggers an early dispatch
+            max_concurrency: Maximum upstream calls running at once
+        """
+        self.window = window if window is not None else COALESCE_WINDOW
+        self.max_batch_size = max_batch_size or COALESCE_MAX_BATCH
+        self.max_concurrency = max_concurrency or COALESCE_MAX_CONCURRENCY
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._pending: List[Tuple[str, Callable[[], Awaitable[Any]], asyncio.Future]] = []
+        self._flush_handle = None
+        self._semaphore = None
+        self._tasks = set()
+        self.stats = {"submitted": 0, "coalesced": 0, "batches": 0, "dispatched": 0}
+
+    async def submit(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run ``factory`` for ``key`` unless an identical request is already in flight.
+
+        Args:
+            key: Canonical request key (see utils.make_request_key)
+            factory: Zero-argument coroutine function performing the upstream call
+
+        Returns:
+            The result of the shared upstream call
+        """
+        self.stats["submitted"] += 1
+        future = self._inflight.get(key)
+
+        if future is not None:
+            self.stats["coalesced"] += 1
+        else:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._inflight[key] = future
+            self._pending.append((key, factory, future))
+
+            if len(self._pending) >= self.max_batch_size or self.window <= 0:
+                self._flush()
+            elif self._flush_handle is None:
+                self._flush_handle = loop.call_later(self.window, self._flush)
+
+        # Shield so one caller disconnecting does not cancel the shared call
+        return await asyncio.shield(future)
+
+    def _flush(self):
+        """Dispatch every pending request as one concurrent batch."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        batch, self._pending = self._pending, []
+        if batch:
+            self.stats["batches"] += 1
+            task = asyncio.ensure_future(self._run_batch(batch))
+            # Hold a reference so the batch task is not garbage collected mid-flight
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, batch: List[Tuple[str, Callable[[], Awaitable[Any]], asyncio.Future]]):
+        """
+        Run a batch of upstream calls under the concurrency limit.
+
+        Args:
+            batch: Pending (key, factory, future) entries to dispatch
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        await asyncio.gather(*(self._run_one(*entry) for entry in batch))
+
+    async def _run_one(self, key: str, factory: Callable[[], Awaitable[Any]], future: asyncio.Future):
+        """
+        Run a single upstream call and resolve its shared future.
+
+        Args:
+            key: Request key the future is registered under
+            factory: Coroutine function performing the call
+            future: Future shared by every caller of ``key``
+        """
+        try:
+            async with self._semaphore:
+                self.stats["dispatched"] += 1
+                result = await factory()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+            # Mark retrieved so an exception nobody awaited is not logged
+            future.exception()
+        else:
+            if not future.done():
+                future.set_result(result)
+        finally:
+            self._inflight.pop(key, None)
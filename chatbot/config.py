@@ -2,9 +2,11 @@
 Configuration module for NVIDIA NIM API settings.
 """
 
+import os
+
 # API Configuration
-NVIDIA_BASE_URL = "https://integrate.api.nvidia.com/v1"
-NVIDIA_API_KEY = "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"
+NVIDIA_BASE_URL = os.environ.get("NVIDIA_BASE_URL", "https://integrate.api.nvidia.com/v1")
+NVIDIA_API_KEY = os.environ.get("NVIDIA_API_KEY", "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")
 
 # Model Configuration
 DEFAULT_MODEL = "qwen/qwen2.5-coder-32b-instruct"
@@ -13,4 +15,140 @@ DEFAULT_MODEL = "qwen/qwen2.5-coder-32b-instruct"
 DEFAULT_TEMPERATURE = 0.8
 DEFAULT_TOP_P = 0.7
 DEFAULT_MAX_TOKENS = 1024
-DEFAULT_STREAM = False 
\ No newline at end of file
+REQUEST_MAX_TOKENS = 4096  # largest max_tokens a request may ask for
+DEFAULT_STREAM = False 
+
+# Request Configuration
+REQUEST_TIMEOUT = 30.0  # seconds per upstream completion call
+
+# Request Coalescing Configuration
+COALESCE_WINDOW = 0.01  # seconds to collect independent prompts into one batch
+COALESCE_MAX_BATCH = 32  # dispatch early once this many prompts are waiting
+COALESCE_MAX_CONCURRENCY = 64  # upstream calls in flight per process
+
+# Completion Cache Configuration
+CACHE_ENABLED = True
+CACHE_DB_PATH = os.environ.get(
+    "CHATBOT_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "completion_cache.db")
+)
+CACHE_TTL = 3600  # seconds a cached completion stays valid
+CACHE_MAX_TEMPERATURE = 0.5  # only cache calls at or below this temperature
+CACHE_MEMORY_MAX_ENTRIES = 1024  # hot in-memory LRU tier
+CACHE_MAX_BYTES = 64 * 1024 * 1024  # persistent tier size before LRU eviction
+
+# HTTP Transport Configuration
+HTTP2_ENABLED = True
+HTTP_MAX_CONNECTIONS = 100
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 20
+HTTP_KEEPALIVE_EXPIRY = 30.0  # seconds an idle connection is kept open
+CONNECT_TIMEOUT = 5.0  # seconds to establish a connection
+
+# Retry and Circuit Breaker Configuration
+RETRY_MAX_ATTEMPTS = 3  # total attempts per call, including the first
+RETRY_BASE_DELAY = 0.5  # seconds, doubled on every retry before jitter
+RETRY_MAX_DELAY = 8.0  # longest wait before a retry, including Retry-After
+BREAKER_FAILURE_THRESHOLD = 5  # consecutive upstream failures before opening
+BREAKER_RESET_TIMEOUT = 30.0  # seconds before a half-open trial call
+
+# Batch Generation Configuration
+BATCH_MAX_ITEMS = 200  # prompts accepted per /generate/batch request
+BATCH_MAX_CONCURRENCY = 16  # completions in flight per batch request
+
+# Conversation History Configuration
+HISTORY_TOKEN_BUDGET = 2048  # prompt tokens kept for history, summary included
+HISTORY_SUMMARY_MAX_TOKENS = 256  # length of the rolling summary of older turns
+
+# Retrieval Configuration
+RETRIEVAL_ENABLED = True  # add retrieved passages to /generate prompts when an index exists
+RETRIEVAL_INDEX_DIR = os.environ.get(
+    "CHATBOT_RETRIEVAL_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "retrieval")
+)
+RETRIEVAL_SNIPPETS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "response_snippets.jsonl")
+RETRIEVAL_EVENTS_DB_PATH = os.environ.get(
+    "SCRAPPER_DB_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "shared_data", "scrapper_data.db")
+)
+RETRIEVAL_EMBEDDER = os.environ.get("CHATBOT_EMBEDDER", "hashing")  # or "sentence-transformers"
+RETRIEVAL_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+RETRIEVAL_DIM = 256  # dimensions of the hashing embedder
+RETRIEVAL_TOP_K = 3  # passages added to a prompt
+RETRIEVAL_NPROBE = 32  # inverted lists scanned per query (of ~sqrt(documents))
+RETRIEVAL_MIN_SCORE = 0.1  # cosine similarity below which a passage is not used
+
+# Server Configuration (gunicorn.conf.py)
+SERVER_BIND = os.environ.get("CHATBOT_BIND", "0.0.0.0:8000")
+SERVER_WORKERS = int(os.environ.get("CHATBOT_WORKERS", "0"))  # 0 = one per available core
+SERVER_GRACEFUL_TIMEOUT = int(os.environ.get("CHATBOT_GRACEFUL_TIMEOUT", "30"))  # seconds to drain on SIGTERM
+SERVER_MAX_REQUESTS = int(os.environ.get("CHATBOT_MAX_REQUESTS", "10000"))  # requests before a worker is recycled
+SERVER_MAX_REQUESTS_JITTER = 1000  # spreads recycling so workers do not restart together
+SERVER_KEEPALIVE = 5  # seconds an idle client connection is kept open
+READY_CHECK_TIMEOUT = 3.0  # seconds for the upstream probe reported by /ready
+READY_CHECK_INTERVAL = 10.0  # seconds a probe result is reused before probing again
+
+# Daemon Configuration (main.py --daemon)
+DAEMON_SOCKET_PATH = os.environ.get(
+    "CHATBOT_SOCKET",
+    os.path.join(
+        os.environ.get("XDG_RUNTIME_DIR", "/tmp"),
+        f"chatbot-{os.getuid()}.sock" if hasattr(os, "getuid") else "chatbot.sock"
+    )
+)
+DAEMON_CONNECT_TIMEOUT = 0.5  # seconds; slower and main.py --prompt works in-process instead
+DAEMON_REPLY_TIMEOUT = 120.0  # seconds main.py --prompt waits for the daemon's answer, retries included
+DAEMON_MAX_REQUEST_BYTES = 1024 * 1024  # longest request line accepted on the socket
+
+# Observability Configuration
+LOG_LEVEL = os.environ.get("CHATBOT_LOG_LEVEL", "INFO")
+SLOW_REQUEST_SECONDS = 10.0  # upstream calls slower than this are logged as warnings
+METRICS_LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)  # seconds
+STREAM_INCLUDE_USAGE = True  # ask the upstream for token usage at the end of streams
+
+# Semantic Cache Configuration
+SEMANTIC_CACHE_ENABLED = True  # reuse suggestions for near-identical recent turns of a conversation
+SEMANTIC_CACHE_THRESHOLD = 0.92  # cosine similarity of the recent turns needed for a hit
+SEMANTIC_CACHE_TTL = 300  # seconds a stored response may be reused
+SEMANTIC_CACHE_MAX_ENTRIES = 20000  # vectors kept across all conversations before LRU eviction
+SEMANTIC_CACHE_MAX_PER_CONVERSATION = 8  # responses kept per conversation
+SEMANTIC_CACHE_TURNS = 3  # most recent turns embedded as the cache key
+SEMANTIC_CACHE_DIM = 512  # dimensions of the hashing embedder
+
+# Suggestions Mode Configuration
+SUGGESTION_COUNT = 3  # suggestions returned per request; the upstream stream is stopped once reached
+SUGGESTION_MAX_COUNT = 10  # largest 'count' a request may ask for
+SUGGESTION_MAX_CHARS = 200  # longer lines are not accepted as suggestions
+SUGGESTIONS_SYSTEM_PROMPT = (
+    "Reply with the suggestions only, one per line, with no numbering, preamble or explanation."
+)
+
+# Local Inference Configuration (llama-cpp-python, optional)
+LOCAL_MODEL_NAME = os.environ.get("CHATBOT_LOCAL_MODEL", "local")  # model name routed to the in-process engine
+LOCAL_MODEL_PATH = os.environ.get("CHATBOT_LOCAL_MODEL_PATH")  # quantised GGUF file; local engine is off if unset
+LOCAL_THREADS = int(os.environ.get("CHATBOT_LOCAL_THREADS", "0"))  # CPU threads per generation, 0 = available cores
+LOCAL_CONTEXT_SIZE = 2048  # tokens of prompt plus completion
+LOCAL_MAX_QUEUE = 16  # generations waiting for the engine before new ones are rejected
+
+# Model Routing Configuration
+ROUTING_ENABLED = True
+MODEL_TIERS = {
+    "small": os.environ.get("CHATBOT_SMALL_MODEL", "meta/llama-3.1-8b-instruct"),  # LOCAL_MODEL_NAME to serve in-process
+    "large": os.environ.get("CHATBOT_LARGE_MODEL", DEFAULT_MODEL),
+}
+TASK_TIERS = {"suggestions": "small", "summary": "small", "chat": "large"}  # other tasks use "large"
+ROUTING_SMALL_MAX_PROMPT_CHARS = 6000  # longer prompts are sent to the large tier
+
+# Hedged Request Configuration
+HEDGE_ENABLED = True
+HEDGE_BASE_URL = os.environ.get("CHATBOT_HEDGE_BASE_URL")  # second endpoint for hedges, same one if unset
+HEDGE_MODELS = {  # model each tier hedges with
+    "small": os.environ.get("CHATBOT_SMALL_HEDGE_MODEL", MODEL_TIERS["small"]),
+    "large": os.environ.get("CHATBOT_LARGE_HEDGE_MODEL", MODEL_TIERS["large"]),
+}
+HEDGE_QUANTILE = 0.95  # hedge once a call is slower than this quantile of recent calls to its model
+HEDGE_INITIAL_DELAY = 3.0  # seconds, until HEDGE_MIN_SAMPLES latencies have been seen
+HEDGE_MIN_DELAY = 0.5  # seconds
+HEDGE_MAX_DELAY = 10.0  # seconds
+HEDGE_WINDOW = 200  # recent calls kept per model for the quantile and the hedge ratio
+HEDGE_MIN_SAMPLES = 20
+HEDGE_MAX_RATIO = 0.1  # share of recent calls that may be hedged, so a slow upstream is not sent double load
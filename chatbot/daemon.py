@@ -0,0 +1,217 @@
+"""
+Resident chatbot daemon and its client.
+
+Spawning ``main.py --prompt`` per request pays Python start-up, the openai
+import and client construction before any network I/O. ``main.py --daemon``
+instead keeps one ChatService, with its warm upstream connections and
+caches, listening on a Unix socket; ``main.py --prompt`` sends its prompt
+there and only works in-process when no daemon is listening.
+
+Protocol: one JSON object per line each way. A request has 'prompt' and
+optional 'max_tokens', 'temperature' and 'top_p'; the reply has 'content',
+or 'error' and 'status'.
+
+Only the standard library is imported at module level so the client path
+stays fast; the chat service is imported by the server.
+"""
+
+import json
+import os
+import socket
+from typing import Any, Dict, Optional
+from config import (
+    DAEMON_SOCKET_PATH, DAEMON_CONNECT_TIMEOUT, DAEMON_REPLY_TIMEOUT, DAEMON_MAX_REQUEST_BYTES
+)
+
+
+def request_completion(payload: Dict[str, Any], path: str = DAEMON_SOCKET_PATH) -> Optional[Dict[str, Any]]:
+    """
+    Send a prompt to the daemon and wait for its reply.
+
+    Args:
+        payload: Request with 'prompt' and optional sampling parameters
+        path: Socket the daemon listens on
+
+    Returns:
+        Optional[Dict[str, Any]]: The reply, or None if no daemon is listening
+
+    Raises:
+        ConnectionError: If the daemon accepted the request but closed the connection without a reply
+        OSError: If the daemon accepted the request but did not answer in time
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    with sock:
+        sock.settimeout(DAEMON_CONNECT_TIMEOUT)
+        try:
+            sock.connect(path)
+        except OSError:
+            # No daemon, or a stale socket left by one that died
+            return None
+
+        sock.settimeout(DAEMON_REPLY_TIMEOUT)
+        sock.sendall(json.dumps(payload).encode("utf-8") + b"\n")
+        with sock.makefile("rb") as reply:
+            line = reply.readline()
+    # Once the daemon has the prompt it may already have called upstream, so a
+    # lost reply is an error rather than a reason to run the prompt again
+    if not line.endswith(b"\n"):
+        raise ConnectionError("Chatbot daemon closed the connection without a complete reply")
+    return json.loads(line)
+
+
+def is_running(path: str = DAEMON_SOCKET_PATH) -> bool:
+    """
+    Check whether a daemon is listening on a socket.
+
+    Args:
+        path: Socket path
+
+    Returns:
+        bool: True if a connection was accepted
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(DAEMON_CONNECT_TIMEOUT)
+        try:
+            sock.connect(path)
+        except OSError:
+            return False
+        return True
+
+
+async def answer(chat_service, line: bytes, logger) -> Dict[str, Any]:
+    """
+    Answer one request line. Every request gets a reply, so a client never
+    mistakes a failure for a missing daemon and runs the prompt again itself.
+
+    Args:
+        chat_service: ChatService of the daemon
+        line: JSON request
+        logger: Logger for unexpected failures
+
+    Returns:
+        Dict[str, Any]: Reply with 'content', or 'error' and 'status'
+    """
+    import logging
+    from errors import ChatServiceError
+    from metrics import log_event
+    from utils import create_user_message
+
+    try:
+        request = json.loads(line)
+        completion = await chat_service.acreate_completion(
+            [create_user_message(request["prompt"])],
+            max_tokens=request.get("max_tokens"),
+            temperature=request.get("temperature"),
+            top_p=request.get("top_p")
+        )
+        return {"content": chat_service.get_response_content(completion)}
+    except ChatServiceError as e:
+        return {"error": str(e), "status": e.status_code}
+    except (ValueError, KeyError, TypeError) as e:
+        return {"error": f"Invalid request: {e}", "status": 400}
+    except Exception as e:
+        log_event(logger, "daemon_error", logging.ERROR, error_type=type(e).__name__, error=str(e))
+        return {"error": str(e), "status": 500}
+
+
+async def handle_connection(chat_service, logger, reader, writer):
+    """
+    Serve requests from one client connection until it closes.
+
+    Args:
+        chat_service: ChatService of the daemon
+        logger: Logger for unexpected failures
+        reader: asyncio.StreamReader of the connection
+        writer: asyncio.StreamWriter of the connection
+    """
+    try:
+        while True:
+            try:
+                line = await reader.readline()
+            except ValueError:
+                # Longer than DAEMON_MAX_REQUEST_BYTES; the stream cannot be resynchronised
+                writer.write(json.dumps({"error": "Request too large", "status": 413}).encode("utf-8") + b"\n")
+                break
+            if not line:
+                break
+            reply = await answer(chat_service, line, logger)
+            writer.write(json.dumps(reply).encode("utf-8") + b"\n")
+            await writer.drain()
+    except ConnectionError:
+        # Client went away
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(path: str = DAEMON_SOCKET_PATH):
+    """
+    Run the daemon until SIGTERM or SIGINT.
+
+    Args:
+        path: Socket to listen on, readable and writable by this user only
+
+    Raises:
+        SystemExit: If another daemon already listens on the socket
+    """
+    import asyncio
+    import functools
+    import logging
+    import signal
+    from chat_service import ChatService
+    from metrics import get_logger, log_event
+
+    logger = get_logger("daemon")
+    if os.path.exists(path):
+        if is_running(path):
+            raise SystemExit(f"A chatbot daemon is already listening on {path}")
+        os.unlink(path)
+
+    chat_service = ChatService()
+    # Opens the upstream connection now rather than on the first prompt
+    check = await chat_service.client.acheck_upstream()
+
+    previous_umask = os.umask(0o177)
+    try:
+        server = await asyncio.start_unix_server(
+            functools.partial(handle_connection, chat_service, logger),
+            path=path,
+            limit=DAEMON_MAX_REQUEST_BYTES
+        )
+    finally:
+        os.umask(previous_umask)
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+
+    log_event(logger, "daemon_started", logging.INFO, socket=path, upstream_ready=check["ready"])
+    try:
+        await stop.wait()
+    finally:
+        server.close()
+        if os.path.exists(path):
+            os.unlink(path)
+        await server.wait_closed()
+        await chat_service.aclose()
+        log_event(logger, "daemon_stopped", logging.INFO, socket=path)
+
+
+def run(path: str = DAEMON_SOCKET_PATH):
+    """
+    Run the daemon in the foreground.
+
+    Args:
+        path: Socket to listen on
+    """
+    import asyncio
+
+    asyncio.run(serve(path))
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,31 @@
+"""
+Exception types raised by the chat service.
+"""
+
+
+class ChatServiceError(Exception):
+    """Base error for failed chat completions."""
+
+    status_code = 500
+
+
+class UpstreamRateLimitError(ChatServiceError):
+    """The upstream rejected the call with HTTP 429."""
+
+    status_code = 429
+
+
+class UpstreamTimeoutError(ChatServiceError):
+    """The upstream did not answer within the configured timeout."""
+
+    status_code = 504
+
+
+class UpstreamUnavailableError(ChatServiceError):
+    """The upstream returned a 5xx response or could not be reached."""
+
+    status_code = 503
+
+
+class CircuitOpenError(UpstreamUnavailableError):
+    """The circuit breaker is open, so the call was not attempted."""
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+OpenAI-compatible stand-in for the NVIDIA NIM API, for benchmarks and offline testing.
+
+Answers /v1/chat/completions (plain and streamed) and /v1/models with
+configurable latency, token rate and error rate, so the chat service can be
+measured without spending upstream quota:
+
+    python fake_nim.py --port 9100 --latency 0.3 --token-rate 50 --error-rate 0.01
+    NVIDIA_BASE_URL=http://127.0.0.1:9100/v1 python http_server.py 8000
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from typing import Any, Dict
+from quart import Quart, request, jsonify, Response
+
+app = Quart(__name__)
+
+# Replaced from the command line
+settings = {
+    "latency": 0.3,
+    "jitter": 0.1,
+    "token_rate": 0.0,
+    "tokens": 32,
+    "error_rate": 0.0,
+    "error_status": 503,
+}
+
+WORDS = ("you", "are", "not", "alone", "it", "is", "okay", "to", "feel", "this", "way", "talk", "to", "someone")
+WORDS_PER_LINE = 8
+
+
+def sample_latency() -> float:
+    """Seconds before the first token, uniformly jittered around the configured latency."""
+    jitter = settings["jitter"] * settings["latency"]
+    return max(0.0, settings["latency"] + random.uniform(-jitter, jitter))
+
+
+def token_delay() -> float:
+    """Seconds between generated tokens, 0 for instant generation."""
+    return 1.0 / settings["token_rate"] if settings["token_rate"] > 0 else 0.0
+
+
+def completion_tokens(max_tokens: int) -> list:
+    """The tokens of a canned reply of short lines, at most max_tokens long."""
+    count = min(settings["tokens"], max_tokens or settings["tokens"])
+    return [
+        WORDS[i % len(WORDS)] + ("\n" if (i + 1) % WORDS_PER_LINE == 0 else " ")
+        for i in range(count)
+    ]
+
+
+def usage(messages: list, tokens: list) -> Dict[str, int]:
+    """Token usage, counting roughly four characters per prompt token."""
+    prompt_tokens = sum(len(m.get("content") or "") for m in messages) // 4 + 1
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": len(tokens),
+        "total_tokens": prompt_tokens + len(tokens),
+    }
+
+
+def error_response() -> Response:
+    """An OpenAI-style error body with the configured status."""
+    status = settings["error_status"]
+    response = jsonify({"error": {"message": "Injected failure", "type": "server_error", "code": status}})
+    response.status_code = status
+    if status == 429:
+        response.headers["Retry-After"] = "1"
+    return response
+
+
+@app.route('/v1/models', methods=['GET'])
+async def models():
+    """List the single fake model."""
+    return jsonify({"object": "list", "data": [{"id": "fake-nim", "object": "model", "owned_by": "bench"}]})
+
+
+@app.route('/v1/chat/completions', methods=['POST'])
+async def chat_completions():
+    """Answer a chat completion after the configured delays."""
+    body = await request.get_json()
+    if random.random() < settings["error_rate"]:
+        await asyncio.sleep(sample_latency())
+        return error_response()
+
+    completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+    created = int(time.time())
+    model = body.get("model", "fake-nim")
+    messages = body.get("messages", [])
+    tokens = completion_tokens(body.get("max_tokens"))
+
+    if body.get("stream"):
+        include_usage = (body.get("stream_options") or {}).get("include_usage", False)
+
+        def chunk(delta: Dict[str, Any], finish_reason: str = None, extra: Dict[str, Any] = None) -> str:
+            payload = {
+                "id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}] if delta is not None else [],
+            }
+            payload.update(extra or {})
+            return f"data: {json.dumps(payload)}\n\n"
+
+        async def events():
+            await asyncio.sleep(sample_latency())
+            yield chunk({"role": "assistant", "content": ""})
+            delay = token_delay()
+            for token in tokens:
+                if delay:
+                    await asyncio.sleep(delay)
+                yield chunk({"content": token})
+            yield chunk({}, finish_reason="stop")
+            if include_usage:
+                yield chunk(None, extra={"usage": usage(messages, tokens)})
+            yield "data: [DONE]\n\n"
+
+        response = Response(events(), mimetype='text/event-stream')
+        response.timeout = None
+        return response
+
+    await asyncio.sleep(sample_latency() + token_delay() * len(tokens))
+    return jsonify({
+        "id": completion_id,
+        "object": "chat.completion",
+        "created": created,
+        "model": model,
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": "".join(tokens).strip()},
+            "finish_reason": "stop",
+        }],
+        "usage": usage(messages, tokens),
+    })
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Fake NVIDIA NIM (OpenAI-compatible) server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency", type=float, default=settings["latency"], help="seconds before the first token")
+    parser.add_argument("--jitter", type=float, default=settings["jitter"], help="relative latency jitter, 0-1")
+    parser.add_argument("--token-rate", type=float, default=settings["token_rate"], help="tokens per second, 0 for instant")
+    parser.add_argument("--tokens", type=int, default=settings["tokens"], help="completion length in tokens")
+    parser.add_argument("--error-rate", type=float, default=settings["error_rate"], help="fraction of calls that fail")
+    parser.add_argument("--error-status", type=int, default=settings["error_status"], help="HTTP status of failures")
+    return parser.parse_args(argv)
+
+
+if __name__ == '__main__':
+    import uvicorn
+
+    args = parse_args()
+    for name in settings:
+        settings[name] = getattr(args, name)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
@@ -0,0 +1,77 @@
+"""
+Gunicorn configuration for the chatbot HTTP server.
+
+    gunicorn -c gunicorn.conf.py http_server:app
+
+The app and its ChatService (client, cache, retrieval index) are loaded once
+in the master and shared copy-on-write by the forked workers; each worker
+then reopens its SQLite connections. Settings come from config.py and can
+be overridden with the CHATBOT_* environment variables.
+
+Workers write Prometheus samples to PROMETHEUS_MULTIPROC_DIR so /metrics,
+whichever worker answers it, reports the whole server.
+"""
+
+import glob
+import os
+import tempfile
+
+from config import (
+    SERVER_BIND, SERVER_WORKERS, SERVER_GRACEFUL_TIMEOUT, SERVER_KEEPALIVE,
+    SERVER_MAX_REQUESTS, SERVER_MAX_REQUESTS_JITTER, REQUEST_TIMEOUT
+)
+
+
+def available_cpus() -> int:
+    """
+    Count the cores this process may use, honouring a container CPU limit.
+
+    Returns:
+        int: Usable cores, at least 1
+    """
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+    try:
+        # cgroup v2: "<quota> <period>" or "max <period>"
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            cpus = min(cpus, max(1, int(quota) // int(period)))
+    except (OSError, ValueError):
+        pass
+    return max(1, cpus)
+
+
+# Must be set before the app (and prometheus_client) is loaded
+metrics_dir = os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "chatbot-metrics"))
+os.makedirs(metrics_dir, exist_ok=True)
+for stale in glob.glob(os.path.join(metrics_dir, "*.db")):
+    os.remove(stale)
+
+bind = SERVER_BIND
+worker_class = "worker.ChatbotWorker"
+workers = SERVER_WORKERS or available_cpus()
+preload_app = True
+
+# Workers are recycled after a bounded number of requests to cap slow leaks
+max_requests = SERVER_MAX_REQUESTS
+max_requests_jitter = SERVER_MAX_REQUESTS_JITTER
+
+graceful_timeout = SERVER_GRACEFUL_TIMEOUT
+# Heartbeat timeout: a worker blocked longer than a full upstream call is restarted
+timeout = int(REQUEST_TIMEOUT * 2)
+keepalive = SERVER_KEEPALIVE
+
+accesslog = "-"
+errorlog = "-"
+
+
+def post_fork(server, worker):
+    """Give each worker its own SQLite connections."""
+    import http_server
+    http_server.chat_service.after_fork()
+
+
+def child_exit(server, worker):
+    """Stop reporting the live gauges of a worker that has exited."""
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
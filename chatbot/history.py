@@ -0,0 +1,176 @@
+"""
+Conversation history management with a token budget and rolling summary.
+"""
+
+import math
+import re
+from typing import Callable, Dict, List, Optional
+from config import HISTORY_TOKEN_BUDGET, HISTORY_SUMMARY_MAX_TOKENS
+from utils import create_system_message
+
+# Word runs and single punctuation marks, roughly how BPE tokenizers split text
+TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+# Per-message overhead for the role and chat template markers
+MESSAGE_OVERHEAD_TOKENS = 4
+
+Summarizer = Callable[[Optional[str], List[Dict[str, str]]], str]
+
+
+def count_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens in a piece of text.
+
+    Long words count as one token per four characters, matching the usual
+    BPE average closely enough for budgeting without loading a tokenizer.
+
+    Args:
+        text: Text to measure
+
+    Returns:
+        int: Estimated token count
+    """
+    return sum(math.ceil(len(piece) / 4) for piece in TOKEN_PATTERN.findall(text))
+
+
+def count_message_tokens(message: Dict[str, str]) -> int:
+    """
+    Estimate the tokens a message contributes to a prompt.
+
+    Args:
+        message: Message dictionary with 'role' and 'content'
+
+    Returns:
+        int: Estimated token count including template overhead
+    """
+    return count_tokens(message["content"]) + MESSAGE_OVERHEAD_TOKENS
+
+
+def truncate_summary(previous: Optional[str], messages: List[Dict[str, str]]) -> str:
+    """
+    Summarize evicted turns without a model call by keeping each turn's opening.
+
+    Used when no model-backed summarizer is supplied.
+
+    Args:
+        previous: The existing rolling summary, if any
+        messages: Turns that just left the window
+
+    Returns:
+        str: Updated summary within HISTORY_SUMMARY_MAX_TOKENS
+    """
+    lines = [previous] if previous else []
+    for message in messages:
+        first_sentence = re.split(r"(?<=[.!?])\s", message["content"].strip(), maxsplit=1)[0]
+        lines.append(f"{message['role']}: {first_sentence}")
+
+    # Drop the oldest lines first so the most recent context survives
+    while len(lines) > 1 and count_tokens("\n".join(lines)) > HISTORY_SUMMARY_MAX_TOKENS:
+        lines.pop(0)
+    return "\n".join(lines)
+
+
+class ConversationHistory:
+    """
+    Sliding window of recent turns kept under a token budget.
+
+    Turns that fall out of the window are folded into a rolling summary,
+    which is only recomputed when the window has shifted since the last
+    prompt was built. Token counts are cached per message so appending a
+    turn costs time proportional to that turn only.
+    """
+
+    def __init__(
+        self,
+        token_budget: int = None,
+        summarizer: Summarizer = None,
+        system_message: Optional[Dict[str, str]] = None
+    ):
+        """
+        Initialize the conversation history.
+
+        Args:
+            token_budget: Maximum prompt tokens for summary plus window
+            summarizer: Callable(previous_summary, evicted_messages) -> summary
+            system_message: Optional system message always sent first
+        """
+        self.token_budget = token_budget or HISTORY_TOKEN_BUDGET
+        self.summarizer = summarizer or truncate_summary
+        self.system_message = system_message
+        self.summary: Optional[str] = None
+        self._window: List[Dict[str, str]] = []
+        self._window_tokens: List[int] = []
+        self._total_tokens = 0
+        self._evicted: List[Dict[str, str]] = []
+
+    @property
+    def window_budget(self) -> int:
+        """Tokens available to the verbatim window after reserving room for the summary."""
+        reserved = HISTORY_SUMMARY_MAX_TOKENS + MESSAGE_OVERHEAD_TOKENS
+        if self.system_message:
+            reserved += count_message_tokens(self.system_message)
+        return max(self.token_budget - reserved, 0)
+
+    @property
+    def token_count(self) -> int:
+        """Estimated tokens currently held in the verbatim window."""
+        return self._total_tokens
+
+    def append(self, message: Dict[str, str]):
+        """
+        Add a turn, evicting the oldest turns if the window exceeds its budget.
+
+        The newest turn is always kept, even if it alone exceeds the budget.
+
+        Args:
+            message: Message dictionary with 'role' and 'content'
+        """
+        tokens = count_message_tokens(message)
+        self._window.append(message)
+        self._window_tokens.append(tokens)
+        self._total_tokens += tokens
+
+        while len(self._window) > 1 and self._total_tokens > self.window_budget:
+            self._evicted.append(self._window.pop(0))
+            self._total_tokens -= self._window_tokens.pop(0)
+
+    def extend(self, messages: List[Dict[str, str]]):
+        """
+        Add several turns in order.
+
+        Args:
+            messages: Message dictionaries to append
+        """
+        for message in messages:
+            self.append(message)
+
+    def get_messages(self) -> List[Dict[str, str]]:
+        """
+        Build the prompt messages: system message, rolling summary, then recent turns.
+
+        Returns:
+            List[Dict[str, str]]: Messages to send to the chat API
+        """
+        if self._evicted:
+            # The window shifted since the last prompt, so fold the evicted turns in
+            self.summary = self.summarizer(self.summary, self._evicted)
+            self._evicted = []
+
+        messages = []
+        if self.system_message:
+            messages.append(self.system_message)
+        if self.summary:
+            messages.append(create_system_message(f"Summary of the earlier conversation:\n{self.summary}"))
+        messages.extend(self._window)
+        return messages
+
+    def clear(self):
+        """Forget every turn and the summary."""
+        self.summary = None
+        self._window = []
+        self._window_tokens = []
+        self._total_tokens = 0
+        self._evicted = []
+
+    def __len__(self) -> int:
+        return len(self._window)
@@ -1,61 +1,367 @@
 #!/usr/bin/env python3
 """
 Simple HTTP server for the chatbot service to handle backend requests.
+
+The app is ASGI (Quart) so that many completions can be in flight per
+process while they wait on the upstream API. In production it is served by
+gunicorn with one uvicorn worker per core (see gunicorn.conf.py); running
+this file directly starts a single-process development server.
 """
 
+import asyncio
 import json
+import logging
 import sys
-from flask import Flask, request, jsonify
+from typing import Any, Dict, List, Optional, Tuple
+from quart import Quart, request, jsonify, Response
 from chat_service import ChatService
+from config import (
+    DEFAULT_STREAM, BATCH_MAX_ITEMS, BATCH_MAX_CONCURRENCY, RETRIEVAL_ENABLED, SUGGESTION_COUNT,
+    SUGGESTION_MAX_COUNT, REQUEST_MAX_TOKENS
+)
+from errors import ChatServiceError
+from local_backend import LocalBackend
+from metrics import get_logger, log_event, render_metrics
 from utils import create_user_message
 
-app = Flask(__name__)
+app = Quart(__name__)
+logger = get_logger("http_server")
 
 # Initialize the chat service
 chat_service = ChatService()
 
+# Set once this worker has finished starting up and accepts requests
+serving = False
+
+
+def parse_number(data: Dict[str, Any], key: str, default: Any, low: float, high: float, integer: bool = False) -> Any:
+    """
+    Read a numeric request field and check its range.
+
+    Args:
+        data: Parsed JSON body
+        key: Field name
+        default: Value when the field is absent
+        low: Smallest accepted value
+        high: Largest accepted value
+        integer: Whether only whole numbers are accepted
+
+    Returns:
+        The field's value, or default
+
+    Raises:
+        ValueError: If the field is not a number of the right kind or is out of range
+    """
+    value = data.get(key, default)
+    kinds = (int,) if integer else (int, float)
+    if isinstance(value, bool) or not isinstance(value, kinds) or not low <= value <= high:
+        kind = "an integer" if integer else "a number"
+        raise ValueError(f"'{key}' must be {kind} between {low} and {high}")
+    return value
+
+
+def parse_generate_request(data: Dict[str, Any]) -> Tuple[List[Dict[str, str]], Dict[str, Any]]:
+    """
+    Build the messages and completion parameters for a /generate request body.
+
+    Args:
+        data: Parsed JSON body containing 'prompt', optional sampling parameters,
+            'retrieval' (false to skip retrieved context), 'conversation_id'
+            with the recent turns in 'context' (enables the semantic cache),
+            'format': 'json' with an optional 'count' for suggestions mode and
+            'task' to route other requests to a model tier
+
+    Returns:
+        Tuple of (messages, completion keyword arguments)
+
+    Raises:
+        ValueError: If a sampling parameter or 'count' is invalid
+    """
+    # Checked before retrieval so a bad request costs nothing
+    params = {
+        "max_tokens": parse_number(data, 'max_tokens', 100, 1, REQUEST_MAX_TOKENS, integer=True),
+        "temperature": parse_number(data, 'temperature', 0.5, 0, 2),
+        "top_p": parse_number(data, 'top_p', 0.7, 0, 1),
+    }
+    if data.get('format') == 'json':
+        params["count"] = parse_number(data, 'count', SUGGESTION_COUNT, 1, SUGGESTION_MAX_COUNT, integer=True)
+    elif data.get('task') is not None:
+        params["task"] = str(data['task'])
+
+    messages = [create_user_message(data['prompt'])]
+    if data.get('retrieval', RETRIEVAL_ENABLED):
+        messages = chat_service.add_retrieved_context(messages)
+    if data.get('conversation_id') is not None:
+        params["conversation_id"] = str(data['conversation_id'])
+        params["context"] = parse_context(data.get('context'))
+    return messages, params
+
+
+def parse_context(context: Any) -> Optional[List[str]]:
+    """
+    Normalise the recent turns sent with a request for the semantic cache.
+
+    Args:
+        context: A string, a list of strings or a list of {'role', 'content'} messages
+
+    Returns:
+        Optional[List[str]]: One "role: content" line per turn, or None if absent
+    """
+    if not context:
+        return None
+    if isinstance(context, str):
+        return context.splitlines()
+    return [
+        f"{turn.get('role', 'user')}: {turn.get('content', '')}" if isinstance(turn, dict) else str(turn)
+        for turn in context
+    ]
+
+
+def format_sse(payload: Dict[str, Any], event: str = None) -> str:
+    """
+    Format a payload as a server-sent event frame.
+
+    Args:
+        payload: JSON-serialisable event data
+        event: Optional event name
+
+    Returns:
+        str: The encoded SSE frame
+    """
+    frame = f"event: {event}\n" if event else ""
+    return frame + f"data: {json.dumps(payload)}\n\n"
+
+
+def stream_response(messages: List[Dict[str, str]], params: Dict[str, Any]) -> Response:
+    """
+    Stream completion tokens to the client as server-sent events.
+
+    Args:
+        messages: Messages to send upstream
+        params: Completion keyword arguments
+
+    Returns:
+        Response: A text/event-stream response
+    """
+    # Streamed replies are not cached
+    params = {k: v for k, v in params.items() if k not in ('conversation_id', 'context', 'count')}
+
+    async def events():
+        try:
+            async for delta in chat_service.astream_completion(messages, **params):
+                yield format_sse({"content": delta})
+            yield format_sse({}, event="done")
+        except ChatServiceError as e:
+            log_event(logger, "generate_stream_failed", logging.ERROR, error=str(e), status=e.status_code)
+            yield format_sse({"error": str(e), "status": e.status_code}, event="error")
+        except Exception as e:
+            logger.exception("generate_stream_failed")
+            yield format_sse({"error": str(e)}, event="error")
+
+    response = Response(events(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    response.timeout = None
+    return response
+
+async def generate_batch_item(
+    index: int,
+    item: Dict[str, Any],
+    semaphore: asyncio.Semaphore
+) -> Dict[str, Any]:
+    """
+    Generate one batch item, reporting failures in the result instead of raising.
+
+    Args:
+        index: Position of the item in the request
+        item: Request body for this item, as accepted by /generate
+        semaphore: Limits how many items of the batch run at once
+
+    Returns:
+        Dict[str, Any]: Result record with 'content' (or 'suggestions') or 'error'
+    """
+    result = {"index": index, "id": item.get('id', index)}
+    try:
+        if 'prompt' not in item:
+            raise ValueError("Missing prompt")
+        messages, params = parse_generate_request(item)
+        async with semaphore:
+            if item.get('format') == 'json':
+                result["suggestions"] = await chat_service.agenerate_suggestions(messages, **params)
+            else:
+                completion = await chat_service.acreate_completion(messages, **params)
+                result["content"] = chat_service.get_response_content(completion).strip()
+    except ChatServiceError as e:
+        result["error"] = str(e)
+        result["status"] = e.status_code
+    except Exception as e:
+        result["error"] = str(e)
+        result["status"] = 400 if isinstance(e, ValueError) else 500
+    return result
+
+
 @app.route('/health', methods=['GET'])
-def health():
+async def health():
     """Health check endpoint."""
-    return jsonify({"status": "ok", "service": "chatbot"})
+    # Only backends that call a remote upstream have a circuit breaker
+    breaker = getattr(chat_service.client, 'breaker', None)
+    payload = {
+        "status": "ok",
+        "service": "chatbot",
+        "upstream": breaker.state if breaker is not None else None,
+    }
+    if chat_service.cache is not None:
+        payload["cache"] = chat_service.cache.stats()
+    if chat_service.semantic_cache is not None:
+        payload["semantic_cache"] = chat_service.semantic_cache.stats()
+    if chat_service.retriever is not None:
+        payload["retrieval"] = chat_service.retriever.meta
+    if chat_service.router is not None:
+        payload["routing"] = chat_service.router.stats()
+    if isinstance(chat_service.local_backend, LocalBackend):
+        payload["local"] = chat_service.local_backend.stats()
+    return jsonify(payload)
+
+@app.before_serving
+async def mark_serving():
+    """Report the worker ready once startup is done."""
+    global serving
+    serving = True
+
+@app.route('/ready', methods=['GET'])
+async def ready():
+    """
+    Readiness endpoint: 503 until this worker is serving.
+    
+    The upstream check is reported but does not affect readiness. During an
+    upstream outage the pod must stay in the Service endpoints so callers get
+    the circuit breaker's fast, typed 503 and can fall back, instead of
+    connection errors.
+    """
+    check = await chat_service.client.acheck_upstream()
+    payload = {"ready": serving, "upstream": check["upstream"], "upstream_ready": check["ready"]}
+    if "error" in check:
+        payload["upstream_error"] = check["error"]
+    return jsonify(payload), 200 if serving else 503
+
+@app.route('/metrics', methods=['GET'])
+async def metrics():
+    """Prometheus metrics of all workers."""
+    body, content_type = render_metrics()
+    return Response(body, content_type=content_type)
+
+@app.after_serving
+async def close_upstream():
+    """Close upstream connections and local engines when the worker shuts down."""
+    await chat_service.aclose()
 
 @app.route('/generate', methods=['POST'])
-def generate():
-    """Generate quick message suggestions."""
+async def generate():
+    """
+    Generate quick message suggestions.
+
+    Returns the reply as plain text, or {"suggestions": [...]} when the body
+    has 'format': 'json'.
+    """
     try:
-        data = request.get_json()
-        
+        data = await request.get_json()
+
         if not data or 'prompt' not in data:
             return jsonify({"error": "Missing prompt"}), 400
-        
-        prompt = data['prompt']
-        max_tokens = data.get('max_tokens', 100)
-        temperature = data.get('temperature', 0.5)
-        top_p = data.get('top_p', 0.7)
-        
-        # Create user message
-        user_message = create_user_message(prompt)
-        messages = [user_message]
-        
+
+        messages, params = parse_generate_request(data)
+
+        if data.get('format') == 'json':
+            # Suggestions mode: streamed upstream, stopped once enough lines are parsed
+            suggestions = await chat_service.agenerate_suggestions(messages, **params)
+            return jsonify({"suggestions": suggestions})
+
+        if data.get('stream', DEFAULT_STREAM):
+            return stream_response(messages, params)
+
         # Create completion with custom parameters
-        completion = chat_service.create_completion(
-            messages, 
-            max_tokens=max_tokens,
-            temperature=temperature,
-            top_p=top_p
-        )
-        
+        completion = await chat_service.acreate_completion(messages, **params)
+
         # Extract response content
         response_content = chat_service.get_response_content(completion)
-        
+
         # Return the response content
         return response_content.strip()
-        
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except ChatServiceError as e:
+        # Surface rate limits, timeouts and an open circuit so the backend can fall back
+        log_event(logger, "generate_failed", logging.ERROR, error=str(e), status=e.status_code)
+        return jsonify({"error": str(e)}), e.status_code
     except Exception as e:
-        print(f"Error in generate endpoint: {e}")
+        logger.exception("generate_failed")
         return jsonify({"error": str(e)}), 500
 
+@app.route('/generate/stream', methods=['POST'])
+async def generate_stream():
+    """Stream quick message suggestions as server-sent events."""
+    data = await request.get_json()
+
+    if not data or 'prompt' not in data:
+        return jsonify({"error": "Missing prompt"}), 400
+
+    try:
+        messages, params = parse_generate_request(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return stream_response(messages, params)
+
+@app.route('/generate/batch', methods=['POST'])
+async def generate_batch():
+    """
+    Generate suggestions for many prompts, streaming NDJSON results as they complete.
+
+    The body holds an 'items' list; each item is a /generate body (or a bare
+    prompt string) with an optional 'id' echoed back in its result. Top-level
+    sampling parameters apply to every item unless the item overrides them.
+    """
+    data = await request.get_json()
+
+    if not isinstance(data, dict) or not isinstance(data.get('items'), list):
+        return jsonify({"error": "Missing items"}), 400
+    if len(data['items']) > BATCH_MAX_ITEMS:
+        return jsonify({"error": f"Too many items (max {BATCH_MAX_ITEMS})"}), 400
+
+    defaults = {
+        k: data[k] for k in ('max_tokens', 'temperature', 'top_p', 'retrieval', 'format', 'count', 'task') if k in data
+    }
+    items = [
+        {**defaults, **(item if isinstance(item, dict) else {"prompt": item})}
+        for item in data['items']
+    ]
+    try:
+        concurrency = min(int(data.get('concurrency', BATCH_MAX_CONCURRENCY)), BATCH_MAX_CONCURRENCY)
+    except (ValueError, TypeError):
+        return jsonify({"error": "Invalid concurrency"}), 400
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def results():
+        tasks = [
+            asyncio.ensure_future(generate_batch_item(index, item, semaphore))
+            for index, item in enumerate(items)
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield json.dumps(await next_done) + "\n"
+        finally:
+            # The client went away: stop the remaining upstream calls
+            for task in tasks:
+                task.cancel()
+
+    response = Response(results(), mimetype='application/x-ndjson')
+    response.headers['X-Accel-Buffering'] = 'no'
+    response.timeout = None
+    return response
+
 if __name__ == '__main__':
+    import uvicorn
+
     port = int(sys.argv[1]) if len(sys.argv) > 1 else 8000
-    print(f"Starting chatbot HTTP server on port {port}")
-    app.run(host='0.0.0.0', port=port, debug=False)
+    log_event(logger, "server_starting", port=port)
+    uvicorn.run(app, host='0.0.0.0', port=port)
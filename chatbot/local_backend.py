@@ -0,0 +1,325 @@
+"""
+In-process CPU inference with llama.cpp.
+
+Serves a small quantised GGUF model without a network round trip, so short
+requests such as suggestions keep a predictable latency and cost nothing
+per token, and still work when the hosted upstream is out of quota.
+
+The model is loaded once per process, on first use (after the server has
+forked). Generations run one at a time on a dedicated engine thread, each
+using every available core: a llama.cpp context runs one sequence at a
+time, and parallel generations on the same cores would only slow each
+other down. Requests queue for the engine, up to LOCAL_MAX_QUEUE.
+
+Requires the optional llama-cpp-python package.
+"""
+
+import asyncio
+import importlib.util
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Dict, Iterator, Optional
+from openai.types.chat import ChatCompletion, ChatCompletionChunk
+from backend import InferenceBackend
+from config import (
+    LOCAL_MODEL_NAME, LOCAL_MODEL_PATH, LOCAL_THREADS, LOCAL_CONTEXT_SIZE, LOCAL_MAX_QUEUE,
+    REQUEST_TIMEOUT
+)
+from errors import ChatServiceError, UpstreamTimeoutError, UpstreamUnavailableError
+
+# Chat completion arguments llama.cpp understands; others (timeout, stream_options, ...) are dropped
+LLAMA_ARGUMENTS = (
+    "temperature", "top_p", "max_tokens", "stream", "stop", "seed",
+    "presence_penalty", "frequency_penalty",
+)
+
+_END = object()
+
+_models: Dict[str, Any] = {}
+_models_lock = threading.Lock()
+
+
+def available_threads() -> int:
+    """
+    Threads a generation may use.
+
+    Returns:
+        int: LOCAL_THREADS, or the number of cores this process may run on
+    """
+    if LOCAL_THREADS > 0:
+        return LOCAL_THREADS
+    return len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+
+
+def get_model(path: str) -> Any:
+    """
+    Process-wide llama.cpp model, loaded on first use.
+
+    Args:
+        path: GGUF model file
+
+    Returns:
+        llama_cpp.Llama: The loaded model
+
+    Raises:
+        UpstreamUnavailableError: If llama-cpp-python is not installed or the model cannot be loaded
+    """
+    with _models_lock:
+        if path not in _models:
+            try:
+                from llama_cpp import Llama
+            except ImportError as e:
+                raise UpstreamUnavailableError(
+                    "Local inference needs llama-cpp-python (pip install llama-cpp-python)"
+                ) from e
+            try:
+                _models[path] = Llama(
+                    model_path=path,
+                    n_ctx=LOCAL_CONTEXT_SIZE,
+                    n_threads=available_threads(),
+                    verbose=False
+                )
+            except Exception as e:
+                raise UpstreamUnavailableError(f"Could not load local model {path}: {e}") from e
+        return _models[path]
+
+
+class LocalStream:
+    """Async iterator over chunks produced on the engine thread."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        """
+        Initialize the stream.
+
+        Args:
+            loop: Event loop of the consumer
+        """
+        self._loop = loop
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._finished = False
+        self.closed = threading.Event()
+
+    def put(self, item: Any):
+        """
+        Hand a chunk, an exception or the end marker to the consumer (engine thread).
+
+        Args:
+            item: ChatCompletionChunk, exception or _END
+        """
+        try:
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, item)
+        except RuntimeError:
+            # The consumer's loop is gone
+            self.closed.set()
+
+    def __aiter__(self) -> "LocalStream":
+        return self
+
+    async def __anext__(self) -> ChatCompletionChunk:
+        if self._finished:
+            raise StopAsyncIteration
+        item = await self._queue.get()
+        if item is _END:
+            self._finished = True
+            raise StopAsyncIteration
+        if isinstance(item, BaseException):
+            self._finished = True
+            raise item
+        return item
+
+    async def close(self):
+        """Stop the generation; the engine thread notices before its next token."""
+        self._finished = True
+        self.closed.set()
+
+
+class LocalBackend(InferenceBackend):
+    """Backend running a quantised model on this machine's CPU."""
+
+    name = "local"
+
+    def __init__(self, model_name: str = None, model_path: str = None, max_queue: int = None):
+        """
+        Initialize the backend. The model itself is loaded on the first request.
+
+        Args:
+            model_name: Model name requests use to reach this backend
+            model_path: GGUF model file
+            max_queue: Generations allowed to wait for the engine
+        """
+        self.model_name = model_name or LOCAL_MODEL_NAME
+        self.model_path = model_path or LOCAL_MODEL_PATH
+        self.max_queue = max_queue or LOCAL_MAX_QUEUE
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def serves(self, model: str) -> bool:
+        """
+        Check whether a request names the local model.
+
+        Args:
+            model: Model name from a request
+
+        Returns:
+            bool: True for LOCAL_MODEL_NAME
+        """
+        return model == self.model_name
+
+    def _submit(self, func, *args) -> Future:
+        """
+        Queue work for the engine thread.
+
+        Args:
+            func: Function to run on the engine thread
+            *args: Its arguments
+
+        Returns:
+            Future: Result of func
+
+        Raises:
+            UpstreamUnavailableError: If too many generations are already waiting
+        """
+        with self._lock:
+            if self._pending >= self.max_queue:
+                raise UpstreamUnavailableError("Local inference queue is full")
+            self._pending += 1
+            if self._executor is None:
+                # Created lazily so a server that forks after building the service gets its own thread
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="local-llm")
+        future = self._executor.submit(func, *args)
+        future.add_done_callback(self._done)
+        return future
+
+    def _done(self, _future):
+        with self._lock:
+            self._pending -= 1
+
+    def _llama_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Translate OpenAI chat completion arguments to llama.cpp ones.
+
+        Args:
+            request: OpenAI chat completion arguments
+
+        Returns:
+            Dict[str, Any]: Keyword arguments for Llama.create_chat_completion
+        """
+        return {
+            "messages": request["messages"],
+            **{k: v for k, v in request.items() if k in LLAMA_ARGUMENTS and v is not None},
+        }
+
+    def _generate(self, request: Dict[str, Any]) -> ChatCompletion:
+        """Run a whole generation (engine thread)."""
+        result = get_model(self.model_path).create_chat_completion(**self._llama_request(request))
+        return ChatCompletion.model_validate({**result, "model": self.model_name})
+
+    def _generate_stream(self, request: Dict[str, Any], stream: LocalStream):
+        """Run a streamed generation, handing chunks to the consumer (engine thread)."""
+        if stream.closed.is_set():
+            # Consumer gave up while the request was queued
+            return
+        chunks: Optional[Iterator[Dict[str, Any]]] = None
+        try:
+            chunks = get_model(self.model_path).create_chat_completion(**self._llama_request(request))
+            for chunk in chunks:
+                if stream.closed.is_set():
+                    break
+                stream.put(ChatCompletionChunk.model_validate({**chunk, "model": self.model_name}))
+        except Exception as e:
+            stream.put(e if isinstance(e, ChatServiceError) else ChatServiceError(f"Local inference failed: {e}"))
+        else:
+            stream.put(_END)
+        finally:
+            if chunks is not None:
+                # Stops llama.cpp from generating tokens nobody will read
+                chunks.close()
+
+    def create(self, **request) -> ChatCompletion:
+        """
+        Run a completion on the engine, blocking until it is done.
+
+        Args:
+            **request: OpenAI chat completion arguments
+
+        Returns:
+            ChatCompletion: The completion
+
+        Raises:
+            ChatServiceError: If streaming was requested, the queue is full or generation fails
+        """
+        if request.get("stream"):
+            raise ChatServiceError("Streaming from the local model needs the async API")
+        future = self._submit(self._generate, request)
+        try:
+            return future.result(timeout=request.get("timeout", REQUEST_TIMEOUT))
+        except FutureTimeoutError as e:
+            raise UpstreamTimeoutError("Local inference timed out") from e
+        except ChatServiceError:
+            raise
+        except Exception as e:
+            raise ChatServiceError(f"Local inference failed: {e}") from e
+
+    async def acreate(self, **request) -> Any:
+        """
+        Run a completion on the engine without blocking the event loop.
+
+        Args:
+            **request: OpenAI chat completion arguments
+
+        Returns:
+            ChatCompletion, or a LocalStream of ChatCompletionChunk when streaming
+
+        Raises:
+            ChatServiceError: If the queue is full or generation fails
+        """
+        if request.get("stream"):
+            stream = LocalStream(asyncio.get_running_loop())
+            self._submit(self._generate_stream, request, stream)
+            return stream
+
+        future = asyncio.wrap_future(self._submit(self._generate, request))
+        try:
+            return await asyncio.wait_for(future, request.get("timeout", REQUEST_TIMEOUT))
+        except asyncio.TimeoutError as e:
+            raise UpstreamTimeoutError("Local inference timed out") from e
+        except ChatServiceError:
+            raise
+        except Exception as e:
+            raise ChatServiceError(f"Local inference failed: {e}") from e
+
+    async def acheck_upstream(self) -> Dict[str, Any]:
+        """
+        Check that the local model can be loaded, without loading it.
+
+        Returns:
+            Dict[str, Any]: 'ready' flag, backend name and the error if the check failed
+        """
+        result = {"ready": True, "upstream": self.name}
+        if importlib.util.find_spec("llama_cpp") is None:
+            result.update(ready=False, error="llama-cpp-python is not installed")
+        elif not self.model_path or not os.path.isfile(self.model_path):
+            result.update(ready=False, error=f"Local model file not found: {self.model_path}")
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the state of the engine.
+
+        Returns:
+            Dict[str, Any]: Statistics suitable for a health endpoint
+        """
+        with self._lock:
+            return {
+                "model": self.model_name,
+                "loaded": self.model_path in _models,
+                "queued": self._pending,
+                "threads": available_threads(),
+            }
+
+    async def aclose(self):
+        """Stop the engine thread once queued generations are done."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
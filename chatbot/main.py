@@ -1,8 +1,57 @@
 import sys
 import argparse
-from chat_service import ChatService
+from daemon import request_completion
 from utils import create_user_message, create_assistant_message, format_response
 
+# The chat service (and with it openai) is imported only where it is used,
+# so --help and prompts answered by the daemon start quickly.
+
+
+def answer_prompt(args: argparse.Namespace) -> str:
+    """
+    Answer a single prompt through the daemon, or in-process if none is running.
+    
+    Args:
+        args: Parsed command line arguments
+        
+    Returns:
+        str: The response content
+        
+    Raises:
+        RuntimeError: If the daemon replied with an error
+        OSError: If the daemon took the prompt but its reply was lost or late
+    """
+    payload = {
+        "prompt": args.prompt,
+        "max_tokens": args.max_tokens,
+        "temperature": args.temperature,
+        "top_p": args.top_p,
+    }
+    reply = request_completion(payload)
+    if reply is not None:
+        if "error" in reply:
+            raise RuntimeError(reply["error"])
+        return reply["content"]
+    
+    from chat_service import ChatService
+    
+    chat_service = ChatService()
+    
+    # Create user message
+    user_message = create_user_message(args.prompt)
+    messages = [user_message]
+    
+    # Create completion with custom parameters
+    completion = chat_service.create_completion(
+        messages, 
+        max_tokens=args.max_tokens,
+        temperature=args.temperature,
+        top_p=args.top_p
+    )
+    
+    # Extract response content
+    return chat_service.get_response_content(completion)
+
 
 def main():
     """Main function with interactive chat loop using NVIDIA NIM integration."""
@@ -13,28 +62,19 @@ def main():
     parser.add_argument('--max-tokens', type=int, default=100, help='Maximum tokens for response')
     parser.add_argument('--temperature', type=float, default=0.5, help='Sampling temperature')
     parser.add_argument('--top-p', type=float, default=0.7, help='Top-p sampling parameter')
+    parser.add_argument('--daemon', action='store_true', help='Stay resident and answer --prompt calls over a Unix socket')
     args = parser.parse_args()
     
-    # Initialize the chat service
-    chat_service = ChatService()
+    if args.daemon:
+        from daemon import run
+        
+        run()
+        return
     
     # If a prompt is provided via command line, process it and exit
     if args.prompt:
         try:
-            # Create user message
-            user_message = create_user_message(args.prompt)
-            messages = [user_message]
-            
-            # Create completion with custom parameters
-            completion = chat_service.create_completion(
-                messages, 
-                max_tokens=args.max_tokens,
-                temperature=args.temperature,
-                top_p=args.top_p
-            )
-            
-            # Extract response content
-            response_content = chat_service.get_response_content(completion)
+            response_content = answer_prompt(args)
             
             # Print only the response content (no extra formatting)
             print(response_content.strip())
@@ -46,8 +86,13 @@ def main():
         return
     
     # Interactive mode
-    # Initialize conversation history
-    messages = []
+    from chat_service import ChatService
+    from history import ConversationHistory
+    
+    chat_service = ChatService()
+    
+    # Initialize conversation history, summarizing turns that exceed the token budget
+    history = ConversationHistory(summarizer=chat_service.summarize_history)
     
     print("=== NVIDIA NIM Chatbot ===")
     print("Type 'quit', 'exit', or 'q' to end the conversation.")
@@ -66,7 +111,7 @@ def main():
             
             # Check for clear command
             if user_input.lower() == 'clear':
-                messages = []
+                history.clear()
                 print("Conversation history cleared.")
                 continue
             
@@ -76,17 +121,17 @@ def main():
             
             # Create user message and add to conversation
             user_message = create_user_message(user_input)
-            messages.append(user_message)
+            history.append(user_message)
             
             # Create completion
-            completion = chat_service.create_completion(messages)
+            completion = chat_service.create_completion(chat_service.add_retrieved_context(history.get_messages()))
             
             # Extract response content
             response_content = chat_service.get_response_content(completion)
             
             # Create assistant message and add to conversation
             assistant_message = create_assistant_message(response_content)
-            messages.append(assistant_message)
+            history.append(assistant_message)
             
             # Display the response
             print(f"\nBot: {response_content}")
@@ -0,0 +1,177 @@
+"""
+Metrics and structured logging for the chatbot service.
+
+Metrics are Prometheus collectors. Under gunicorn, PROMETHEUS_MULTIPROC_DIR
+is set (see gunicorn.conf.py) so every worker writes its samples there and
+/metrics reports the sum over all workers. Logs are one JSON object per
+line on stderr.
+"""
+
+import json
+import logging
+import os
+import sys
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator, Tuple
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram,
+    generate_latest, multiprocess
+)
+from config import LOG_LEVEL, METRICS_LATENCY_BUCKETS
+
+
+REQUEST_LATENCY = Histogram(
+    "chatbot_request_duration_seconds",
+    "End-to-end completion latency, cache lookups and retries included",
+    ["mode"], buckets=METRICS_LATENCY_BUCKETS
+)
+UPSTREAM_LATENCY = Histogram(
+    "chatbot_upstream_duration_seconds",
+    "Latency of upstream completion calls, retries included",
+    ["model"], buckets=METRICS_LATENCY_BUCKETS
+)
+TIME_TO_FIRST_TOKEN = Histogram(
+    "chatbot_time_to_first_token_seconds",
+    "Time from the upstream call to the first streamed content",
+    ["model"], buckets=METRICS_LATENCY_BUCKETS
+)
+TOKENS = Counter(
+    "chatbot_tokens",
+    "Tokens reported by the upstream",
+    ["model", "type"]
+)
+CACHE_LOOKUPS = Counter(
+    "chatbot_cache_lookups",
+    "Completion cache lookups by result",
+    ["result"]
+)
+SEMANTIC_CACHE_LOOKUPS = Counter(
+    "chatbot_semantic_cache_lookups",
+    "Conversation-scoped similarity cache lookups by result",
+    ["result"]
+)
+ROUTING_DECISIONS = Counter(
+    "chatbot_routing_decisions",
+    "Requests routed to each model tier, by task",
+    ["task", "tier"]
+)
+HEDGED_CALLS = Counter(
+    "chatbot_hedged_calls",
+    "Hedging outcomes: fired, primary/hedge won, both failed, or suppressed by the hedge ratio cap",
+    ["outcome"]
+)
+IN_FLIGHT = Gauge(
+    "chatbot_requests_in_flight",
+    "Completions currently being served",
+    ["mode"], multiprocess_mode="livesum"
+)
+ERRORS = Counter(
+    "chatbot_errors",
+    "Failed completions by error type",
+    ["type"]
+)
+RETRIES = Counter(
+    "chatbot_upstream_retries",
+    "Upstream calls retried, by the error that caused the retry",
+    ["type"]
+)
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats a record as one JSON object, merging the fields passed to log_event."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "event": record.getMessage(),
+            "pid": record.process,
+        }
+        entry.update(getattr(record, "fields", {}))
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def get_logger(name: str) -> logging.Logger:
+    """
+    Get a logger that writes JSON lines to stderr.
+
+    Args:
+        name: Logger name, usually the module name
+
+    Returns:
+        logging.Logger: Logger under the shared 'chatbot' hierarchy
+    """
+    root = logging.getLogger("chatbot")
+    if not root.handlers:
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(JsonFormatter())
+        root.addHandler(handler)
+        root.setLevel(LOG_LEVEL)
+        root.propagate = False
+    return root.getChild(name)
+
+
+def log_event(logger: logging.Logger, event: str, level: int = logging.INFO, **fields: Any):
+    """
+    Log a named event with structured fields.
+
+    Args:
+        logger: Logger from get_logger
+        event: Short snake_case event name
+        level: Logging level
+        **fields: JSON-serialisable values added to the record
+    """
+    logger.log(level, event, extra={"fields": fields})
+
+
+@contextmanager
+def track_request(mode: str) -> Iterator[None]:
+    """
+    Count a completion as in flight and record its latency and any error.
+
+    Args:
+        mode: 'sync', 'async', 'stream' or 'suggestions'
+    """
+    IN_FLIGHT.labels(mode).inc()
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        ERRORS.labels(type(e).__name__).inc()
+        raise
+    finally:
+        IN_FLIGHT.labels(mode).dec()
+        REQUEST_LATENCY.labels(mode).observe(time.perf_counter() - start)
+
+
+def record_usage(model: str, usage: Any):
+    """
+    Count the tokens of a completion.
+
+    Args:
+        model: Model that served the completion
+        usage: The completion's usage object, may be None
+    """
+    if usage is None:
+        return
+    TOKENS.labels(model, "prompt").inc(usage.prompt_tokens or 0)
+    TOKENS.labels(model, "completion").inc(usage.completion_tokens or 0)
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """
+    Render all metrics in the Prometheus text format.
+
+    Returns:
+        Tuple of (body, content type)
+    """
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
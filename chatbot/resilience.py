@@ -0,0 +1,193 @@
+"""
+Retry and circuit breaker helpers for upstream NVIDIA NIM calls.
+"""
+
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Optional
+import openai
+from config import (
+    RETRY_BASE_DELAY, RETRY_MAX_DELAY,
+    BREAKER_FAILURE_THRESHOLD, BREAKER_RESET_TIMEOUT
+)
+from errors import (
+    ChatServiceError, UpstreamRateLimitError, UpstreamTimeoutError,
+    UpstreamUnavailableError, CircuitOpenError
+)
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    After ``failure_threshold`` upstream failures in a row the breaker opens
+    and calls fail immediately. Once ``reset_timeout`` seconds have passed a
+    single trial call is let through (half-open); its outcome closes or
+    re-opens the breaker.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = None, reset_timeout: float = None):
+        """
+        Initialize the circuit breaker.
+
+        Args:
+            failure_threshold: Consecutive failures that open the breaker
+            reset_timeout: Seconds to stay open before allowing a trial call
+        """
+        self.failure_threshold = failure_threshold or BREAKER_FAILURE_THRESHOLD
+        self.reset_timeout = reset_timeout if reset_timeout is not None else BREAKER_RESET_TIMEOUT
+        self.failures = 0
+        self.opened_at = 0.0
+        self._state = self.CLOSED
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """Current breaker state, promoting open to half-open once the timeout passes."""
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self._state = self.HALF_OPEN
+                self._trial_in_flight = False
+            return self._state
+
+    def before_call(self):
+        """
+        Check whether a call may proceed.
+
+        Raises:
+            CircuitOpenError: If the breaker is open or a trial call is already running
+        """
+        state = self.state
+        with self._lock:
+            if state == self.OPEN or (state == self.HALF_OPEN and self._trial_in_flight):
+                raise CircuitOpenError("Upstream circuit is open; failing fast")
+            if state == self.HALF_OPEN:
+                self._trial_in_flight = True
+
+    def record_success(self):
+        """Close the breaker after a successful call."""
+        with self._lock:
+            self.failures = 0
+            self._state = self.CLOSED
+            self._trial_in_flight = False
+
+    def release_trial(self):
+        """Let another trial call through after one was abandoned without an outcome."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        """Count a failed call, opening the breaker at the threshold."""
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self._state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self.opened_at = time.monotonic()
+
+
+def translate_error(error: Exception) -> ChatServiceError:
+    """
+    Map an OpenAI client exception onto the chat service error hierarchy.
+
+    Args:
+        error: Exception raised by the OpenAI client
+
+    Returns:
+        ChatServiceError: The equivalent typed error
+    """
+    if isinstance(error, ChatServiceError):
+        return error
+    message = f"Error creating chat completion: {str(error)}"
+    if isinstance(error, openai.RateLimitError):
+        return UpstreamRateLimitError(message)
+    if isinstance(error, openai.APITimeoutError):
+        return UpstreamTimeoutError(message)
+    if isinstance(error, (openai.APIConnectionError, openai.InternalServerError)):
+        return UpstreamUnavailableError(message)
+    if isinstance(error, openai.APIStatusError) and error.status_code >= 500:
+        return UpstreamUnavailableError(message)
+    return ChatServiceError(message)
+
+
+def is_retryable(error: ChatServiceError) -> bool:
+    """
+    Check whether a failed call is worth retrying.
+
+    Args:
+        error: Translated chat service error
+
+    Returns:
+        bool: True for rate limits, timeouts and 5xx/connection failures
+    """
+    return isinstance(error, (UpstreamRateLimitError, UpstreamTimeoutError, UpstreamUnavailableError)) \
+        and not isinstance(error, CircuitOpenError)
+
+
+def trips_breaker(error: ChatServiceError) -> bool:
+    """
+    Check whether a failure indicates a degraded upstream.
+
+    Rate limits are quota signals handled by Retry-After, so they do not
+    count towards opening the breaker.
+
+    Args:
+        error: Translated chat service error
+
+    Returns:
+        bool: True for timeouts and 5xx/connection failures
+    """
+    return isinstance(error, (UpstreamTimeoutError, UpstreamUnavailableError)) \
+        and not isinstance(error, CircuitOpenError)
+
+
+def get_retry_after(error: Exception) -> Optional[float]:
+    """
+    Read the Retry-After header from an upstream error response.
+
+    Args:
+        error: Exception raised by the OpenAI client
+
+    Returns:
+        Optional[float]: Seconds to wait, or None if the header is absent
+    """
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+
+    value = response.headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, retry_after: float = None) -> float:
+    """
+    Compute the wait before the next attempt using full-jitter exponential backoff.
+
+    Args:
+        attempt: Zero-based index of the attempt that just failed
+        retry_after: Server-requested delay in seconds, if any
+
+    Returns:
+        float: Seconds to sleep before retrying
+    """
+    ceiling = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * (2 ** attempt))
+    delay = random.uniform(0, ceiling)
+    if retry_after is not None:
+        delay = retry_after + random.uniform(0, RETRY_BASE_DELAY)
+    return delay
@@ -0,0 +1,455 @@
+"""
+Retrieval module for grounding replies in curated passages.
+
+Curated response snippets and community events are embedded into unit
+vectors and stored on disk as a memory-mapped float32 matrix. Vectors are
+grouped into inverted lists (IVF) around k-means centroids and written
+list by list, so a query scores a few centroids and then reads a handful
+of contiguous row ranges instead of the whole matrix. Passage text lives in
+SQLite and only the top hits are read back.
+"""
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+import zlib
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from config import (
+    RETRIEVAL_INDEX_DIR, RETRIEVAL_EMBEDDER, RETRIEVAL_MODEL_NAME, RETRIEVAL_DIM,
+    RETRIEVAL_TOP_K, RETRIEVAL_NPROBE, RETRIEVAL_MIN_SCORE, RETRIEVAL_SNIPPETS_PATH,
+    RETRIEVAL_EVENTS_DB_PATH
+)
+from utils import create_system_message
+
+KMEANS_ITERATIONS = 10
+KMEANS_SAMPLE_SIZE = 20000
+EMBED_BATCH_SIZE = 1024
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9']+")
+
+
+class HashingEmbedder:
+    """Deterministic signed feature-hashing embedder over words and word bigrams."""
+
+    name = "hashing"
+
+    def __init__(self, dim: int = RETRIEVAL_DIM):
+        """
+        Initialize the embedder.
+
+        Args:
+            dim: Number of output dimensions
+        """
+        self.dim = dim
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed texts as L2-normalised rows.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            np.ndarray: float32 matrix of shape (len(texts), dim)
+        """
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            words = TOKEN_PATTERN.findall(text.lower())
+            for token in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+                h = zlib.crc32(token.encode("utf-8"))
+                vectors[row, h % self.dim] += 1.0 if h >> 31 else -1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+
+class SentenceTransformerEmbedder:
+    """Local CPU sentence-embedding model (requires sentence-transformers)."""
+
+    name = "sentence-transformers"
+
+    def __init__(self, model_name: str = RETRIEVAL_MODEL_NAME):
+        """
+        Load the model.
+
+        Args:
+            model_name: Hugging Face model name or local path
+        """
+        from sentence_transformers import SentenceTransformer
+
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self.dim = self.model.get_sentence_embedding_dimension()
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed texts as L2-normalised rows.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            np.ndarray: float32 matrix of shape (len(texts), dim)
+        """
+        return self.model.encode(texts, normalize_embeddings=True, convert_to_numpy=True).astype(np.float32)
+
+
+def get_embedder(name: str = RETRIEVAL_EMBEDDER, dim: int = RETRIEVAL_DIM):
+    """
+    Create the configured embedder.
+
+    Args:
+        name: 'hashing' or 'sentence-transformers'
+        dim: Output dimensions of the hashing embedder
+
+    Returns:
+        The embedder instance
+    """
+    if name == SentenceTransformerEmbedder.name:
+        return SentenceTransformerEmbedder()
+    return HashingEmbedder(dim)
+
+
+def _train_centroids(vectors: np.ndarray, nlist: int) -> np.ndarray:
+    """Spherical k-means on a sample of the vectors."""
+    rng = np.random.default_rng(0)
+    sample_size = min(len(vectors), KMEANS_SAMPLE_SIZE)
+    sample = np.asarray(vectors[np.sort(rng.choice(len(vectors), sample_size, replace=False))])
+    centroids = sample[rng.choice(sample_size, nlist, replace=False)].copy()
+
+    for _ in range(KMEANS_ITERATIONS):
+        assignments = (sample @ centroids.T).argmax(axis=1)
+        for j in range(nlist):
+            members = sample[assignments == j]
+            if len(members):
+                centroids[j] = members.sum(axis=0)
+        centroids /= np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12)
+    return centroids
+
+
+def build_index(documents: Iterable[Dict[str, Any]], path: str = RETRIEVAL_INDEX_DIR, embedder=None) -> Dict[str, Any]:
+    """
+    Embed documents and write a fresh index to a directory.
+
+    Documents are streamed: vectors are appended to disk batch by batch, so
+    the corpus never has to fit in memory. Every file is written under a
+    temporary name and moved into place with os.replace, meta.json last, so
+    a server that has the old index memory-mapped keeps reading intact files.
+
+    Args:
+        documents: Dicts with 'text' and optional 'id', 'source' and 'title'
+        path: Index directory
+        embedder: Embedder to use, the configured one if None
+
+    Returns:
+        Dict[str, Any]: Build statistics
+    """
+    start = time.time()
+    embedder = embedder or get_embedder()
+    os.makedirs(path, exist_ok=True)
+    raw_path = os.path.join(path, "vectors.raw")
+    docs_path = os.path.join(path, "documents.db.tmp")
+    if os.path.exists(docs_path):
+        os.remove(docs_path)
+
+    conn = sqlite3.connect(docs_path)
+    conn.execute("CREATE TABLE documents (doc_id TEXT, source TEXT, title TEXT, text TEXT NOT NULL)")
+    count = 0
+
+    def flush(batch):
+        nonlocal count
+        if not batch:
+            return
+        raw.write(embedder.embed([doc["text"] for doc in batch]).tobytes())
+        conn.executemany(
+            "INSERT INTO documents (rowid, doc_id, source, title, text) VALUES (?, ?, ?, ?, ?)",
+            [(count + i, str(doc.get("id", count + i)), doc.get("source"), doc.get("title"), doc["text"])
+             for i, doc in enumerate(batch)]
+        )
+        count += len(batch)
+
+    with open(raw_path, "wb") as raw:
+        batch = []
+        for doc in documents:
+            if doc.get("text"):
+                batch.append(doc)
+            if len(batch) >= EMBED_BATCH_SIZE:
+                flush(batch)
+                batch = []
+        flush(batch)
+    conn.commit()
+    conn.close()
+    if count == 0:
+        os.remove(raw_path)
+        os.remove(docs_path)
+        raise ValueError("No documents to index")
+
+    vectors = np.memmap(raw_path, dtype=np.float32, mode="r", shape=(count, embedder.dim))
+    nlist = max(1, int(np.sqrt(count)))
+    centroids = _train_centroids(vectors, nlist)
+
+    assignments = np.empty(count, dtype=np.int32)
+    for lo in range(0, count, EMBED_BATCH_SIZE * 8):
+        chunk = np.asarray(vectors[lo:lo + EMBED_BATCH_SIZE * 8])
+        assignments[lo:lo + len(chunk)] = (chunk @ centroids.T).argmax(axis=1)
+
+    # Rewrite the vectors list by list so each inverted list is one contiguous block
+    order = np.argsort(assignments, kind="stable").astype(np.int64)
+    offsets = np.zeros(nlist + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum(np.bincount(assignments, minlength=nlist))
+    ordered = np.memmap(os.path.join(path, "vectors.f32.tmp"), dtype=np.float32, mode="w+", shape=(count, embedder.dim))
+    for lo in range(0, count, EMBED_BATCH_SIZE * 8):
+        rows = order[lo:lo + EMBED_BATCH_SIZE * 8]
+        ordered[lo:lo + len(rows)] = vectors[rows]
+    ordered.flush()
+    del ordered, vectors
+    os.remove(raw_path)
+
+    for name, array in (("centroids.npy", centroids), ("offsets.npy", offsets), ("doc_rows.npy", order)):
+        with open(os.path.join(path, name + ".tmp"), "wb") as f:
+            np.save(f, array)
+    meta = {"count": count, "dim": embedder.dim, "nlist": nlist, "embedder": embedder.name}
+    with open(os.path.join(path, "meta.json.tmp"), "w") as f:
+        json.dump(meta, f)
+
+    for name in ("documents.db", "vectors.f32", "centroids.npy", "offsets.npy", "doc_rows.npy", "meta.json"):
+        os.replace(os.path.join(path, name + ".tmp"), os.path.join(path, name))
+
+    return {**meta, "seconds": round(time.time() - start, 3)}
+
+
+class RetrievalIndex:
+    """Read-only view of an index directory; vectors stay memory-mapped."""
+
+    def __init__(self, path: str = RETRIEVAL_INDEX_DIR, embedder=None):
+        """
+        Open an index built by build_index.
+
+        Args:
+            path: Index directory
+            embedder: Embedder matching the one used at build time, created from the index metadata if None
+        """
+        with open(os.path.join(path, "meta.json")) as f:
+            self.meta = json.load(f)
+        self.embedder = embedder or get_embedder(self.meta["embedder"], self.meta["dim"])
+        self.centroids = np.load(os.path.join(path, "centroids.npy"))
+        self.offsets = np.load(os.path.join(path, "offsets.npy"))
+        self.doc_rows = np.load(os.path.join(path, "doc_rows.npy"), mmap_mode="r")
+        self.vectors = np.memmap(
+            os.path.join(path, "vectors.f32"), dtype=np.float32, mode="r",
+            shape=(self.meta["count"], self.meta["dim"])
+        )
+        self.path = path
+        self._conn = self._connect()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def exists(path: str = RETRIEVAL_INDEX_DIR) -> bool:
+        """
+        Check whether an index has been built in a directory.
+
+        Args:
+            path: Index directory
+
+        Returns:
+            bool: True if the index can be opened
+        """
+        return os.path.exists(os.path.join(path, "meta.json"))
+
+    def search(
+        self,
+        query: str,
+        k: int = RETRIEVAL_TOP_K,
+        nprobe: int = RETRIEVAL_NPROBE,
+        min_score: float = RETRIEVAL_MIN_SCORE
+    ) -> List[Dict[str, Any]]:
+        """
+        Find the passages most similar to a query.
+
+        Args:
+            query: Query text
+            k: Number of passages to return
+            nprobe: Inverted lists to scan; more is slower but more exact
+            min_score: Minimum cosine similarity for a passage to be returned
+
+        Returns:
+            List[Dict[str, Any]]: Passages with 'id', 'source', 'title', 'text' and 'score', best first
+        """
+        q = self.embedder.embed([query])[0]
+        nprobe = min(nprobe, len(self.centroids))
+        probes = np.argpartition(-(self.centroids @ q), nprobe - 1)[:nprobe]
+
+        positions = []
+        scores = []
+        for j in probes:
+            lo, hi = int(self.offsets[j]), int(self.offsets[j + 1])
+            if hi > lo:
+                positions.append(np.arange(lo, hi))
+                scores.append(self.vectors[lo:hi] @ q)
+        if not scores:
+            return []
+
+        positions = np.concatenate(positions)
+        scores = np.concatenate(scores)
+        top = np.argpartition(-scores, min(k, len(scores)) - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        hits = [(int(self.doc_rows[positions[i]]), float(scores[i])) for i in top if scores[i] >= min_score]
+        if not hits:
+            return []
+
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT rowid, doc_id, source, title, text FROM documents WHERE rowid IN ({', '.join('?' * len(hits))})",
+                [row for row, _ in hits]
+            ).fetchall()
+        by_row = {row[0]: row[1:] for row in rows}
+        return [
+            {"id": by_row[row][0], "source": by_row[row][1], "title": by_row[row][2],
+             "text": by_row[row][3], "score": round(score, 4)}
+            for row, score in hits if row in by_row
+        ]
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Open the passage database read-only.
+
+        Returns:
+            sqlite3.Connection: Connection shared by all threads of this process
+        """
+        return sqlite3.connect(
+            f"file:{os.path.join(self.path, 'documents.db')}?mode=ro", uri=True, check_same_thread=False
+        )
+
+    def reopen(self):
+        """Replace the passage database connection, e.g. in a worker forked after the index was opened."""
+        with self._lock:
+            self._conn.close()
+            self._conn = self._connect()
+
+    def close(self):
+        """Close the passage database."""
+        self._conn.close()
+
+
+def format_context(passages: List[Dict[str, Any]]) -> Dict[str, str]:
+    """
+    Turn retrieved passages into a system message for the prompt.
+
+    Args:
+        passages: Results of RetrievalIndex.search
+
+    Returns:
+        Dict[str, str]: System message listing the passages
+    """
+    lines = []
+    for passage in passages:
+        label = passage["title"] or passage["source"] or "note"
+        lines.append(f"- [{label}] {passage['text']}")
+    return create_system_message(
+        "Relevant material you may draw on if it helps (do not quote it verbatim or mention that it was provided):\n"
+        + "\n".join(lines)
+    )
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index(path: str = RETRIEVAL_INDEX_DIR) -> Optional[RetrievalIndex]:
+    """
+    Process-wide index, opened on first use.
+
+    Args:
+        path: Index directory
+
+    Returns:
+        Optional[RetrievalIndex]: The index, or None if none has been built
+    """
+    global _index
+    with _index_lock:
+        if _index is None and RetrievalIndex.exists(path):
+            _index = RetrievalIndex(path)
+        return _index
+
+
+def load_snippets(path: str = RETRIEVAL_SNIPPETS_PATH) -> Iterable[Dict[str, Any]]:
+    """
+    Read curated response snippets (JSON lines with 'id', 'title' and 'text').
+
+    Args:
+        path: Snippets file
+
+    Yields:
+        Dict[str, Any]: Documents for build_index
+    """
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield {**json.loads(line), "source": "snippet"}
+
+
+def load_community_events(db_path: str = RETRIEVAL_EVENTS_DB_PATH) -> Iterable[Dict[str, Any]]:
+    """
+    Read community events from the backend database, if it has any.
+
+    Args:
+        db_path: Path to scrapper_data.db
+
+    Yields:
+        Dict[str, Any]: Documents for build_index
+    """
+    if not os.path.exists(db_path):
+        return
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        rows = conn.execute(
+            "SELECT id, organization_name, description, location FROM community_events"
+        ).fetchall()
+    except sqlite3.OperationalError:
+        rows = []
+    finally:
+        conn.close()
+    for event_id, organization, description, location in rows:
+        text = f"{organization}: {description}" + (f" Location: {location}." if location else "")
+        yield {"id": f"event-{event_id}", "title": organization, "text": text, "source": "community_event"}
+
+
+def main():
+    """Build the index or run a query from the command line."""
+    parser = argparse.ArgumentParser(description="Build or query the retrieval index")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="Index curated snippets and community events")
+    build.add_argument("--snippets", default=RETRIEVAL_SNIPPETS_PATH)
+    build.add_argument("--events-db", default=RETRIEVAL_EVENTS_DB_PATH)
+    build.add_argument("--index", default=RETRIEVAL_INDEX_DIR)
+    query = sub.add_parser("query", help="Show the passages retrieved for a query")
+    query.add_argument("text")
+    query.add_argument("-k", type=int, default=RETRIEVAL_TOP_K)
+    query.add_argument("--index", default=RETRIEVAL_INDEX_DIR)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        def documents():
+            yield from load_snippets(args.snippets)
+            yield from load_community_events(args.events_db)
+        print(json.dumps(build_index(documents(), args.index)))
+        return
+
+    if not RetrievalIndex.exists(args.index):
+        print(f"No index in {args.index}; run 'python retrieval.py build' first", file=sys.stderr)
+        sys.exit(1)
+    index = RetrievalIndex(args.index)
+    start = time.perf_counter()
+    results = index.search(args.text, k=args.k)
+    elapsed = (time.perf_counter() - start) * 1000
+    print(json.dumps({"milliseconds": round(elapsed, 3), "results": results}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""
+Model routing and hedged upstream calls.
+
+Each request is routed to a model tier by its task and prompt size, so
+short suggestion prompts go to a small model and long interactive chat to
+a large one. A call still unanswered after the hedge delay (a high quantile
+of recent latencies for its model) is duplicated to the tier's hedge model
+or endpoint; the first answer wins and the other call is cancelled.
+"""
+
+import asyncio
+import threading
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+from config import (
+    MODEL_TIERS, TASK_TIERS, ROUTING_SMALL_MAX_PROMPT_CHARS, HEDGE_ENABLED, HEDGE_MODELS,
+    HEDGE_QUANTILE, HEDGE_INITIAL_DELAY, HEDGE_MIN_DELAY, HEDGE_MAX_DELAY, HEDGE_WINDOW,
+    HEDGE_MIN_SAMPLES, HEDGE_MAX_RATIO
+)
+from metrics import HEDGED_CALLS, ROUTING_DECISIONS
+
+
+class ModelRouter:
+    """
+    Chooses the model for a request and runs hedged calls.
+
+    Latencies of successful calls are kept per model in a rolling window;
+    the hedge delay is their ``quantile`` (clamped), so roughly only the
+    slowest ``1 - quantile`` of calls are hedged. Hedging is also skipped
+    until ``HEDGE_MIN_SAMPLES`` calls have been seen and while more than
+    ``max_ratio`` of recent calls were hedged, which keeps a uniformly slow
+    upstream from receiving double traffic.
+    """
+
+    def __init__(
+        self,
+        tiers: Dict[str, str] = None,
+        task_tiers: Dict[str, str] = None,
+        hedge_models: Dict[str, str] = None,
+        hedge_enabled: bool = None,
+        small_max_prompt_chars: int = None
+    ):
+        """
+        Initialize the router.
+
+        Args:
+            tiers: Model name per tier ('small', 'large')
+            task_tiers: Tier per task type; unknown tasks use 'large'
+            hedge_models: Model each tier hedges with
+            hedge_enabled: Whether slow calls are hedged
+            small_max_prompt_chars: Prompt size above which the large tier is used
+        """
+        self.tiers = tiers or MODEL_TIERS
+        self.task_tiers = task_tiers or TASK_TIERS
+        self.hedge_models = hedge_models or HEDGE_MODELS
+        self.hedge_enabled = hedge_enabled if hedge_enabled is not None else HEDGE_ENABLED
+        self.small_max_prompt_chars = small_max_prompt_chars or ROUTING_SMALL_MAX_PROMPT_CHARS
+        self._latencies: Dict[str, Deque[float]] = {}
+        self._hedged: Deque[bool] = deque(maxlen=HEDGE_WINDOW)
+        self._lock = threading.Lock()
+        self.decisions: Dict[str, int] = {}
+        self.hedges = {"fired": 0, "primary": 0, "hedge": 0, "failed": 0, "suppressed": 0}
+
+    def route(self, task: str, messages: List[Dict[str, str]]) -> Tuple[str, Optional[str]]:
+        """
+        Pick the model for a request.
+
+        Args:
+            task: Task type, e.g. 'suggestions', 'summary' or 'chat'
+            messages: Messages of the request
+
+        Returns:
+            Tuple of (model, hedge model or None when hedging is off)
+        """
+        tier = self.task_tiers.get(task, "large")
+        if tier == "small" and sum(len(m["content"]) for m in messages) > self.small_max_prompt_chars:
+            tier = "large"
+
+        ROUTING_DECISIONS.labels(task, tier).inc()
+        with self._lock:
+            name = f"{task}:{tier}"
+            self.decisions[name] = self.decisions.get(name, 0) + 1
+        model = self.tiers[tier]
+        return model, (self.hedge_models.get(tier, model) if self.hedge_enabled else None)
+
+    def observe(self, model: str, seconds: float):
+        """
+        Record the latency of a successful call.
+
+        Args:
+            model: Model that answered
+            seconds: Time the call took
+        """
+        with self._lock:
+            self._latencies.setdefault(model, deque(maxlen=HEDGE_WINDOW)).append(seconds)
+
+    def hedge_delay(self, model: str) -> float:
+        """
+        Seconds to wait for a call to a model before hedging it.
+
+        Args:
+            model: Model of the primary call
+
+        Returns:
+            float: The configured quantile of recent latencies, clamped
+        """
+        with self._lock:
+            samples = sorted(self._latencies.get(model, ()))
+        if len(samples) < HEDGE_MIN_SAMPLES:
+            return HEDGE_INITIAL_DELAY
+        quantile = samples[min(len(samples) - 1, int(HEDGE_QUANTILE * len(samples)))]
+        return min(HEDGE_MAX_DELAY, max(HEDGE_MIN_DELAY, quantile))
+
+    def _may_hedge(self) -> bool:
+        """
+        Check the hedge budget.
+
+        Returns:
+            bool: True once HEDGE_MIN_SAMPLES calls have been seen and fewer than
+            HEDGE_MAX_RATIO of the recent ones were hedged
+        """
+        with self._lock:
+            seen = len(self._hedged)
+            return seen >= HEDGE_MIN_SAMPLES and sum(self._hedged) < HEDGE_MAX_RATIO * max(seen, 1)
+
+    def _count(self, outcome: str):
+        HEDGED_CALLS.labels(outcome).inc()
+        with self._lock:
+            self.hedges[outcome] += 1
+
+    async def run(
+        self,
+        primary: Callable[[], Awaitable[Any]],
+        hedge: Optional[Callable[[], Awaitable[Any]]],
+        delay: float,
+        discard: Callable[[Any], Awaitable[None]] = None
+    ) -> Tuple[Any, bool]:
+        """
+        Run a call, hedging it if it is still pending after ``delay`` seconds.
+
+        The first call to succeed wins and the other is cancelled. If one
+        call fails the other is still awaited; the error is raised only when
+        both fail.
+
+        Args:
+            primary: Zero-argument coroutine function making the call
+            hedge: Zero-argument coroutine function making the duplicate call, None to never hedge
+            delay: Seconds to wait before hedging
+            discard: Releases the result of a call that finished but lost the race
+
+        Returns:
+            Tuple of (result, True if the hedge won)
+        """
+        first = asyncio.ensure_future(primary())
+        tasks = {first}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done or hedge is None or not self._may_hedge():
+                if not done and hedge is not None:
+                    self._count("suppressed")
+                with self._lock:
+                    self._hedged.append(False)
+                return await first, False
+
+            with self._lock:
+                self._hedged.append(True)
+            self._count("fired")
+            second = asyncio.ensure_future(hedge())
+            tasks.add(second)
+
+            error = None
+            winner = None
+            while tasks and winner is None:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        error = task.exception()
+                    elif winner is None:
+                        winner = task
+                    elif discard is not None:
+                        # Both finished in the same step; the loser's result still holds resources
+                        await discard(task.result())
+
+            if winner is None:
+                self._count("failed")
+                raise error
+            self._count("hedge" if winner is second else "primary")
+            return winner.result(), winner is second
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get routing decisions and hedge outcomes.
+
+        Returns:
+            Dict[str, Any]: Statistics suitable for a health endpoint
+        """
+        with self._lock:
+            fired = self.hedges["fired"]
+            return {
+                "decisions": dict(self.decisions),
+                "hedges": dict(self.hedges),
+                "hedge_win_rate": round(self.hedges["hedge"] / fired, 4) if fired else 0.0,
+                "hedge_ratio": round(sum(self._hedged) / len(self._hedged), 4) if self._hedged else 0.0,
+            }
@@ -0,0 +1,184 @@
+"""
+Similarity-based response cache for conversation-scoped requests.
+
+Quick-message prompts are rebuilt from the conversation on every refresh,
+so exact-match keys rarely repeat even when nothing new was said. This
+cache embeds the last few turns of a conversation instead and returns a
+stored response when a new request's turns are close enough to an earlier
+one of the same conversation with the same sampling parameters.
+
+Similarity alone is not enough: a short new message barely moves the
+embedding of several turns, and a crisis disclosure must never be answered
+with suggestions written before it. An entry is therefore only reused when
+the newest turn is the same text (ignoring case and whitespace) as when it
+was stored; the embedding of the recent turns is the secondary check.
+"""
+
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config import (
+    SEMANTIC_CACHE_THRESHOLD, SEMANTIC_CACHE_TTL, SEMANTIC_CACHE_MAX_ENTRIES,
+    SEMANTIC_CACHE_MAX_PER_CONVERSATION, SEMANTIC_CACHE_DIM, RETRIEVAL_EMBEDDER
+)
+from retrieval import get_embedder
+
+
+class SemanticCache:
+    """
+    In-memory cache keyed by embeddings of recent conversation turns.
+
+    Vectors live in one preallocated float32 matrix; each conversation owns
+    a few of its rows, so a lookup scores only that conversation's entries.
+    Entries expire after ``ttl`` seconds, each conversation keeps at most
+    ``max_per_scope`` of them, and once the matrix is full the least
+    recently used row anywhere is reused.
+    """
+
+    def __init__(
+        self,
+        embedder=None,
+        threshold: float = None,
+        ttl: float = None,
+        max_entries: int = None,
+        max_per_scope: int = None
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            embedder: Object with embed(texts) returning unit rows, creates a hashing embedder if None
+            threshold: Cosine similarity needed for a hit
+            ttl: Seconds an entry stays valid
+            max_entries: Rows in the vector matrix
+            max_per_scope: Entries kept per conversation
+        """
+        self.embedder = embedder or get_embedder(RETRIEVAL_EMBEDDER, SEMANTIC_CACHE_DIM)
+        self.threshold = threshold if threshold is not None else SEMANTIC_CACHE_THRESHOLD
+        self.ttl = ttl if ttl is not None else SEMANTIC_CACHE_TTL
+        self.max_entries = max_entries or SEMANTIC_CACHE_MAX_ENTRIES
+        self.max_per_scope = max_per_scope or SEMANTIC_CACHE_MAX_PER_CONVERSATION
+        self.vectors: Optional[np.ndarray] = None  # allocated on first insert, once the dimension is known
+        self._last_access = np.full(self.max_entries, np.inf)
+        self._entries: List[Optional[Tuple[str, str, float, str, str]]] = [None] * self.max_entries
+        self._scopes: Dict[str, List[int]] = {}
+        self._free = list(range(self.max_entries - 1, -1, -1))
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _normalise(turn: str) -> str:
+        return " ".join(turn.split()).casefold()
+
+    def _embed(self, text: str) -> np.ndarray:
+        return self.embedder.embed([text])[0].astype(np.float32)
+
+    def _release(self, slot: int):
+        """Free a row; the caller holds the lock."""
+        scope = self._entries[slot][0]
+        slots = self._scopes[scope]
+        slots.remove(slot)
+        if not slots:
+            del self._scopes[scope]
+        self._entries[slot] = None
+        self._last_access[slot] = np.inf
+        self._free.append(slot)
+
+    def _expire(self, scope: str, now: float):
+        """Drop the expired entries of a conversation; the caller holds the lock."""
+        for slot in list(self._scopes.get(scope, ())):
+            if self._entries[slot][2] <= now:
+                self._release(slot)
+
+    def get(self, scope: str, text: str, fingerprint: str, latest: str) -> Optional[Tuple[str, float]]:
+        """
+        Find a stored response for similar recent turns.
+
+        Args:
+            scope: Conversation id
+            text: Recent turns of the conversation
+            fingerprint: Model and sampling parameters that must match exactly
+            latest: Newest turn, which must match exactly
+
+        Returns:
+            Optional[Tuple[str, float]]: The stored payload and its similarity, or None on a miss
+        """
+        vector = self._embed(text)
+        latest = self._normalise(latest)
+        now = time.time()
+        with self._lock:
+            self._expire(scope, now)
+            slots = [
+                s for s in self._scopes.get(scope, ())
+                if self._entries[s][1] == fingerprint and self._entries[s][4] == latest
+            ]
+            if slots:
+                scores = self.vectors[slots] @ vector
+                best = int(np.argmax(scores))
+                if scores[best] >= self.threshold:
+                    slot = slots[best]
+                    self._last_access[slot] = now
+                    self.hits += 1
+                    return self._entries[slot][3], float(scores[best])
+            self.misses += 1
+            return None
+
+    def set(self, scope: str, text: str, fingerprint: str, latest: str, payload: str):
+        """
+        Store a response for a conversation's recent turns.
+
+        Args:
+            scope: Conversation id
+            text: Recent turns of the conversation
+            fingerprint: Model and sampling parameters of the request
+            latest: Newest turn
+            payload: Serialized response
+        """
+        vector = self._embed(text)
+        now = time.time()
+        with self._lock:
+            if self.vectors is None:
+                self.vectors = np.zeros((self.max_entries, vector.shape[0]), dtype=np.float32)
+            self._expire(scope, now)
+
+            slots = self._scopes.get(scope, [])
+            if len(slots) >= self.max_per_scope:
+                self._release(min(slots, key=lambda s: self._last_access[s]))
+            if not self._free:
+                self._release(int(np.argmin(self._last_access)))
+                self.evictions += 1
+
+            slot = self._free.pop()
+            self.vectors[slot] = vector
+            self._last_access[slot] = now
+            self._entries[slot] = (scope, fingerprint, now + self.ttl, payload, self._normalise(latest))
+            self._scopes.setdefault(scope, []).append(slot)
+
+    def clear(self):
+        """Remove every entry."""
+        with self._lock:
+            for slot, entry in enumerate(self._entries):
+                if entry is not None:
+                    self._release(slot)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get hit/miss counters and size.
+
+        Returns:
+            Dict[str, Any]: Cache statistics suitable for a health endpoint
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": self.max_entries - len(self._free),
+            "conversations": len(self._scopes),
+        }
@@ -0,0 +1,98 @@
+"""
+Incremental parsing of one-suggestion-per-line model output.
+"""
+
+import re
+from typing import List, Optional
+from config import SUGGESTION_MAX_CHARS
+
+# "1.", "2)", "(3)", "-", "*", "•" list markers
+LIST_MARKER = re.compile(r"^\s*(?:\(?\d+[.):]|[-*•]+)\s*")
+EMPHASIS = re.compile(r"^[*_`]+|[*_`]+$")
+PREAMBLE = re.compile(r"^(?:here (?:are|is)|sure\b|certainly\b|okay\b|ok\b|of course\b)", re.IGNORECASE)
+NORMALISE = re.compile(r"[^a-z0-9]+")
+QUOTES = "\"'“”‘’"
+
+
+def clean_suggestion(line: str) -> Optional[str]:
+    """
+    Turn one line of model output into a suggestion.
+
+    Args:
+        line: A complete line of the reply
+
+    Returns:
+        Optional[str]: The suggestion without list markers, emphasis or quotes,
+            or None for blank lines, preambles, headings and overlong lines
+    """
+    text = LIST_MARKER.sub("", line.strip())
+    text = EMPHASIS.sub("", text).strip().strip(QUOTES).strip()
+    if not text or len(text) > SUGGESTION_MAX_CHARS:
+        return None
+    if text.endswith(":") or PREAMBLE.match(text):
+        return None
+    return text
+
+
+class SuggestionParser:
+    """
+    Collects distinct suggestions from streamed text, one per line.
+
+    Feed content deltas as they arrive; a line is parsed once its newline
+    arrives (or at finish for the last one), so the caller can stop the
+    stream as soon as enough suggestions are complete.
+    """
+
+    def __init__(self, count: int):
+        """
+        Initialize the parser.
+
+        Args:
+            count: Number of suggestions wanted
+        """
+        self.count = count
+        self.suggestions: List[str] = []
+        self._seen = set()
+        self._buffer = ""
+
+    @property
+    def done(self) -> bool:
+        """Whether enough suggestions have been collected."""
+        return len(self.suggestions) >= self.count
+
+    def _add_line(self, line: str):
+        suggestion = clean_suggestion(line)
+        if suggestion is None or self.done:
+            return
+        key = NORMALISE.sub(" ", suggestion.lower()).strip()
+        if key and key not in self._seen:
+            self._seen.add(key)
+            self.suggestions.append(suggestion)
+
+    def feed(self, delta: str) -> bool:
+        """
+        Add streamed text.
+
+        Args:
+            delta: Next fragment of the reply
+
+        Returns:
+            bool: True once enough suggestions have been collected
+        """
+        self._buffer += delta
+        *lines, self._buffer = self._buffer.split("\n")
+        for line in lines:
+            self._add_line(line)
+        return self.done
+
+    def finish(self) -> List[str]:
+        """
+        Parse the last, unterminated line.
+
+        Returns:
+            List[str]: The suggestions collected, at most count of them
+        """
+        if self._buffer:
+            self._add_line(self._buffer)
+            self._buffer = ""
+        return self.suggestions
@@ -0,0 +1,40 @@
+"""Tests for request validation in the HTTP server."""
+
+import asyncio
+
+import pytest
+
+from http_server import app, parse_generate_request
+
+
+@pytest.mark.parametrize("body", [
+    {"format": "json", "count": 0},
+    {"format": "json", "count": 11},
+    {"format": "json", "count": "3"},
+    {"temperature": "hot"},
+    {"top_p": 1.5},
+    {"max_tokens": 2.5},
+    {"max_tokens": True},
+])
+def test_invalid_parameters_are_rejected(body):
+    with pytest.raises(ValueError):
+        parse_generate_request({"prompt": "hi", "retrieval": False, **body})
+
+
+def test_valid_parameters_pass_through():
+    _, params = parse_generate_request(
+        {"prompt": "hi", "retrieval": False, "format": "json", "count": 10, "temperature": 1, "top_p": 0.9}
+    )
+
+    assert params == {"max_tokens": 100, "temperature": 1, "top_p": 0.9, "count": 10}
+
+
+def test_generate_answers_400_for_invalid_parameters():
+    async def post():
+        response = await app.test_client().post('/generate', json={"prompt": "hi", "temperature": "hot"})
+        return response.status_code, await response.get_json()
+
+    status, body = asyncio.run(post())
+
+    assert status == 400
+    assert "temperature" in body["error"]
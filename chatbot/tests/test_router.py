@@ -0,0 +1,25 @@
+"""Tests for the hedge budget of the model router."""
+
+from config import HEDGE_MAX_RATIO, HEDGE_MIN_SAMPLES
+from router import ModelRouter
+
+
+def test_no_hedging_before_min_samples():
+    router = ModelRouter(hedge_enabled=True)
+    router._hedged.extend([False] * (HEDGE_MIN_SAMPLES - 1))
+
+    assert not router._may_hedge()
+
+
+def test_hedge_ratio_is_relative_to_calls_seen():
+    router = ModelRouter(hedge_enabled=True)
+    budget = int(HEDGE_MAX_RATIO * HEDGE_MIN_SAMPLES)
+    router._hedged.extend([True] * budget + [False] * (HEDGE_MIN_SAMPLES - budget))
+
+    # At the ratio already: a window-sized budget would still have allowed more hedges
+    assert not router._may_hedge()
+
+    router._hedged.append(False)
+    router._hedged.extend([False] * HEDGE_MIN_SAMPLES)
+
+    assert router._may_hedge()
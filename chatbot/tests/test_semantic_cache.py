@@ -0,0 +1,36 @@
+"""Tests for the conversation-scoped semantic cache."""
+
+from semantic_cache import SemanticCache
+
+HISTORY_B = "assistant: I'm here for you. How has your week been going so far?"
+HISTORY_C = "user: honestly it has been a long week at work and I am exhausted"
+FINGERPRINT = "params"
+
+
+def test_new_short_user_turn_misses():
+    # A low threshold so the recent turns alone would match; the new turn must still force a miss
+    cache = SemanticCache(threshold=0.5)
+    cache.set("conv", "\n".join(["user: hi", HISTORY_B, HISTORY_C]), FINGERPRINT, HISTORY_C, "old")
+
+    latest = "user: i want to kill myself"
+    text = "\n".join([HISTORY_B, HISTORY_C, latest])
+
+    assert cache.get("conv", text, FINGERPRINT, latest) is None
+
+
+def test_unchanged_turns_hit():
+    cache = SemanticCache()
+    text = "\n".join(["user: hi", HISTORY_B, HISTORY_C])
+    cache.set("conv", text, FINGERPRINT, HISTORY_C, "old")
+
+    found = cache.get("conv", text, FINGERPRINT, "  " + HISTORY_C.upper())
+
+    assert found is not None and found[0] == "old"
+
+
+def test_other_conversation_misses():
+    cache = SemanticCache()
+    text = "\n".join(["user: hi", HISTORY_B, HISTORY_C])
+    cache.set("conv", text, FINGERPRINT, HISTORY_C, "old")
+
+    assert cache.get("other", text, FINGERPRINT, HISTORY_C) is None
@@ -2,6 +2,8 @@
 Utility functions for NVIDIA NIM integration.
 """
 
+import hashlib
+import json
 from typing import List, Dict, Any
 
 
@@ -100,4 +102,27 @@ def validate_messages(messages: List[Dict[str, str]]) -> bool:
         if message['role'] not in ['user', 'assistant', 'system']:
             return False
     
-    return True 
\ No newline at end of file
+    return True
+
+
+def make_request_key(messages: List[Dict[str, str]], **params: Any) -> str:
+    """
+    Build a canonical hash identifying a completion request.
+    
+    Two requests with the same messages, model and sampling parameters
+    produce the same key regardless of dict ordering.
+    
+    Args:
+        messages: List of message dictionaries
+        **params: Model and sampling parameters of the request
+        
+    Returns:
+        str: Hex digest identifying the request
+    """
+    canonical = json.dumps(
+        {"messages": messages, "params": params},
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
@@ -0,0 +1,24 @@
+"""
+Gunicorn worker class for the chatbot HTTP server.
+"""
+
+try:
+    from uvicorn_worker import UvicornWorker
+except ImportError:
+    # Older uvicorn releases ship the worker themselves
+    from uvicorn.workers import UvicornWorker
+
+
+class ChatbotWorker(UvicornWorker):
+    """
+    Uvicorn worker that drains within gunicorn's graceful timeout.
+
+    On SIGTERM uvicorn stops accepting connections and waits for in-flight
+    requests. Left alone it waits indefinitely and gunicorn kills it when
+    graceful_timeout expires, cutting open streams mid-frame; bounding the
+    wait slightly below that lets uvicorn close them itself.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.config.timeout_graceful_shutdown = max(1, self.cfg.graceful_timeout - 2)
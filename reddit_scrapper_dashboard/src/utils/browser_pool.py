@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""Pool of warm Chrome drivers shared by scrape jobs"""
+
+import os
+import sys
+import atexit
+import queue
+import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
+
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.chrome.options import Options
+from webdriver_manager.chrome import ChromeDriverManager
+
+DEFAULT_POOL_SIZE = int(os.environ.get('SCRAPER_POOL_SIZE', '2'))
+DEFAULT_MAX_PAGES = int(os.environ.get('SCRAPER_MAX_PAGES_PER_DRIVER', '25'))
+DEFAULT_HEADLESS = os.environ.get('SCRAPER_HEADLESS', '1') != '0'
+# Origins whose site storage is wiped between jobs (Storage.clearDataForOrigin takes one exact origin)
+RESET_ORIGINS = ('https://www.reddit.com', 'https://old.reddit.com')
+
+_driver_path = None
+_driver_path_lock = threading.Lock()
+
+
+def get_driver_path():
+    """Resolve the ChromeDriver binary once per process instead of once per scrape"""
+    global _driver_path
+    with _driver_path_lock:
+        if _driver_path is None:
+            _driver_path = ChromeDriverManager().install()
+        return _driver_path
+
+
+class PooledDriver:
+    """A Chrome driver with its own profile directory and a page counter"""
+
+    def __init__(self, headless):
+        self.profile_dir = tempfile.mkdtemp(prefix='reddit_scraper_chrome_')
+        self.pages = 0
+        self.driver = webdriver.Chrome(service=Service(get_driver_path()), options=self._options(headless))
+
+        # Hide automation indicators on every page this driver opens
+        self.driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {
+            'source': "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"
+        })
+
+    def _options(self, headless):
+        chrome_options = Options()
+        chrome_options.add_argument(f"--user-data-dir={self.profile_dir}")
+        if headless:
+            chrome_options.add_argument("--headless=new")
+        chrome_options.add_argument("--no-sandbox")
+        chrome_options.add_argument("--disable-dev-shm-usage")
+        chrome_options.add_argument("--disable-gpu")
+        chrome_options.add_argument("--window-size=1920,1080")
+        chrome_options.add_argument("--disable-blink-features=AutomationControlled")
+        chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
+        chrome_options.add_experimental_option('useAutomationExtension', False)
+        return chrome_options
+
+    def is_healthy(self):
+        """Cheap round trip to check the browser is still responsive"""
+        try:
+            return self.driver.execute_script('return 1') == 1
+        except Exception:
+            return False
+
+    def reset(self):
+        """Wipe cookies and site storage so the next job starts with a clean session"""
+        self.driver.get('about:blank')
+        # delete_all_cookies() would only clear the current page's domain
+        self.driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+        for origin in RESET_ORIGINS:
+            self.driver.execute_cdp_cmd('Storage.clearDataForOrigin', {'origin': origin, 'storageTypes': 'all'})
+
+    def quit(self):
+        try:
+            self.driver.quit()
+        except Exception as e:
+            print(f'Error closing browser: {e}', file=sys.stderr)
+        finally:
+            shutil.rmtree(self.profile_dir, ignore_errors=True)
+
+
+class BrowserPool:
+    """
+    Fixed-size pool of warm drivers.
+
+    Jobs borrow a driver with ``with pool.driver() as driver``. Drivers that
+    fail a health check or have served ``max_pages`` pages are replaced,
+    and each driver is reset between jobs.
+    """
+
+    def __init__(self, size=DEFAULT_POOL_SIZE, max_pages=DEFAULT_MAX_PAGES, headless=DEFAULT_HEADLESS):
+        self.size = size
+        self.max_pages = max_pages
+        self.headless = headless
+        self._idle = queue.LifoQueue()
+        self._slots = threading.Semaphore(size)
+        self._lock = threading.Lock()
+        self._all = set()
+        self._closed = False
+
+    def _start_driver(self):
+        pooled = PooledDriver(self.headless)
+        with self._lock:
+            self._all.add(pooled)
+        return pooled
+
+    def _discard(self, pooled):
+        with self._lock:
+            self._all.discard(pooled)
+        pooled.quit()
+
+    def warm(self):
+        """Start every driver up front so the first jobs do not pay browser start-up"""
+        with self._lock:
+            missing = self.size - len(self._all)
+        threads = [threading.Thread(target=lambda: self._idle.put(self._start_driver())) for _ in range(missing)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def acquire(self, timeout=None):
+        """Borrow a healthy driver, blocking while all of them are in use"""
+        if self._closed:
+            raise RuntimeError('Browser pool is closed')
+        if not self._slots.acquire(timeout=timeout):
+            raise TimeoutError('No browser available')
+
+        try:
+            while True:
+                try:
+                    pooled = self._idle.get_nowait()
+                except queue.Empty:
+                    return self._start_driver()
+                if pooled.is_healthy():
+                    return pooled
+                print('Recycling unresponsive browser', file=sys.stderr)
+                self._discard(pooled)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, pooled, pages=1, healthy=True):
+        """Return a driver, recycling it if it is broken or has served enough pages"""
+        try:
+            pooled.pages += pages
+            if self._closed or not healthy or pooled.pages >= self.max_pages:
+                self._discard(pooled)
+                return
+            try:
+                pooled.reset()
+            except Exception as e:
+                print(f'Error resetting browser, recycling it: {e}', file=sys.stderr)
+                self._discard(pooled)
+                return
+            self._idle.put(pooled)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def driver(self, timeout=None):
+        """Context manager yielding a raw WebDriver from the pool"""
+        pooled = self.acquire(timeout)
+        healthy = True
+        try:
+            yield pooled.driver
+        except Exception:
+            healthy = pooled.is_healthy()
+            raise
+        finally:
+            self.release(pooled, healthy=healthy)
+
+    def stats(self):
+        with self._lock:
+            return {'size': self.size, 'started': len(self._all), 'idle': self._idle.qsize()}
+
+    def close(self):
+        """Quit every driver"""
+        self._closed = True
+        with self._lock:
+            drivers = list(self._all)
+            self._all.clear()
+        for pooled in drivers:
+            pooled.quit()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_browser_pool():
+    """Process-wide pool, created on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = BrowserPool()
+            atexit.register(_pool.close)
+        return _pool
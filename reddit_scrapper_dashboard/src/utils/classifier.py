@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Distress classifier for scraped posts.
+
+Posts are turned into signed, hashed unigram/bigram features with NumPy and
+scored by a multinomial logistic regression. The model is trained on the
+hand-labelled rows of mental_health_posts (plus a small seed set), saved
+next to the database and loaded once per process.
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import zlib
+import argparse
+import numpy as np
+
+from posts_db import DEFAULT_DB_PATH, connect, add_column_if_missing
+
+LABELS = ('negative', 'neutral', 'positive')
+NEGATIVE = LABELS.index('negative')
+
+HASH_BITS = 18
+N_FEATURES = 1 << HASH_BITS
+BIAS_INDEX = N_FEATURES  # extra always-on feature so every row has an entry
+
+DEFAULT_MODEL_PATH = os.path.join(os.path.dirname(DEFAULT_DB_PATH), 'distress_model.npz')
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9']+")
+
+# Seed examples so the model is usable before many posts are hand-labelled
+SEED_EXAMPLES = [
+    ("I don't know how to pick myself up anymore", 'negative'),
+    ("I feel so alone and nobody understands", 'negative'),
+    ("I want to drop out, nothing I do matters", 'negative'),
+    ("I can't sleep, I'm exhausted and hopeless", 'negative'),
+    ("I feel like a failure and everyone is better than me", 'negative'),
+    ("I've been crying every night and can't stop", 'negative'),
+    ("Does anyone know when the results are released?", 'neutral'),
+    ("What subjects should I take for JC?", 'neutral'),
+    ("Sharing my timetable for next semester", 'neutral'),
+    ("Is the library open during the holidays?", 'neutral'),
+    ("Things are finally getting better, thank you all", 'positive'),
+    ("I passed my exams and I'm so relieved and happy", 'positive'),
+    ("Talking to my friends really helped, feeling hopeful", 'positive'),
+    ("Proud of myself for getting through this week", 'positive'),
+]
+
+_model_cache = {}
+
+
+def tokenize(text):
+    """Lower-case word tokens plus adjacent-word bigrams"""
+    words = TOKEN_PATTERN.findall(text.lower())
+    return words + [f'{a} {b}' for a, b in zip(words, words[1:])]
+
+
+def featurize(texts):
+    """
+    Hash texts into a sparse row-major matrix.
+
+    Returns (indices, values, offsets): row i owns entries
+    offsets[i]:offsets[i+1]. Rows are L2-normalised and end with the bias.
+    """
+    indices = []
+    values = []
+    offsets = [0]
+
+    for text in texts:
+        counts = {}
+        for token in tokenize(text):
+            h = zlib.crc32(token.encode('utf-8'))
+            index = h & (N_FEATURES - 1)
+            sign = 1.0 if h >> 31 else -1.0
+            counts[index] = counts.get(index, 0.0) + sign
+
+        row = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+        norm = np.sqrt((row * row).sum())
+        if norm > 0:
+            row /= norm
+
+        indices.extend(counts.keys())
+        indices.append(BIAS_INDEX)
+        values.append(row)
+        values.append(np.ones(1, dtype=np.float32))
+        offsets.append(offsets[-1] + len(counts) + 1)
+
+    return (
+        np.asarray(indices, dtype=np.int64),
+        np.concatenate(values) if values else np.zeros(0, dtype=np.float32),
+        np.asarray(offsets, dtype=np.int64),
+    )
+
+
+def _softmax(scores):
+    scores = scores - scores.max(axis=1, keepdims=True)
+    np.exp(scores, out=scores)
+    scores /= scores.sum(axis=1, keepdims=True)
+    return scores
+
+
+class DistressClassifier:
+    def __init__(self, weights=None):
+        self.weights = weights if weights is not None else np.zeros((N_FEATURES + 1, len(LABELS)), dtype=np.float32)
+
+    def _scores(self, features):
+        indices, values, offsets = features
+        weighted = self.weights[indices] * values[:, None]
+        return np.add.reduceat(weighted, offsets[:-1], axis=0)
+
+    def predict_proba(self, texts):
+        """Class probabilities, one row per text in LABELS order"""
+        if not texts:
+            return np.zeros((0, len(LABELS)), dtype=np.float32)
+        return _softmax(self._scores(featurize(texts)))
+
+    def fit(self, texts, labels, epochs=200, learning_rate=2.0, l2=1e-4):
+        """Full-batch gradient descent on the class-balanced multinomial log loss"""
+        features = featurize(texts)
+        indices, values, offsets = features
+        rows = np.repeat(np.arange(len(texts)), np.diff(offsets))
+        targets = np.zeros((len(texts), len(LABELS)), dtype=np.float32)
+        targets[np.arange(len(texts)), [LABELS.index(label) for label in labels]] = 1.0
+
+        # Weight classes inversely to frequency so the hand-labelled skew does not dominate
+        class_counts = targets.sum(axis=0)
+        class_weights = np.where(class_counts > 0, len(texts) / (len(LABELS) * np.maximum(class_counts, 1)), 0.0)
+        sample_weights = (targets @ class_weights)[:, None]
+
+        touched = np.unique(indices)
+        for _ in range(epochs):
+            error = (_softmax(self._scores(features)) - targets) * sample_weights / len(texts)
+            for c in range(len(LABELS)):
+                gradient = np.bincount(indices, weights=values * error[rows, c], minlength=N_FEATURES + 1)
+                self.weights[touched, c] -= learning_rate * (gradient[touched] + l2 * self.weights[touched, c])
+        return self
+
+    def save(self, path):
+        np.savez_compressed(path, weights=self.weights)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data['weights'].astype(np.float32))
+
+
+def load_training_data(conn):
+    """Hand-labelled posts plus the seed examples"""
+    rows = conn.execute("""
+        SELECT title, content, sentiment FROM mental_health_posts
+        WHERE COALESCE(sentiment_source, 'manual') = 'manual' AND sentiment IN ('negative', 'neutral', 'positive')
+    """).fetchall()
+    texts = [f'{title}\n{content}' for title, content, _ in rows] + [text for text, _ in SEED_EXAMPLES]
+    labels = [sentiment for _, _, sentiment in rows] + [label for _, label in SEED_EXAMPLES]
+    return texts, labels
+
+
+def get_model(conn, model_path=None, retrain=False):
+    """Load the model once per process, training and saving it if there is none yet"""
+    path = model_path or DEFAULT_MODEL_PATH
+    if not retrain and path in _model_cache:
+        return _model_cache[path]
+
+    if not retrain and os.path.exists(path):
+        model = DistressClassifier.load(path)
+    else:
+        texts, labels = load_training_data(conn)
+        print(f'Training distress classifier on {len(texts)} labelled posts...', file=sys.stderr)
+        model = DistressClassifier().fit(texts, labels)
+        model.save(path)
+
+    _model_cache[path] = model
+    return model
+
+
+def ensure_schema(conn):
+    add_column_if_missing(conn, 'mental_health_posts', 'risk_score', 'REAL')
+    # NULL/'manual' rows keep their hand-set sentiment; the classifier owns the rest
+    add_column_if_missing(conn, 'mental_health_posts', 'sentiment_source', 'TEXT')
+    # Filled by dedup.py; posts in one near-duplicate cluster share a score
+    add_column_if_missing(conn, 'mental_health_posts', 'cluster_id', 'TEXT')
+
+
+def classify_posts(db_path=None, model_path=None, batch_size=1000, rescore=False, retrain=False):
+    """Score stored posts in batches and write sentiment and risk_score back"""
+    conn = connect(db_path)
+    ensure_schema(conn)
+    conn.commit()
+
+    model = get_model(conn, model_path, retrain)
+    start = time.time()
+    scored = 0
+    predicted_texts = 0
+    cluster_probabilities = {}
+
+    # Page by rowid so the updates below never race an open cursor on the same table
+    where = '' if rescore else 'AND risk_score IS NULL'
+    last_rowid = 0
+
+    while True:
+        rows = conn.execute(f"""
+            SELECT rowid, id, title, content, sentiment_source, COALESCE(cluster_id, id) FROM mental_health_posts
+            WHERE rowid > ? {where} ORDER BY rowid LIMIT ?
+        """, (last_rowid, batch_size)).fetchall()
+        if not rows:
+            break
+        last_rowid = rows[-1][0]
+
+        # Score one text per near-duplicate cluster and reuse it for the rest
+        pending = {}
+        for _, _, title, content, _, cluster in rows:
+            if cluster not in cluster_probabilities and cluster not in pending:
+                pending[cluster] = f'{title}\n{content}'
+        if pending:
+            for cluster, row in zip(pending, model.predict_proba(list(pending.values()))):
+                cluster_probabilities[cluster] = row
+            predicted_texts += len(pending)
+
+        probabilities = np.stack([cluster_probabilities[cluster] for *_, cluster in rows])
+        predicted = probabilities.argmax(axis=1)
+        risk = probabilities[:, NEGATIVE]
+
+        updates = []
+        for (_, post_id, _, _, source, _), label, score in zip(rows, predicted, risk):
+            # Hand-labelled rows only get a risk score
+            sentiment = None if (source or 'manual') == 'manual' else LABELS[label]
+            updates.append((round(float(score), 4), sentiment, sentiment, post_id))
+
+        with conn:
+            conn.executemany("""
+                UPDATE mental_health_posts
+                SET risk_score = ?,
+                    sentiment = COALESCE(?, sentiment),
+                    sentiment_source = CASE WHEN ? IS NULL THEN sentiment_source ELSE 'model' END
+                WHERE id = ?
+            """, updates)
+        scored += len(rows)
+
+    elapsed = time.time() - start
+    conn.close()
+    return {
+        'success': True,
+        'scored': scored,
+        'predicted': predicted_texts,
+        'seconds': round(elapsed, 3),
+        'posts_per_second': round(scored / elapsed) if elapsed > 0 else scored,
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Score scraped posts for distress')
+    parser.add_argument('--db', help='Path to scrapper_data.db')
+    parser.add_argument('--model', help='Path to the saved model (.npz)')
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--all', action='store_true', help='Rescore posts that already have a risk score')
+    parser.add_argument('--retrain', action='store_true', help='Retrain from labelled posts before scoring')
+    args = parser.parse_args()
+
+    result = classify_posts(args.db, args.model, args.batch_size, args.all, args.retrain)
+    print(json.dumps(result))
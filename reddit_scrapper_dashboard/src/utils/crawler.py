@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Crawl scheduler for monitoring many subreddits and threads.
+
+Targets live in the crawl_targets table of the posts database together
+with their last crawl time, last known comment count and a decaying
+distress score. Each cycle fetches the due targets over the HTTP/JSON
+fast path with a bounded worker pool, highest distress first, spacing
+requests to the same host. Comment IDs already seen per thread are kept
+in crawl_seen_comments so only new comments are reported, and threads
+whose comment count has not changed since the last crawl are skipped.
+"""
+
+import re
+import sys
+import json
+import time
+import heapq
+import asyncio
+import argparse
+from urllib.parse import urlparse
+
+from posts_db import connect
+from ingest import PostIngestor
+from reddit_json import RedditJsonClient, RateLimiter, thread_id_from_url
+
+DEFAULT_WORKERS = 4
+DEFAULT_HOST_INTERVAL = 1.0  # seconds between requests to the same host
+DEFAULT_RECRAWL_INTERVAL = 300.0  # seconds before a target is due again
+DISTRESS_HALF_LIFE = 6 * 3600.0  # seconds for a thread's distress score to halve
+
+# Used when the distress classifier (NumPy) is not available
+DISTRESS_KEYWORDS = re.compile(
+    r"drop out|pick myself up|hopeless|give up|no point|alone|su[i*]cide|kill myself|self[- ]harm|can't cope",
+    re.IGNORECASE
+)
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS crawl_targets (
+        url TEXT PRIMARY KEY,
+        kind TEXT NOT NULL,
+        last_crawled REAL,
+        last_comment_count INTEGER,
+        distress_score REAL NOT NULL DEFAULT 0,
+        distress_updated REAL
+    );
+    CREATE TABLE IF NOT EXISTS crawl_seen_comments (
+        url TEXT NOT NULL,
+        comment_id TEXT NOT NULL,
+        PRIMARY KEY (url, comment_id)
+    ) WITHOUT ROWID;
+"""
+
+
+def normalize_target(target):
+    """Full URL for 'r/name', a subreddit URL or a thread URL, plus its kind"""
+    target = target.strip()
+    if re.fullmatch(r'/?r/\w+/?', target):
+        target = 'https://www.reddit.com/' + target.strip('/') + '/'
+    if thread_id_from_url(target):
+        return target, 'thread'
+
+    # Subreddits are polled through their newest-first listing
+    base = target.rstrip('/')
+    if not base.endswith('/new'):
+        base += '/new'
+    return base + '/', 'subreddit'
+
+
+def _load_distress_scorer(conn):
+    """Distress classifier if NumPy is installed, otherwise a keyword heuristic"""
+    try:
+        from classifier import get_model, ensure_schema, NEGATIVE
+    except ImportError:
+        return lambda conn, texts: [1.0 if DISTRESS_KEYWORDS.search(text) else 0.0 for text in texts]
+
+    ensure_schema(conn)
+    conn.commit()
+
+    def score(conn, texts):
+        if not texts:
+            return []
+        return get_model(conn).predict_proba(texts)[:, NEGATIVE].tolist()
+    return score
+
+
+class CrawlScheduler:
+    def __init__(self, db_path=None, workers=DEFAULT_WORKERS, host_interval=DEFAULT_HOST_INTERVAL,
+                 recrawl_interval=DEFAULT_RECRAWL_INTERVAL, fixture_dir=None, on_records=None):
+        self.conn = connect(db_path)
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+        self.workers = workers
+        self.host_interval = host_interval
+        self.recrawl_interval = recrawl_interval
+        self.fixture_dir = fixture_dir
+        self.on_records = on_records
+        self.score_distress = _load_distress_scorer(self.conn)
+        self._host_limiters = {}
+
+    def add_targets(self, targets):
+        """Register subreddits/threads to monitor (existing ones keep their state)"""
+        rows = [normalize_target(target) for target in targets]
+        with self.conn:
+            self.conn.executemany('INSERT OR IGNORE INTO crawl_targets (url, kind) VALUES (?, ?)', rows)
+        return [url for url, _ in rows]
+
+    def _current_distress(self, score, updated, now):
+        if not score or not updated:
+            return 0.0
+        return score * 0.5 ** ((now - updated) / DISTRESS_HALF_LIFE)
+
+    def due_targets(self, now=None):
+        """Due targets ordered by decayed distress score, then longest since last crawl"""
+        now = now or time.time()
+        rows = self.conn.execute("""
+            SELECT url, kind, last_crawled, distress_score, distress_updated FROM crawl_targets
+            WHERE last_crawled IS NULL OR last_crawled <= ?
+        """, (now - self.recrawl_interval,)).fetchall()
+
+        heap = [
+            (-self._current_distress(score, updated, now), last_crawled or 0.0, url, kind)
+            for url, kind, last_crawled, score, updated in rows
+        ]
+        heapq.heapify(heap)
+        return [heapq.heappop(heap) for _ in range(len(heap))]
+
+    def _limiter_for(self, url):
+        host = urlparse(url).netloc
+        if host not in self._host_limiters:
+            self._host_limiters[host] = RateLimiter(self.host_interval)
+        return self._host_limiters[host]
+
+    async def _crawl_subreddit(self, client, url, stats):
+        posts = await client.fetch_listing(url)
+        now = time.time()
+        known = dict(self.conn.execute(
+            'SELECT url, last_comment_count FROM crawl_targets WHERE kind = ?', ('thread',)
+        ).fetchall())
+
+        new_threads = []
+        unchanged = []
+        for post in posts:
+            if post['url'] not in known:
+                new_threads.append((post['url'], 'thread'))
+            elif known[post['url']] is not None and post['comments'] == known[post['url']]:
+                # Nothing new since the last crawl; push it back a full interval
+                unchanged.append(post['url'])
+
+        with self.conn:
+            self.conn.executemany('INSERT OR IGNORE INTO crawl_targets (url, kind) VALUES (?, ?)', new_threads)
+            self.conn.executemany(
+                'UPDATE crawl_targets SET last_crawled = ? WHERE url = ?', [(now, u) for u in unchanged]
+            )
+            self.conn.execute('UPDATE crawl_targets SET last_crawled = ? WHERE url = ?', (now, url))
+
+        stats['threads_discovered'] += len(new_threads)
+        stats['threads_unchanged'] += len(unchanged)
+        return [thread_url for thread_url, _ in new_threads], unchanged
+
+    async def _crawl_thread(self, client, url, stats):
+        thread = await client.fetch_thread(url)
+        now = time.time()
+
+        seen = {row[0] for row in self.conn.execute(
+            'SELECT comment_id FROM crawl_seen_comments WHERE url = ?', (url,)
+        )}
+        first_visit = self.conn.execute(
+            'SELECT last_crawled IS NULL FROM crawl_targets WHERE url = ?', (url,)
+        ).fetchone()[0]
+        new_comments = [comment for comment in thread['comments'] if comment['id'] not in seen]
+
+        texts = [comment['content'] for comment in new_comments]
+        if first_visit:
+            texts.append(f"{thread['post']['title']}\n{thread['post']['content']}")
+        risk = max(self.score_distress(self.conn, texts), default=0.0)
+
+        row = self.conn.execute(
+            'SELECT distress_score, distress_updated FROM crawl_targets WHERE url = ?', (url,)
+        ).fetchone()
+        distress = max(self._current_distress(row[0], row[1], now), risk)
+
+        with self.conn:
+            self.conn.executemany(
+                'INSERT OR IGNORE INTO crawl_seen_comments (url, comment_id) VALUES (?, ?)',
+                [(url, comment['id']) for comment in new_comments]
+            )
+            self.conn.execute("""
+                UPDATE crawl_targets
+                SET last_crawled = ?, last_comment_count = ?, distress_score = ?, distress_updated = ?
+                WHERE url = ?
+            """, (now, thread['post']['comments'], distress, now, url))
+
+        stats['threads_crawled'] += 1
+        stats['new_comments'] += len(new_comments)
+        if self.on_records and (first_visit or new_comments):
+            self.on_records(url, thread['post'] if first_visit else None, new_comments)
+
+    async def run_once(self):
+        """Crawl every due target once; threads discovered on the way are crawled in the same cycle"""
+        start = time.time()
+        stats = {'targets': 0, 'threads_crawled': 0, 'threads_discovered': 0,
+                 'threads_unchanged': 0, 'new_comments': 0, 'errors': 0}
+
+        queue = asyncio.PriorityQueue()
+        skip = set()
+        for priority, last_crawled, url, kind in self.due_targets():
+            # Subreddits first so their listings can mark unchanged threads before they are fetched
+            queue.put_nowait((0 if kind == 'subreddit' else 1, priority, last_crawled, url, kind))
+
+        async with RedditJsonClient(self.fixture_dir, min_interval=0) as client:
+            async def worker():
+                while True:
+                    try:
+                        _, _, _, url, kind = queue.get_nowait()
+                    except asyncio.QueueEmpty:
+                        return
+                    try:
+                        # A subreddit listing may have shown this thread has no new comments
+                        if url in skip:
+                            continue
+                        stats['targets'] += 1
+                        await self._limiter_for(url).wait()
+                        if kind == 'subreddit':
+                            new_threads, unchanged = await self._crawl_subreddit(client, url, stats)
+                            skip.update(unchanged)
+                            for thread_url in new_threads:
+                                queue.put_nowait((1, 0.0, 0.0, thread_url, 'thread'))
+                        else:
+                            await self._crawl_thread(client, url, stats)
+                    except Exception as e:
+                        stats['errors'] += 1
+                        print(f'Crawl error for {url}: {e}', file=sys.stderr)
+
+            await asyncio.gather(*(worker() for _ in range(self.workers)))
+
+        stats['seconds'] = round(time.time() - start, 3)
+        return stats
+
+    async def run_forever(self, cycle_interval=60.0):
+        """Keep crawling, sleeping between cycles"""
+        while True:
+            stats = await self.run_once()
+            print(json.dumps(stats), file=sys.stderr)
+            await asyncio.sleep(cycle_interval)
+
+    def close(self):
+        self.conn.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Crawl subreddits and threads incrementally')
+    parser.add_argument('targets', nargs='*', help="Subreddits ('r/SGExams') or thread URLs to add")
+    parser.add_argument('--db', help='Path to scrapper_data.db')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    parser.add_argument('--host-interval', type=float, default=DEFAULT_HOST_INTERVAL)
+    parser.add_argument('--recrawl-interval', type=float, default=DEFAULT_RECRAWL_INTERVAL)
+    parser.add_argument('--fixtures', help='Read threads from saved fixtures instead of the network')
+    parser.add_argument('--forever', action='store_true', help='Keep crawling instead of running one cycle')
+    parser.add_argument('--no-ingest', action='store_true', help='Do not write crawled posts to mental_health_posts')
+    args = parser.parse_args()
+
+    # New posts and comments are buffered and written in batches; the rest is flushed on exit
+    ingestor = None if args.no_ingest else PostIngestor(args.db)
+    on_records = (lambda url, post, comments: ingestor.add_thread(post, comments)) if ingestor else None
+
+    scheduler = CrawlScheduler(args.db, args.workers, args.host_interval, args.recrawl_interval, args.fixtures,
+                               on_records)
+    scheduler.add_targets(args.targets)
+    try:
+        if args.forever:
+            asyncio.run(scheduler.run_forever())
+        else:
+            stats = asyncio.run(scheduler.run_once())
+            if ingestor:
+                ingestor.flush()
+                stats['ingested'] = ingestor.stats
+            print(json.dumps(stats))
+    finally:
+        scheduler.close()
+        if ingestor:
+            ingestor.close()
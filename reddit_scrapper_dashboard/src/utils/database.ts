@@ -13,6 +13,8 @@ export interface ScrapperData {
   sentiment: 'positive' | 'negative' | 'neutral';
   platform: 'REDDIT' | 'FACEBOOK' | 'X';
   samh_username?: string;
+  risk_score?: number | null;
+  cluster_id?: string | null;
 }
 
 class DatabaseManager {
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate clustering for scraped posts.
+
+Each post's normalised text is cut into word shingles and summarised by a
+MinHash signature. Signatures are split into LSH bands stored in
+post_lsh_buckets, so a new post is compared only with posts sharing at
+least one band bucket instead of the whole corpus. A post whose estimated
+Jaccard similarity to a candidate reaches the threshold joins that
+candidate's cluster; otherwise it starts its own. The cluster_id column of
+mental_health_posts holds the id of the cluster's first post, so later
+stages (classifier, LLM calls) can work on one representative per cluster.
+"""
+
+import re
+import time
+import json
+import zlib
+import hashlib
+import argparse
+import numpy as np
+
+from posts_db import connect, add_column_if_missing
+
+NUM_PERM = 128
+BANDS = 16
+ROWS_PER_BAND = NUM_PERM // BANDS  # 16 bands of 8 rows: candidates from ~0.7 similarity up
+SHINGLE_SIZE = 3
+DEFAULT_THRESHOLD = 0.8
+
+_MERSENNE_PRIME = (1 << 31) - 1
+_rng = np.random.RandomState(1)
+_PERM_A = _rng.randint(1, _MERSENNE_PRIME, size=NUM_PERM, dtype=np.int64).astype(np.uint64)
+_PERM_B = _rng.randint(0, _MERSENNE_PRIME, size=NUM_PERM, dtype=np.int64).astype(np.uint64)
+
+WORD_PATTERN = re.compile(r"[a-z0-9']+")
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS post_minhash (
+        id TEXT PRIMARY KEY,
+        signature BLOB NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS post_lsh_buckets (
+        band INTEGER NOT NULL,
+        bucket INTEGER NOT NULL,
+        id TEXT NOT NULL,
+        PRIMARY KEY (band, bucket, id)
+    ) WITHOUT ROWID;
+"""
+
+
+def shingles(text):
+    """Hashes of overlapping word n-grams; short texts become a single shingle"""
+    words = WORD_PATTERN.findall(text.lower())
+    if len(words) <= SHINGLE_SIZE:
+        grams = [' '.join(words)] if words else []
+    else:
+        grams = [' '.join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)]
+    return np.fromiter({zlib.crc32(g.encode('utf-8')) for g in grams}, dtype=np.uint64)
+
+
+def minhash(text):
+    """MinHash signature (NUM_PERM uint32 values), or None for text without words"""
+    hashes = shingles(text)
+    if hashes.size == 0:
+        return None
+    hashes %= _MERSENNE_PRIME
+    # (a * x + b) mod p for every permutation and shingle; products stay below 2**62
+    permuted = (np.outer(_PERM_A, hashes) + _PERM_B[:, None]) % _MERSENNE_PRIME
+    return permuted.min(axis=1).astype(np.uint32)
+
+
+def band_buckets(signature):
+    """One stable 63-bit bucket key per LSH band"""
+    bands = signature.reshape(BANDS, ROWS_PER_BAND)
+    return [
+        int.from_bytes(hashlib.blake2b(band.tobytes(), digest_size=8).digest(), 'big', signed=True)
+        for band in bands
+    ]
+
+
+def similarity(a, b):
+    """Estimated Jaccard similarity of two signatures"""
+    return float(np.count_nonzero(a == b)) / NUM_PERM
+
+
+def ensure_schema(conn):
+    add_column_if_missing(conn, 'mental_health_posts', 'cluster_id', 'TEXT')
+    conn.executescript(SCHEMA)
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_posts_cluster_id ON mental_health_posts (cluster_id)')
+    conn.commit()
+
+
+def _find_cluster(conn, signature, buckets, threshold):
+    """Cluster of the most similar earlier post at or above the threshold, if any"""
+    candidates = set()
+    for band, bucket in enumerate(buckets):
+        candidates.update(row[0] for row in conn.execute(
+            'SELECT id FROM post_lsh_buckets WHERE band = ? AND bucket = ?', (band, bucket)
+        ))
+    if not candidates:
+        return None
+
+    # Joining on the posts table drops signatures of posts that have since been deleted
+    best, best_score = None, threshold
+    placeholders = ', '.join('?' * len(candidates))
+    for post_id, blob, cluster_id in conn.execute(f"""
+        SELECT m.id, m.signature, p.cluster_id FROM post_minhash m JOIN mental_health_posts p ON p.id = m.id
+        WHERE m.id IN ({placeholders})
+    """, list(candidates)):
+        score = similarity(signature, np.frombuffer(blob, dtype=np.uint32))
+        if score >= best_score:
+            best, best_score = cluster_id or post_id, score
+    return best
+
+
+def assign_clusters(conn, threshold=DEFAULT_THRESHOLD, batch_size=1000):
+    """Cluster every post that has no cluster_id yet, oldest first"""
+    ensure_schema(conn)
+    start = time.time()
+    stats = {'processed': 0, 'duplicates': 0, 'clusters': 0}
+    last_rowid = 0
+
+    while True:
+        rows = conn.execute("""
+            SELECT rowid, id, title, content FROM mental_health_posts
+            WHERE rowid > ? AND cluster_id IS NULL ORDER BY rowid LIMIT ?
+        """, (last_rowid, batch_size)).fetchall()
+        if not rows:
+            break
+        last_rowid = rows[-1][0]
+
+        # One transaction per batch; posts later in the batch see the earlier ones
+        with conn:
+            for _, post_id, title, content in rows:
+                signature = minhash(f'{title}\n{content}')
+                cluster_id = post_id
+                if signature is not None:
+                    buckets = band_buckets(signature)
+                    cluster_id = _find_cluster(conn, signature, buckets, threshold) or post_id
+                    conn.execute('INSERT OR REPLACE INTO post_minhash (id, signature) VALUES (?, ?)',
+                                 (post_id, signature.tobytes()))
+                    conn.executemany('INSERT OR IGNORE INTO post_lsh_buckets (band, bucket, id) VALUES (?, ?, ?)',
+                                     [(band, bucket, post_id) for band, bucket in enumerate(buckets)])
+
+                conn.execute('UPDATE mental_health_posts SET cluster_id = ? WHERE id = ?', (cluster_id, post_id))
+                stats['processed'] += 1
+                if cluster_id == post_id:
+                    stats['clusters'] += 1
+                else:
+                    stats['duplicates'] += 1
+
+    stats['seconds'] = round(time.time() - start, 3)
+    return stats
+
+
+def reset_clusters(conn):
+    """Forget all signatures and cluster assignments"""
+    ensure_schema(conn)
+    with conn:
+        conn.execute('DELETE FROM post_minhash')
+        conn.execute('DELETE FROM post_lsh_buckets')
+        conn.execute('UPDATE mental_health_posts SET cluster_id = NULL')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Cluster near-duplicate posts')
+    parser.add_argument('--db', help='Path to scrapper_data.db')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument('--rebuild', action='store_true', help='Recluster every post from scratch')
+    args = parser.parse_args()
+
+    conn = connect(args.db)
+    if args.rebuild:
+        reset_clusters(conn)
+    print(json.dumps(assign_clusters(conn, args.threshold)))
+    conn.close()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Bulk ingest of scraped posts and comments into mental_health_posts.
+
+Records are buffered and written with executemany inside one transaction
+per batch. Rows are upserted on id (volatile counters are refreshed,
+sentiment is left alone). Every row also stores a hash of its normalised
+text, indexed for repost analytics and the near-duplicate stage; it is
+never used to refuse a row, since different comments in a thread often
+share both the title and a short body ("[deleted]", "this").
+"""
+
+import re
+import sys
+import json
+import time
+import hashlib
+import argparse
+import threading
+
+from posts_db import DEFAULT_DB_PATH, connect, add_column_if_missing
+from search_index import ensure_index
+
+try:
+    from dedup import assign_clusters
+except ImportError:
+    # Near-duplicate clustering needs NumPy; ingest works without it
+    assign_clusters = None
+
+DEFAULT_BATCH_SIZE = 500
+
+UPSERT_SQL = """
+    INSERT INTO mental_health_posts
+    (id, title, content, author, subreddit, upvotes, comments, timestamp, url, sentiment, platform,
+     samh_username, parent_id, content_hash, sentiment_source)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, NULL, ?, ?, 'scraper')
+    ON CONFLICT(id) DO UPDATE SET
+        upvotes = excluded.upvotes,
+        comments = excluded.comments,
+        content = excluded.content,
+        content_hash = excluded.content_hash
+"""
+
+
+def content_hash(title, content):
+    """Stable hash of normalised text, used to spot reposted content"""
+    normalised = ' '.join(f'{title}\n{content}'.lower().split())
+    return hashlib.sha1(normalised.encode('utf-8')).hexdigest()
+
+
+def ensure_schema(conn):
+    add_column_if_missing(conn, 'mental_health_posts', 'parent_id', 'TEXT')
+    add_column_if_missing(conn, 'mental_health_posts', 'content_hash', 'TEXT')
+    add_column_if_missing(conn, 'mental_health_posts', 'sentiment_source', 'TEXT')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_posts_content_hash ON mental_health_posts (content_hash)')
+    conn.commit()
+    # Triggers on the posts table keep the search index current as rows are written
+    ensure_index(conn)
+
+
+_prepared = set()
+_prepared_lock = threading.Lock()
+
+
+def prepare_database(conn, db_path=None):
+    """Run ensure_schema once per process and database; later jobs skip the DDL"""
+    path = db_path or DEFAULT_DB_PATH
+    with _prepared_lock:
+        if path not in _prepared:
+            ensure_schema(conn)
+            _prepared.add(path)
+
+
+def _subreddit_from_url(url):
+    match = re.search(r'/r/(\w+)', url or '')
+    return match.group(1) if match else ''
+
+
+def comment_to_post_record(comment, post):
+    """Comments share the posts table; they carry the thread title and a parent_id"""
+    return {
+        'id': comment['id'],
+        'title': post['title'] if post else '',
+        'content': comment['content'],
+        'author': comment['author'],
+        'subreddit': post['subreddit'] if post else _subreddit_from_url(comment['url']),
+        'upvotes': comment['upvotes'],
+        'comments': 0,
+        'timestamp': comment['timestamp'],
+        'url': comment['url'] or (post['url'] if post else ''),
+        'sentiment': 'neutral',
+        'platform': 'REDDIT',
+        'parent_id': comment['parent_id'],
+    }
+
+
+class PostIngestor:
+    def __init__(self, db_path=None, batch_size=DEFAULT_BATCH_SIZE, on_commit=None, dedup=True):
+        self.conn = connect(db_path)
+        prepare_database(self.conn, db_path)
+        self.batch_size = batch_size
+        self.on_commit = on_commit
+        self.dedup = dedup and assign_clusters is not None
+        self._buffer = []
+        self.stats = {'received': 0, 'written': 0, 'near_duplicates': 0, 'batches': 0}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def add(self, record):
+        """Queue one post record (mental_health_posts layout, optional parent_id)"""
+        self._buffer.append(record)
+        self.stats['received'] += 1
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def add_thread(self, post, comments):
+        """Queue a thread's post (if given) and its comments"""
+        if post:
+            self.add(post)
+        for comment in comments:
+            self.add(comment_to_post_record(comment, post))
+
+    def flush(self):
+        """Write the buffered records in a single transaction"""
+        if not self._buffer:
+            return 0
+
+        batch, self._buffer = self._buffer, []
+        start = time.time()
+        rows = []
+        for r in batch:
+            digest = content_hash(r['title'], r['content'])
+            rows.append((
+                r['id'], r['title'], r['content'], r['author'], r['subreddit'], r.get('upvotes', 0),
+                r.get('comments', 0), r.get('timestamp', ''), r.get('url', ''), r.get('sentiment') or 'neutral',
+                r.get('platform', 'REDDIT'), r.get('parent_id'), digest,
+            ))
+
+        # IMMEDIATE takes the write lock up front; WAL keeps readers unblocked meanwhile
+        self.conn.execute('BEGIN IMMEDIATE')
+        try:
+            # rowcount counts rows written by the statement itself, not by index triggers
+            written = self.conn.executemany(UPSERT_SQL, rows).rowcount
+            self.conn.execute('COMMIT')
+        except Exception:
+            self.conn.execute('ROLLBACK')
+            raise
+
+        self.stats['written'] += written
+        self.stats['batches'] += 1
+
+        # Cluster the new rows so later stages can skip near-duplicate text
+        near_duplicates = assign_clusters(self.conn)['duplicates'] if self.dedup else 0
+        self.stats['near_duplicates'] += near_duplicates
+
+        if self.on_commit:
+            self.on_commit({'rows': len(rows), 'written': written, 'near_duplicates': near_duplicates,
+                            'seconds': round(time.time() - start, 4)})
+        return written
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+
+if __name__ == '__main__':
+    # Ingest NDJSON post records from stdin
+    parser = argparse.ArgumentParser(description='Bulk-ingest NDJSON post records from stdin')
+    parser.add_argument('--db', help='Path to scrapper_data.db')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    start = time.time()
+    with PostIngestor(args.db, args.batch_size) as ingestor:
+        for line in sys.stdin:
+            if line.strip():
+                ingestor.add(json.loads(line))
+    print(json.dumps({**ingestor.stats, 'seconds': round(time.time() - start, 3)}))
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Phrase matching for scraped threads.
+
+The phrase list is plain data: the defaults below, a file named by
+SCRAPER_PHRASES_FILE (one phrase per line), or a list passed per job.
+Phrases are compiled into one case-insensitive alternation so each text is
+scanned once however many phrases there are. The same matcher runs in
+Python over JSON-path records and in the page for Selenium scrapes, where a
+MutationObserver scans only nodes added since the last scan.
+"""
+
+import os
+import re
+
+PHRASES_FILE = os.environ.get('SCRAPER_PHRASES_FILE')
+
+DEFAULT_PHRASES = [
+    'I js dk how to pick myself up anymore.',
+    'I feel you because I have definitely felt this way in j1 too.',
+    'everyone in this sch is pissed at the lecture system.',
+    'if you want to drop out.',
+    'not much you can do to change your position this instant',
+    'my su*cide attempt?',
+]
+
+SNIPPET_LENGTH = 280
+
+
+def load_phrases(path=PHRASES_FILE):
+    """Phrases from a file (one per line, '#' comments allowed), else the defaults"""
+    if not path:
+        return list(DEFAULT_PHRASES)
+    with open(path, encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith('#')]
+
+
+def compile_phrases(phrases):
+    """One regex matching any phrase; longest first so no phrase is shadowed by its prefix"""
+    ordered = sorted({p for p in phrases if p}, key=len, reverse=True)
+    if not ordered:
+        return None
+    return re.compile('|'.join(re.escape(p) for p in ordered), re.IGNORECASE)
+
+
+def find_phrase_matches(thread, phrases):
+    """Structured matches for a parsed thread: one per (record, phrase)"""
+    pattern = compile_phrases(phrases)
+    if pattern is None:
+        return []
+
+    canonical = {p.lower(): p for p in phrases}
+    post = thread['post']
+    records = [('post', post, f"{post['title']}\n{post['content']}")]
+    records += [('comment', comment, comment['content']) for comment in thread['comments']]
+
+    matches = []
+    for kind, record, text in records:
+        found = []
+        for match in pattern.finditer(text):
+            phrase = canonical.get(match.group(0).lower(), match.group(0))
+            if phrase not in found:
+                found.append(phrase)
+        for phrase in found:
+            matches.append({
+                'phrase': phrase,
+                'kind': kind,
+                'id': record['id'],
+                'author': record['author'],
+                'snippet': ' '.join(text.split())[:SNIPPET_LENGTH],
+            })
+    return matches
+
+
+# Installs the in-page matcher: scans the current document once, then only
+# nodes added later. Matched paragraphs/comments and their authors are
+# highlighted and recorded in window.__phraseMatches for collection.
+INSTALL_MATCHER_SCRIPT = r"""
+const phrases = arguments[0];
+const snippetLength = arguments[1];
+if (window.__phraseObserver) {
+    window.__phraseObserver.disconnect();
+}
+window.__phraseMatches = [];
+if (!phrases.length) {
+    return 0;
+}
+
+const escapeRegExp = (s) => s.replace(/[.*+?^${}()|[\]\\]/g, '\\$&');
+const sorted = [...new Set(phrases)].sort((a, b) => b.length - a.length);
+const pattern = new RegExp(sorted.map(escapeRegExp).join('|'), 'gi');
+const canonical = new Map(phrases.map(p => [p.toLowerCase(), p]));
+const matchedPhrases = new WeakMap();  // container -> Set of phrases already recorded
+
+function isContainer(el) {
+    return el.tagName === 'P' ||
+        el.tagName === 'H1' ||
+        el.getAttribute('slot') === 'title' ||
+        el.classList.contains('Comment') ||
+        el.classList.contains('Post') ||
+        el.getAttribute('data-testid') === 'comment' ||
+        el.getAttribute('data-testid') === 'post';
+}
+
+// Go up the DOM tree to find the paragraph/comment/title container
+function findContainer(el) {
+    for (let attempts = 0; el && attempts < 10; attempts++) {
+        if (isContainer(el)) return el;
+        el = el.parentElement;
+    }
+    return null;
+}
+
+// Highlight the username of the post/comment containing an element
+function highlightUsername(el) {
+    const thing = el.closest('shreddit-comment, shreddit-post, [data-testid="comment"], [data-testid="post"], .Comment, .Post');
+    if (!thing) return null;
+    const usernameElement = thing.querySelector(
+        '[data-testid="post_author_link"], [data-testid="comment_author_link"], a[href*="/user/"], .author, .username'
+    );
+    if (usernameElement) {
+        usernameElement.style.backgroundColor = 'lightblue';
+        usernameElement.style.padding = '2px';
+        usernameElement.style.borderRadius = '3px';
+    }
+    return thing.getAttribute('author') || (usernameElement ? usernameElement.textContent.trim() : null);
+}
+
+function scanTextNode(node) {
+    const parent = node.parentElement;
+    if (!parent || parent.tagName === 'SCRIPT' || parent.tagName === 'STYLE') return;
+
+    const text = node.textContent;
+    pattern.lastIndex = 0;
+    let match;
+    while ((match = pattern.exec(text)) !== null) {
+        const phrase = canonical.get(match[0].toLowerCase()) || match[0];
+        const container = findContainer(parent);
+        if (!container) continue;
+
+        let seen = matchedPhrases.get(container);
+        if (!seen) {
+            seen = new Set();
+            matchedPhrases.set(container, seen);
+        }
+        if (seen.has(phrase)) continue;
+        seen.add(phrase);
+
+        container.style.backgroundColor = 'lightcoral';
+        container.style.padding = '8px';
+        container.style.borderRadius = '5px';
+        container.style.margin = '4px 0';
+
+        const thing = container.closest('shreddit-comment, shreddit-post');
+        window.__phraseMatches.push({
+            phrase: phrase,
+            kind: thing && thing.tagName === 'SHREDDIT-COMMENT' ? 'comment' : 'post',
+            id: thing ? (thing.getAttribute('thingid') || thing.id || null) : null,
+            author: highlightUsername(container),
+            snippet: container.textContent.trim().replace(/\s+/g, ' ').slice(0, snippetLength)
+        });
+    }
+}
+
+function scan(root) {
+    if (root.nodeType === Node.TEXT_NODE) {
+        scanTextNode(root);
+        return;
+    }
+    if (root.nodeType !== Node.ELEMENT_NODE) return;
+    const walker = document.createTreeWalker(root, NodeFilter.SHOW_TEXT);
+    let node;
+    while ((node = walker.nextNode())) {
+        scanTextNode(node);
+    }
+}
+
+scan(document.body);
+
+// From now on only newly loaded nodes are scanned
+window.__phraseObserver = new MutationObserver((mutations) => {
+    for (const mutation of mutations) {
+        if (mutation.type === 'characterData') {
+            scanTextNode(mutation.target);
+        }
+        for (const added of mutation.addedNodes) {
+            scan(added);
+        }
+    }
+});
+window.__phraseObserver.observe(document.body, {childList: true, subtree: true, characterData: true});
+return window.__phraseMatches.length;
+"""
+
+# Returns the matches recorded since the last call
+COLLECT_MATCHES_SCRIPT = """
+const matches = window.__phraseMatches || [];
+window.__phraseMatches = [];
+return matches;
+"""
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""Shared access to the scraped posts database (shared_data/scrapper_data.db)."""
+
+import os
+import sqlite3
+
+# Same database the Node backend serves from
+DEFAULT_DB_PATH = os.environ.get(
+    'SCRAPPER_DB_PATH',
+    os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..', 'shared_data', 'scrapper_data.db'))
+)
+
+POSTS_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS mental_health_posts (
+        id TEXT PRIMARY KEY,
+        title TEXT NOT NULL,
+        content TEXT NOT NULL,
+        author TEXT NOT NULL,
+        subreddit TEXT NOT NULL,
+        upvotes INTEGER NOT NULL,
+        comments INTEGER NOT NULL,
+        timestamp TEXT NOT NULL,
+        url TEXT NOT NULL,
+        sentiment TEXT NOT NULL,
+        platform TEXT NOT NULL,
+        samh_username TEXT,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+
+def connect(db_path=None):
+    """Open the posts database, creating the posts table if it is missing"""
+    path = db_path or DEFAULT_DB_PATH
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute('PRAGMA busy_timeout=30000')
+    # WAL lets the web app keep reading while scrapes write; NORMAL is durable enough under WAL
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.execute(POSTS_TABLE_SQL)
+    return conn
+
+
+def add_column_if_missing(conn, table, column, definition):
+    """Add a column to an existing table (no-op if it is already there)"""
+    columns = {row[1] for row in conn.execute(f'PRAGMA table_info({table})')}
+    if column not in columns:
+        conn.execute(f'ALTER TABLE {table} ADD COLUMN {column} {definition}')
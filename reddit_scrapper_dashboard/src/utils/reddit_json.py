@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+Fast-path Reddit fetcher that reads threads as structured data.
+
+Threads are fetched from Reddit's ``.json`` endpoints over a pooled,
+rate-limited HTTP client, or read from saved ``.json``/``.html`` fixtures
+when a fixture directory is given, and parsed into post and comment
+records. No browser is involved.
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import asyncio
+import threading
+from datetime import datetime, timezone
+from html.parser import HTMLParser
+from urllib.parse import urlparse
+
+import httpx
+
+USER_AGENT = os.environ.get('REDDIT_USER_AGENT', 'kai-distress-monitor/1.0')
+MIN_REQUEST_INTERVAL = float(os.environ.get('REDDIT_MIN_INTERVAL', '1.0'))  # seconds between requests
+MAX_CONNECTIONS = 4
+REQUEST_TIMEOUT = 15.0
+
+VOID_TAGS = {'area', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'source', 'track', 'wbr'}
+
+THREAD_ID_PATTERN = re.compile(r'/comments/([a-z0-9]+)', re.IGNORECASE)
+# Only Reddit thread pages are fetched or opened in a browser
+THREAD_URL_PATTERN = re.compile(r'https://(www|old)\.reddit\.com/r/\w+/comments/[a-z0-9]+(/[^\s\\]*)?', re.IGNORECASE)
+
+
+class FastPathUnavailable(Exception):
+    """The thread could not be read without a browser"""
+
+
+def thread_id_from_url(url):
+    match = THREAD_ID_PATTERN.search(url)
+    return match.group(1) if match else None
+
+
+def is_thread_url(url):
+    """True for https://(www|old).reddit.com/r/<sub>/comments/<id>/... URLs"""
+    return isinstance(url, str) and THREAD_URL_PATTERN.fullmatch(url) is not None
+
+
+def json_url(url):
+    """The .json listing URL for a thread or subreddit URL"""
+    parsed = urlparse(url)
+    path = parsed.path.rstrip('/') + '.json'
+    return f'https://www.reddit.com{path}?raw_json=1&limit=500'
+
+
+def _format_timestamp(created_utc):
+    if not created_utc:
+        return ''
+    return datetime.fromtimestamp(float(created_utc), tz=timezone.utc).isoformat()
+
+
+def make_post_record(data, url=None):
+    """A post in the mental_health_posts column layout"""
+    return {
+        'id': data.get('name') or f"t3_{data.get('id')}",
+        'title': data.get('title', ''),
+        'content': data.get('selftext', ''),
+        'author': data.get('author') or '[deleted]',
+        'subreddit': data.get('subreddit', ''),
+        'upvotes': int(data.get('score') or 0),
+        'comments': int(data.get('num_comments') or 0),
+        'timestamp': _format_timestamp(data.get('created_utc')),
+        'url': url or f"https://www.reddit.com{data.get('permalink', '')}",
+        'sentiment': 'neutral',
+        'platform': 'REDDIT',
+    }
+
+
+def make_comment_record(data, post_id):
+    return {
+        'id': data.get('name') or f"t1_{data.get('id')}",
+        'post_id': post_id,
+        'parent_id': data.get('parent_id'),
+        'author': data.get('author') or '[deleted]',
+        'content': data.get('body', ''),
+        'upvotes': int(data.get('score') or 0),
+        'depth': int(data.get('depth') or 0),
+        'timestamp': _format_timestamp(data.get('created_utc')),
+        'url': f"https://www.reddit.com{data['permalink']}" if data.get('permalink') else '',
+    }
+
+
+def parse_thread_json(payload, url=None):
+    """
+    Parse a thread's .json payload ([post listing, comment listing]).
+
+    Returns {'post', 'comments', 'more'}; 'more' lists comment IDs Reddit
+    collapsed behind "load more" stubs.
+    """
+    if not isinstance(payload, list) or len(payload) < 2:
+        raise ValueError('Not a thread listing')
+
+    post_data = payload[0]['data']['children'][0]['data']
+    post = make_post_record(post_data, url)
+    comments = []
+    more = []
+
+    # Iterative walk keeps deep threads off the Python call stack
+    stack = list(reversed(payload[1]['data']['children']))
+    while stack:
+        child = stack.pop()
+        kind = child.get('kind')
+        data = child.get('data', {})
+        if kind == 'more':
+            more.extend(data.get('children', []))
+        elif kind == 't1':
+            comments.append(make_comment_record(data, post['id']))
+            replies = data.get('replies')
+            if isinstance(replies, dict):
+                stack.extend(reversed(replies['data']['children']))
+
+    return {'post': post, 'comments': comments, 'more': more}
+
+
+def parse_listing_json(payload):
+    """Parse a subreddit listing's .json payload into post records"""
+    children = payload.get('data', {}).get('children', [])
+    return [make_post_record(child['data']) for child in children if child.get('kind') == 't3']
+
+
+class _ShredditParser(HTMLParser):
+    """Collects <shreddit-post>/<shreddit-comment> elements from saved new-Reddit HTML"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.post = None
+        self.comments = []
+        self._text_target = None
+        self._text_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == 'shreddit-post' and self.post is None:
+            self.post = attrs
+            self.post['_body'] = []
+        elif tag == 'shreddit-comment':
+            attrs['_body'] = []
+            self.comments.append(attrs)
+        elif self._text_target is not None:
+            # Tags such as <br> and <p> separate words in the rendered text
+            self._text_target['_body'].append(' ')
+            if tag not in VOID_TAGS:
+                self._text_depth += 1
+        elif tag == 'div' and attrs.get('slot') in ('comment', 'text-body'):
+            target = self.comments[-1] if attrs.get('slot') == 'comment' and self.comments else self.post
+            if target is not None:
+                self._text_target = target
+                self._text_depth = 1
+
+    def handle_endtag(self, tag):
+        if self._text_target is not None and tag not in VOID_TAGS:
+            self._text_depth -= 1
+            if self._text_depth == 0:
+                self._text_target = None
+
+    def handle_data(self, data):
+        if self._text_target is not None:
+            self._text_target['_body'].append(data)
+
+
+def parse_thread_html(html, url=None):
+    """Parse a saved new-Reddit thread page into the same shape as parse_thread_json"""
+    parser = _ShredditParser()
+    parser.feed(html)
+    if parser.post is None:
+        raise FastPathUnavailable('No post found in HTML')
+
+    attrs = parser.post
+    post = make_post_record({
+        'name': attrs.get('id'),
+        'title': attrs.get('post-title', ''),
+        'selftext': ' '.join(''.join(attrs['_body']).split()),
+        'author': attrs.get('author'),
+        'subreddit': (attrs.get('subreddit-prefixed-name') or '').removeprefix('r/'),
+        'score': attrs.get('score'),
+        'num_comments': attrs.get('comment-count'),
+        'permalink': attrs.get('permalink', ''),
+    }, url)
+    if attrs.get('created-timestamp'):
+        post['timestamp'] = attrs['created-timestamp']
+
+    comments = []
+    for attrs in parser.comments:
+        comment = make_comment_record({
+            'name': attrs.get('thingid'),
+            'parent_id': attrs.get('parentid') or post['id'],
+            'author': attrs.get('author'),
+            'body': ' '.join(''.join(attrs['_body']).split()),
+            'score': attrs.get('score'),
+            'depth': attrs.get('depth'),
+            'permalink': attrs.get('permalink', ''),
+        }, post['id'])
+        comment['timestamp'] = attrs.get('created', '')
+        comments.append(comment)
+
+    return {'post': post, 'comments': comments, 'more': []}
+
+
+class RateLimiter:
+    """Spaces requests at least ``interval`` seconds apart across all tasks"""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class RedditJsonClient:
+    """
+    Pooled, rate-limited reader for Reddit threads.
+
+    With ``fixture_dir`` set, threads are read from ``<thread id>.json`` or
+    ``<thread id>.html`` files in that directory and no network is used.
+    """
+
+    def __init__(self, fixture_dir=None, min_interval=MIN_REQUEST_INTERVAL, max_connections=MAX_CONNECTIONS):
+        self.fixture_dir = fixture_dir
+        self.limiter = RateLimiter(min_interval)
+        self._semaphore = asyncio.Semaphore(max_connections)
+        self._client = None
+        if fixture_dir is None:
+            self._client = httpx.AsyncClient(
+                headers={'User-Agent': USER_AGENT, 'Accept': 'application/json'},
+                limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+                timeout=REQUEST_TIMEOUT,
+                follow_redirects=True,
+                http2=False,
+            )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+
+    def _read_fixture(self, url):
+        thread_id = thread_id_from_url(url)
+        for ext in ('.json', '.html'):
+            path = os.path.join(self.fixture_dir, f'{thread_id}{ext}')
+            if os.path.exists(path):
+                with open(path, encoding='utf-8') as f:
+                    return ext, f.read()
+        raise FastPathUnavailable(f'No fixture for {url}')
+
+    async def get_json(self, url):
+        """GET a .json endpoint, honouring the rate limit and Retry-After"""
+        async with self._semaphore:
+            for attempt in range(3):
+                await self.limiter.wait()
+                response = await self._client.get(url)
+                if response.status_code == 429 and attempt < 2:
+                    await asyncio.sleep(float(response.headers.get('retry-after', 2 ** attempt)))
+                    continue
+                if response.status_code in (401, 403, 404):
+                    raise FastPathUnavailable(f'HTTP {response.status_code} for {url}')
+                response.raise_for_status()
+                if 'json' not in response.headers.get('content-type', ''):
+                    raise FastPathUnavailable(f'Non-JSON response for {url}')
+                return response.json()
+            raise FastPathUnavailable(f'Rate limited on {url}')
+
+    async def fetch_thread(self, url):
+        """Post and comment records for one thread"""
+        if self.fixture_dir is not None:
+            ext, body = self._read_fixture(url)
+            if ext == '.json':
+                return parse_thread_json(json.loads(body), url)
+            return parse_thread_html(body, url)
+        return parse_thread_json(await self.get_json(json_url(url)), url)
+
+    async def fetch_listing(self, subreddit_url):
+        """Latest post records of a subreddit (fixture file: r_<name>.json)"""
+        if self.fixture_dir is not None:
+            name = re.search(r'/r/(\w+)', subreddit_url).group(1)
+            path = os.path.join(self.fixture_dir, f'r_{name}.json')
+            if not os.path.exists(path):
+                raise FastPathUnavailable(f'No fixture for {subreddit_url}')
+            with open(path, encoding='utf-8') as f:
+                return parse_listing_json(json.load(f))
+        return parse_listing_json(await self.get_json(json_url(subreddit_url)))
+
+    async def fetch_threads(self, urls):
+        """Fetch many threads concurrently; failures come back as exceptions in place"""
+        return await asyncio.gather(*(self.fetch_thread(url) for url in urls), return_exceptions=True)
+
+
+# One event loop thread and one client per fixture_dir serve every blocking
+# caller in the process, so connections and the rate limit are shared
+_loop = None
+_loop_lock = threading.Lock()
+_clients = {}
+
+
+def _shared_loop():
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name='reddit-json', daemon=True).start()
+        return _loop
+
+
+async def _shared_client(fixture_dir):
+    # Only runs on the shared loop, so needs no lock
+    client = _clients.get(fixture_dir)
+    if client is None:
+        client = _clients[fixture_dir] = RedditJsonClient(fixture_dir)
+    return client
+
+
+def fetch_thread(url, fixture_dir=None):
+    """Blocking helper for callers outside an event loop; safe to call from many threads"""
+    async def run():
+        client = await _shared_client(fixture_dir)
+        return await client.fetch_thread(url)
+    return asyncio.run_coroutine_threadsafe(run(), _shared_loop()).result()
+
+
+def close_shared_clients():
+    """Close the clients used by fetch_thread, e.g. when a worker shuts down"""
+    global _loop
+    with _loop_lock:
+        loop, _loop = _loop, None
+    if loop is None:
+        return
+
+    async def close_all():
+        clients = list(_clients.values())
+        _clients.clear()
+        for client in clients:
+            await client.close()
+    asyncio.run_coroutine_threadsafe(close_all(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+
+
+if __name__ == '__main__':
+    target = sys.argv[1] if len(sys.argv) > 1 else 'https://www.reddit.com/r/SGExams/comments/1nc9gat/jc_burnout/'
+    fixtures = sys.argv[2] if len(sys.argv) > 2 else None
+    print(json.dumps(fetch_thread(target, fixtures)))
+    close_shared_clients()
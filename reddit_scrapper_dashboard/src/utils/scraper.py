@@ -1,299 +1,352 @@
 #!/usr/bin/env python3
 
 
+import os
 import sys
 import json
 import time
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from reddit_json import fetch_thread, close_shared_clients, parse_thread_html, is_thread_url, FastPathUnavailable
+from ingest import PostIngestor, comment_to_post_record
+from phrase_matcher import (
+    load_phrases, find_phrase_matches, INSTALL_MATCHER_SCRIPT, COLLECT_MATCHES_SCRIPT, SNIPPET_LENGTH
+)
+
+# 'auto' tries the HTTP/JSON fast path and falls back to Selenium; 'json' or 'selenium' force one
+SCRAPER_BACKEND = os.environ.get('SCRAPER_BACKEND', 'auto')
+FIXTURE_DIR = os.environ.get('REDDIT_FIXTURE_DIR')
+# Scraped posts/comments go straight into mental_health_posts unless this is '0'
+INGEST_ENABLED = os.environ.get('SCRAPER_INGEST', '1') != '0'
+# Jobs a --worker process runs at once (Selenium jobs are further bounded by the browser pool)
+WORKER_CONCURRENCY = int(os.environ.get('SCRAPER_WORKER_CONCURRENCY', '2'))
+
+# Selenium waits are condition-based; these only bound how long a condition may take
+CONTENT_TIMEOUT = float(os.environ.get('SCRAPER_CONTENT_TIMEOUT', '10'))  # seconds for the post to render
+SCROLL_SETTLE_TIMEOUT = float(os.environ.get('SCRAPER_SCROLL_TIMEOUT', '2'))  # seconds for more comments to load
+MAX_SCROLLS = int(os.environ.get('SCRAPER_MAX_SCROLLS', '30'))
+
+CONTENT_SELECTOR = 'shreddit-post, shreddit-comment, [data-testid="post-container"], [data-testid="comment"]'
+COMMENT_SELECTOR = 'shreddit-comment, [data-testid="comment"]'
+
+# Resolves once the document is complete and the post or a comment is in the DOM
+WAIT_FOR_CONTENT_SCRIPT = """
+const [selector, timeoutMs] = arguments;
+const done = arguments[arguments.length - 1];
+const ready = () => document.readyState === 'complete' && document.querySelector(selector) !== null;
+if (ready()) {
+    return done(true);
+}
+
+let finished = false;
+const observer = new MutationObserver(check);
+const timer = setTimeout(() => finish(false), timeoutMs);
+function check() {
+    if (ready()) finish(true);
+}
+function finish(found) {
+    if (finished) return;
+    finished = true;
+    observer.disconnect();
+    clearTimeout(timer);
+    document.removeEventListener('readystatechange', check);
+    done(found);
+}
+observer.observe(document.documentElement, {childList: true, subtree: true});
+document.addEventListener('readystatechange', check);
+"""
+
+# Scrolls one viewport; at the bottom of the page, waits until the page grows
+# (infinite scroll appended comments) or the timeout passes
+SCROLL_AND_WAIT_SCRIPT = """
+const [selector, timeoutMs] = arguments;
+const done = arguments[arguments.length - 1];
+const commentCount = () => document.querySelectorAll(selector).length;
+const startHeight = document.body.scrollHeight;
+const startComments = commentCount();
+const snapshot = (grew) => ({grew: grew, height: document.body.scrollHeight, comments: commentCount()});
+
+window.scrollBy(0, window.innerHeight);
+if (window.innerHeight + window.scrollY < document.body.scrollHeight - 2) {
+    // Still content below the viewport; no need to wait for more
+    return done(snapshot(true));
+}
+
+let finished = false;
+const observer = new MutationObserver(() => {
+    if (document.body.scrollHeight > startHeight || commentCount() > startComments) finish(true);
+});
+const timer = setTimeout(() => finish(false), timeoutMs);
+function finish(grew) {
+    if (finished) return;
+    finished = true;
+    observer.disconnect();
+    clearTimeout(timer);
+    done(snapshot(grew));
+}
+observer.observe(document.body, {childList: true, subtree: true});
+"""
+
+
+def make_emitter(on_event, **tags):
+    """
+    Event callback for one job.
+
+    Each event is a dict with its name, the job's tags and the seconds
+    elapsed since the job started; with no on_event it does nothing.
+    """
+    start = time.perf_counter()
+
+    def emit(event, **fields):
+        if on_event is not None:
+            on_event({'event': event, **tags, 'elapsed': round(time.perf_counter() - start, 4), **fields})
+    return emit
+
 
 class RedditScraper:
-    def __init__(self):
-        self.is_scraping = False
+    def __init__(self, backend=SCRAPER_BACKEND, fixture_dir=FIXTURE_DIR, ingest=INGEST_ENABLED, db_path=None,
+                 phrases=None):
+        self.backend = backend
+        self.phrases = phrases if phrases is not None else load_phrases()
+        self.fixture_dir = fixture_dir
+        self.ingest = ingest
+        self.db_path = db_path
+        self.active_jobs = 0
+        self._jobs_lock = threading.Lock()
         self.last_result = None
         self.target_url = 'https://www.reddit.com/r/SGExams/comments/1nc9gat/jc_burnout/'
 
-    def open_and_scrape(self):
-        """Scraping in Progress"""
-        if self.is_scraping:
-            raise Exception('Scraping is already in progress')
+    @property
+    def is_scraping(self):
+        return self.active_jobs > 0
 
-        self.is_scraping = True
+    def open_and_scrape(self, target_url=None, on_event=None, job_id=None, phrases=None):
+        """
+        Scraping in Progress (jobs may overlap, up to the browser pool size).
+
+        on_event, if given, receives the job's progress events: started,
+        page_loaded, post_extracted, phrase_matched, batch_committed and
+        finished. phrases overrides the scraper's phrase list for this job.
+        Raises ValueError if target_url is not a Reddit thread URL.
+        """
+        if target_url is not None and not is_thread_url(target_url):
+            raise ValueError(f'Not a Reddit thread URL: {target_url!r}')
+        
+        with self._jobs_lock:
+            self.active_jobs += 1
+        
+        target_url = target_url or self.target_url
+        emit = make_emitter(on_event, job=job_id, url=target_url)
+        phrases = self.phrases if phrases is None else phrases
+        result = None
         
         try:
-            print('Starting Selenium Reddit scraper...')
+            print('Starting Selenium Reddit scraper...', file=sys.stderr)
+            emit('started', backend=self.backend)
+            
+            # Structured data first; only render the page when that is not possible
+            if self.backend in ('auto', 'json'):
+                result = self._run_json_fetch(target_url, emit, phrases)
             
-            # Call the Selenium script
-            result = self._run_selenium_script()
+            if result is None:
+                # Call the Selenium script
+                result = self._run_selenium_script(target_url, emit, phrases)
             
             self.last_result = result
             
             if result['success']:
-                print('Scraping completed successfully:', result)
+                print('Scraping completed successfully:', result, file=sys.stderr)
             else:
-                print('Scraping failed')
+                print('Scraping failed', file=sys.stderr)
             
             return result
             
         except Exception as error:
             # Log detailed error but return generic message to frontend
-            print('Error during scraping:', error)
+            print('Error during scraping:', error, file=sys.stderr)
             error_result = {
                 'success': False,
                 'error': ''
             }
             
             self.last_result = error_result
+            result = error_result
             return error_result
             
         finally:
-            self.is_scraping = False
+            with self._jobs_lock:
+                self.active_jobs -= 1
+            emit('finished', result=result)
 
-    def _run_selenium_script(self):
-        """Run the actual Selenium scraping"""
-        import os
-        import tempfile
+    def _run_json_fetch(self, target_url, emit, phrases):
+        """Read the thread over HTTP/JSON; None means fall back to Selenium"""
+        start = time.perf_counter()
+        try:
+            thread = fetch_thread(target_url, self.fixture_dir)
+        except (FastPathUnavailable, ValueError, KeyError) as e:
+            print(f'Fast path unavailable ({e})', file=sys.stderr)
+            if self.backend == 'json':
+                return {'success': False, 'error': ''}
+            return None
+        except Exception as e:
+            print(f"Scraping error: {str(e)}", file=sys.stderr)
+            if self.backend == 'json':
+                return {'success': False, 'error': ''}
+            return None
         
-        # Create a persistent user data directory
-        user_data_dir = os.path.join(tempfile.gettempdir(), 'reddit_scraper_chrome')
+        fetched = time.perf_counter()
+        emit('page_loaded', backend='json', seconds=round(fetched - start, 4))
+        matches = find_phrase_matches(thread, phrases)
+        for match in matches:
+            emit('phrase_matched', **match)
+        matched = time.perf_counter()
+        ingested = self._ingest_thread(thread, emit)
+        finished = time.perf_counter()
         
-        # Setup Chrome options
-        chrome_options = Options()
-        chrome_options.add_argument(f"--user-data-dir={user_data_dir}")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--window-size=1920,1080")
-        chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-        chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        chrome_options.add_experimental_option('useAutomationExtension', False)
+        return {
+            'success': True,
+            'backend': 'json',
+            'title': thread['post']['title'],
+            'scroll_count': 0,
+            'page_height': None,
+            'url': target_url,
+            'comment_count': len(thread['comments']),
+            'ingested': ingested,
+            'matches': matches,
+            'timings': {
+                'fetch': round(fetched - start, 4),
+                'match': round(matched - fetched, 4),
+                'ingest': round(finished - matched, 4),
+                'total': round(finished - start, 4)
+            }
+        }
+
+    def _ingest_thread(self, thread, emit):
+        """Report each extracted record and write them to the database in batches"""
+        ingestor = None
+        if self.ingest:
+            ingestor = PostIngestor(self.db_path, on_commit=lambda info: emit('batch_committed', **info))
+        
+        try:
+            post = thread['post']
+            emit('post_extracted', kind='post', id=post['id'], title=post['title'])
+            if ingestor:
+                ingestor.add(post)
+            for comment in thread['comments']:
+                emit('post_extracted', kind='comment', id=comment['id'], parent_id=comment['parent_id'])
+                if ingestor:
+                    ingestor.add(comment_to_post_record(comment, post))
+        finally:
+            if ingestor:
+                ingestor.close()
         
-        driver = None
+        return ingestor.stats if ingestor else None
+
+    def _run_selenium_script(self, target_url, emit, phrases):
+        """Run the actual Selenium scraping on a warm driver from the pool"""
+        # Imported here so the HTTP/JSON path works without Selenium installed
+        from browser_pool import get_browser_pool
         
         try:
-            # Setup ChromeDriver
-            service = Service(ChromeDriverManager().install())
-            driver = webdriver.Chrome(service=service, options=chrome_options)
-            
-            # Hide automation indicators
-            driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-            
-            # Open Reddit page
-            print(f'{self.target_url}...')
-            driver.get(self.target_url)
-            
-            # Wait for page to load
-            time.sleep(3)
-            
-            # Scroll once per second for 10 seconds and highlight specific content
-            scroll_count = 0
-            
-            for i in range(10):                
-              
-            # Check for specific phrases and highlight them
-                self._highlight_content(driver)
-                print(f'Scrolling {i+1}/10...')
-                driver.execute_script("window.scrollBy(0, window.innerHeight / 2);")
-                scroll_count += 1
-                
-                time.sleep(0.1)  # Wait 0.5 seconds between scrolls (2x speed)
-            
-            # Get page info
-            title = driver.title
-            page_height = driver.execute_script("return document.body.scrollHeight")
-            
-            result = {
-                'success': True,
-                'title': title,
-                'scroll_count': scroll_count,
-                'page_height': page_height,
-                'url': self.target_url
-            }
-            
-            return result
+            with get_browser_pool().driver() as driver:
+                return self._scrape_page(driver, target_url, emit, phrases)
             
         except Exception as e:
             # Log error but don't expose detailed error messages to frontend
-            print(f"Scraping error: {str(e)}")
+            print(f"Scraping error: {str(e)}", file=sys.stderr)
             return {
                 'success': False,
                 'error': ''
             }
+
+    def _scrape_page(self, driver, target_url, emit, phrases):
+        """Load the thread, scroll through it and collect page info"""
+        timings = {}
+        started = time.perf_counter()
+        phase_start = started
+        
+        def end_phase(name):
+            nonlocal phase_start
+            now = time.perf_counter()
+            timings[name] = round(timings.get(name, 0.0) + now - phase_start, 4)
+            phase_start = now
+        
+        # Async scripts below bound themselves; this only guards against a hung page
+        driver.set_script_timeout(max(CONTENT_TIMEOUT, SCROLL_SETTLE_TIMEOUT) + 5)
+        
+        # Open Reddit page
+        print(f'{target_url}...', file=sys.stderr)
+        driver.get(target_url)
+        end_phase('load')
+        
+        # Wait for the post/comments to render rather than a fixed delay
+        if not driver.execute_async_script(WAIT_FOR_CONTENT_SCRIPT, CONTENT_SELECTOR, CONTENT_TIMEOUT * 1000):
+            print('Post content did not appear before the timeout', file=sys.stderr)
+        end_phase('content')
+        emit('page_loaded', backend='selenium', seconds=round(time.perf_counter() - started, 4))
+        
+        # Scan the page once for the phrases; the matcher then watches newly loaded nodes only
+        driver.execute_script(INSTALL_MATCHER_SCRIPT, phrases, SNIPPET_LENGTH)
+        matches = self._collect_matches(driver, emit)
+        end_phase('match')
+        
+        # Scroll until the page stops growing
+        scroll_count = 0
+        
+        for i in range(MAX_SCROLLS):
+            state = driver.execute_async_script(SCROLL_AND_WAIT_SCRIPT, COMMENT_SELECTOR, SCROLL_SETTLE_TIMEOUT * 1000)
+            scroll_count += 1
+            end_phase('scroll')
+            print(f"Scrolling {i+1} (height {state['height']}, {state['comments']} comments)...", file=sys.stderr)
             
-        finally:
-            if driver:
-                driver.quit()
+            matches.extend(self._collect_matches(driver, emit))
+            end_phase('match')
+            if not state['grew']:
+                break
+        
+        # Get page info
+        title = driver.title
+        page_height = driver.execute_script("return document.body.scrollHeight")
+        
+        # Extract the rendered post and comments from the page
+        try:
+            thread = parse_thread_html(driver.page_source, target_url)
+        except FastPathUnavailable as e:
+            print(f'No post found on page ({e})', file=sys.stderr)
+            thread = None
+        end_phase('extract')
+        
+        ingested = self._ingest_thread(thread, emit) if thread else None
+        end_phase('ingest')
+        timings['total'] = round(time.perf_counter() - started, 4)
+        
+        result = {
+            'success': True,
+            'backend': 'selenium',
+            'title': title,
+            'scroll_count': scroll_count,
+            'page_height': page_height,
+            'url': target_url,
+            'comment_count': len(thread['comments']) if thread else 0,
+            'ingested': ingested,
+            'matches': matches,
+            'timings': timings
+        }
+        
+        return result
 
-    def _highlight_content(self, driver):
-        """Highlight specific phrases and associated usernames"""
+    def _collect_matches(self, driver, emit):
+        """Fetch the phrase matches the in-page matcher recorded since the last call"""
         try:
-            # JavaScript to find and highlight specific phrases and their usernames
-            highlight_script = """
-            // Target phrases to highlight
-            const targetPhrases = [
-                'I js dk how to pick myself up anymore.',
-                'I feel you because I have definitely felt this way in j1 too.',
-                'everyone in this sch is pissed at the lecture system.',
-                'if you want to drop out.',
-                'not much you can do to change your position this instant'
-            ];
-            
-            // Function to highlight entire paragraph containing target phrases
-            function highlightParagraphsWithText(text, color) {
-                const walker = document.createTreeWalker(
-                    document.body,
-                    NodeFilter.SHOW_TEXT,
-                    null,
-                    false
-                );
-                
-                const textNodes = [];
-                let node;
-                
-                while (node = walker.nextNode()) {
-                    if (node.textContent.toLowerCase().includes(text.toLowerCase())) {
-                        textNodes.push(node);
-                    }
-                }
-                
-                textNodes.forEach(textNode => {
-                    const parent = textNode.parentNode;
-                    if (parent.tagName !== 'SCRIPT' && parent.tagName !== 'STYLE') {
-                        // Find the paragraph container
-                        let paragraphContainer = parent;
-                        let attempts = 0;
-                        
-                        // Go up the DOM tree to find the paragraph/comment container
-                        while (paragraphContainer && attempts < 10) {
-                            // Check if this is a paragraph, comment, or post container
-                            if (paragraphContainer.tagName === 'P' || 
-                                paragraphContainer.classList.contains('Comment') ||
-                                paragraphContainer.classList.contains('Post') ||
-                                paragraphContainer.getAttribute('data-testid') === 'comment' ||
-                                paragraphContainer.getAttribute('data-testid') === 'post' ||
-                                paragraphContainer.querySelector('[data-testid="comment"]') ||
-                                paragraphContainer.querySelector('[data-testid="post"]')) {
-                                
-                                // Highlight the entire paragraph/container
-                                paragraphContainer.style.backgroundColor = color;
-                                paragraphContainer.style.padding = '8px';
-                                paragraphContainer.style.borderRadius = '5px';
-                                paragraphContainer.style.margin = '4px 0';
-                                console.log('Highlighted paragraph containing:', text.substring(0, 50) + '...');
-                                
-                                // Find and highlight associated username
-                                highlightAssociatedUsername(paragraphContainer);
-                                break;
-                            }
-                            paragraphContainer = paragraphContainer.parentElement;
-                            attempts++;
-                        }
-                    }
-                });
-            }
-            
-            // Function to highlight username associated with a text element
-            function highlightAssociatedUsername(element) {
-                // Look for username in the same post/comment container
-                let container = element;
-                let attempts = 0;
-                
-                // Go up the DOM tree to find the post/comment container
-                while (container && attempts < 10) {
-                    // Check if this is a post or comment container
-                    if (container.classList.contains('Post') || 
-                        container.classList.contains('Comment') ||
-                        container.getAttribute('data-testid') === 'post' ||
-                        container.getAttribute('data-testid') === 'comment' ||
-                        container.querySelector('[data-testid="post_author_link"]') ||
-                        container.querySelector('[data-testid="comment_author_link"]')) {
-                        
-                        // Find username elements within this container
-                        const usernameSelectors = [
-                            '[data-testid="post_author_link"]',
-                            '[data-testid="comment_author_link"]',
-                            'a[href*="/user/"]',
-                            '.author',
-                            '.username'
-                        ];
-                        
-                        usernameSelectors.forEach(selector => {
-                            const usernameElement = container.querySelector(selector);
-                            if (usernameElement) {
-                                usernameElement.style.backgroundColor = 'lightblue';
-                                usernameElement.style.padding = '2px';
-                                usernameElement.style.borderRadius = '3px';
-                                console.log('Highlighted username:', usernameElement.textContent);
-                            }
-                        });
-                        break;
-                    }
-                    container = container.parentElement;
-                    attempts++;
-                }
-            }
-            
-            // Special handling for post title using aria-label
-            function highlightPostTitle() {
-                // Use the specific aria-label selector
-                const titleElement = document.querySelector('[aria-label*="Post Title: will i be allowed to sit for my a levels if i survived my su*cide attempt?"]');
-                
-                if (titleElement) {
-                    // Highlight the entire post title
-                    titleElement.style.backgroundColor = 'lightcoral';
-                    titleElement.style.padding = '4px';
-                    titleElement.style.borderRadius = '3px';
-                    console.log('Highlighted entire post title using aria-label');
-                    
-                    // Also highlight the post author
-                    highlightAssociatedUsername(titleElement);
-                } else {
-                    console.log('Post title with aria-label not found, trying fallback selectors');
-                    
-                    // Fallback to other selectors
-                    const fallbackSelectors = [
-                        '[data-testid="post-content"] h1',
-                        '.Post h1',
-                        'h1[data-testid="post-title"]',
-                        'h1'
-                    ];
-                    
-                    fallbackSelectors.forEach(selector => {
-                        const titleElement = document.querySelector(selector);
-                        if (titleElement && titleElement.textContent.toLowerCase().includes('my su*cide attempt?')) {
-                            // Highlight the entire post title
-                            titleElement.style.backgroundColor = 'lightcoral';
-                            titleElement.style.padding = '4px';
-                            titleElement.style.borderRadius = '3px';
-                            console.log('Highlighted entire post title using fallback');
-                            
-                            highlightAssociatedUsername(titleElement);
-                        }
-                    });
-                }
-            }
-            
-            // Highlight post title first
-            highlightPostTitle();
-            
-            // Highlight entire paragraphs containing target phrases in light red
-            targetPhrases.forEach(phrase => {
-                highlightParagraphsWithText(phrase, 'lightcoral');
-            });
-            
-            console.log('Content highlighted successfully');
-            """
-            
-            # Execute the highlighting script
-            driver.execute_script(highlight_script)
-            print('Highlighted content on page')
-            
-            # Pause for 1 second after highlighting
-            time.sleep(2)
-            
+            matches = driver.execute_script(COLLECT_MATCHES_SCRIPT) or []
         except Exception as e:
-            print(f'Error highlighting content: {e}')
+            print(f'Error collecting phrase matches: {e}', file=sys.stderr)
+            return []
+        for match in matches:
+            emit('phrase_matched', **match)
+        return matches
 
     def get_last_result(self):
         """Get the last scraping result"""
@@ -303,13 +356,14 @@ class RedditScraper:
         """Get scraping status"""
         return {
             'is_scraping': self.is_scraping,
+            'active_jobs': self.active_jobs,
             'has_result': self.last_result is not None
         }
 
     def clear_result(self):
         """Clear last result"""
         self.last_result = None
-        print('Scraping result cleared')
+        print('Scraping result cleared', file=sys.stderr)
 
 # Create global instance
 reddit_scraper = RedditScraper()
@@ -318,7 +372,73 @@ def scrape_reddit():
     """Main scraping function for external calls"""
     return reddit_scraper.open_and_scrape()
 
+class EventWriter:
+    """Writes events to a stream as NDJSON, one flushed line each, safe across threads"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self._lock = threading.Lock()
+
+    def __call__(self, event):
+        line = json.dumps(event, default=str)
+        with self._lock:
+            self.stream.write(line + '\n')
+            self.stream.flush()
+
+def warm_browser_pool():
+    """Start the pool's drivers; a failure only means jobs start them on demand"""
+    try:
+        from browser_pool import get_browser_pool
+        get_browser_pool().warm()
+    except Exception as e:
+        print(f'Could not warm browser pool: {e}', file=sys.stderr)
+
+def run_worker(scraper, write_event, concurrency=WORKER_CONCURRENCY):
+    """
+    Serve scrape jobs read from stdin until EOF.
+
+    Each input line is a JSON job, {"id": ..., "url": ..., "phrases": [...]}
+    with phrases optional; its events are written tagged with the job id,
+    ending with its 'finished' event.
+    """
+    write_event({'event': 'ready', 'pid': os.getpid(), 'concurrency': concurrency})
+    
+    if scraper.backend != 'json':
+        # Start the browsers in the background so Selenium jobs find them warm
+        threading.Thread(target=warm_browser_pool, name='warm-browsers', daemon=True).start()
+    
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for line in sys.stdin:
+            if not line.strip():
+                continue
+            try:
+                job = json.loads(line)
+            except ValueError as e:
+                # Includes json.JSONDecodeError
+                write_event({'event': 'error', 'job': None, 'error': f'Invalid job: {e}'})
+                continue
+            if not isinstance(job, dict):
+                write_event({'event': 'error', 'job': None, 'error': f'Invalid job: expected a JSON object, got {type(job).__name__}'})
+                continue
+            if job.get('url') is not None and not is_thread_url(job['url']):
+                write_event({'event': 'error', 'job': job.get('id'), 'error': 'Invalid job: url must be a Reddit thread URL'})
+                continue
+            executor.submit(scraper.open_and_scrape, job.get('url'), write_event, job.get('id'), job.get('phrases'))
+    
+    close_shared_clients()
+
 if __name__ == "__main__":
-    # Run scraping and return JSON result
-    result = scrape_reddit()
-    print(json.dumps(result))
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Scrape Reddit threads, streaming NDJSON progress events on stdout')
+    parser.add_argument('url', nargs='?', help='Thread to scrape (defaults to the built-in target)')
+    parser.add_argument('--worker', action='store_true', help='Stay running and serve jobs read from stdin')
+    args = parser.parse_args()
+    if args.url is not None and not is_thread_url(args.url):
+        parser.error(f'not a Reddit thread URL: {args.url}')
+    
+    # stdout carries only events; logs go to stderr
+    write_event = EventWriter(sys.stdout)
+    if args.worker:
+        run_worker(reddit_scraper, write_event)
+    else:
+        # The last line is the 'finished' event carrying the result
+        reddit_scraper.open_and_scrape(args.url, write_event)
\ No newline at end of file
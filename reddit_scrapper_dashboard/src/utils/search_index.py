@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Full-text search over mental_health_posts.
+
+posts_fts is an FTS5 external-content index on title/content/author that
+reads from mental_health_posts by rowid. Triggers keep it in step with
+every insert, delete and text update, whichever process writes the row,
+so ingest needs no extra work. Queries are ranked with BM25 (title hits
+weigh most) and support quoted phrases, prefix terms (``drop*``),
+sentiment filters and pagination.
+
+VACUUM can renumber the rowids of a table with a TEXT primary key; run
+with --rebuild afterwards.
+"""
+
+import re
+import json
+import time
+import argparse
+
+from posts_db import connect
+
+# Relative BM25 weights of the title, content and author columns
+COLUMN_WEIGHTS = (10.0, 1.0, 0.5)
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 200
+
+SCHEMA = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5(
+        title, content, author,
+        content='mental_health_posts', content_rowid='rowid',
+        tokenize='porter unicode61'
+    );
+    CREATE TRIGGER IF NOT EXISTS posts_fts_insert AFTER INSERT ON mental_health_posts BEGIN
+        INSERT INTO posts_fts (rowid, title, content, author) VALUES (new.rowid, new.title, new.content, new.author);
+    END;
+    CREATE TRIGGER IF NOT EXISTS posts_fts_delete AFTER DELETE ON mental_health_posts BEGIN
+        INSERT INTO posts_fts (posts_fts, rowid, title, content, author)
+        VALUES ('delete', old.rowid, old.title, old.content, old.author);
+    END;
+    CREATE TRIGGER IF NOT EXISTS posts_fts_update AFTER UPDATE OF title, content, author ON mental_health_posts BEGIN
+        INSERT INTO posts_fts (posts_fts, rowid, title, content, author)
+        VALUES ('delete', old.rowid, old.title, old.content, old.author);
+        INSERT INTO posts_fts (rowid, title, content, author) VALUES (new.rowid, new.title, new.content, new.author);
+    END;
+"""
+
+QUERY_TOKEN_PATTERN = re.compile(r'"([^"]*)"|(\S+)')
+TERM_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+
+def ensure_index(conn):
+    """Create the index and its triggers, filling it from existing posts the first time"""
+    exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'posts_fts'").fetchone()
+    conn.executescript(SCHEMA)
+    if not exists:
+        rebuild_index(conn)
+
+
+def rebuild_index(conn):
+    """Re-read every post into the index"""
+    with conn:
+        conn.execute("INSERT INTO posts_fts (posts_fts) VALUES ('rebuild')")
+
+
+def _quote(text):
+    return '"' + text.replace('"', '""') + '"'
+
+
+def build_match_query(query):
+    """
+    Translate a user query into FTS5 syntax.
+
+    Quoted text is a phrase, a trailing * makes a prefix term, OR between
+    terms is kept and everything else is ANDed. Other FTS5 operators are
+    treated as plain text, so arbitrary input cannot produce a syntax error.
+    """
+    parts = []
+    for phrase, word in QUERY_TOKEN_PATTERN.findall(query):
+        if phrase:
+            words = TERM_PATTERN.findall(phrase)
+            if words:
+                parts.append(_quote(' '.join(words)))
+        elif word == 'OR':
+            if parts and parts[-1] != 'OR':
+                parts.append('OR')
+        else:
+            terms = TERM_PATTERN.findall(word)
+            if not terms:
+                continue
+            prefix = '*' if word.endswith('*') else ''
+            # 'don't' or 'j1-student' stay one adjacent-token phrase
+            parts.append(_quote(' '.join(terms)) + prefix)
+
+    while parts and parts[-1] == 'OR':
+        parts.pop()
+    if parts and parts[0] == 'OR':
+        parts.pop(0)
+    return ' '.join(parts)
+
+
+def search_posts(conn, query, sentiment=None, page=1, page_size=DEFAULT_PAGE_SIZE):
+    """
+    Ranked search over the posts.
+
+    sentiment may be one label or a list of labels. Returns the total number
+    of matches and one page of results, best first, each with its BM25
+    score (lower is better) and a highlighted snippet of the content.
+    """
+    match = build_match_query(query)
+    page = max(1, int(page))
+    page_size = max(1, min(int(page_size), MAX_PAGE_SIZE))
+    if not match:
+        return {'query': query, 'total': 0, 'page': page, 'page_size': page_size, 'results': []}
+
+    where = 'posts_fts MATCH ?'
+    params = [match]
+    if sentiment:
+        sentiments = [sentiment] if isinstance(sentiment, str) else list(sentiment)
+        where += f" AND p.sentiment IN ({', '.join('?' * len(sentiments))})"
+        params += sentiments
+
+    total = conn.execute(f"""
+        SELECT COUNT(*) FROM posts_fts JOIN mental_health_posts p ON p.rowid = posts_fts.rowid
+        WHERE {where}
+    """, params).fetchone()[0]
+
+    weights = ', '.join(str(w) for w in COLUMN_WEIGHTS)
+    rows = conn.execute(f"""
+        SELECT p.id, p.title, p.author, p.subreddit, p.sentiment, p.url, p.timestamp,
+               bm25(posts_fts, {weights}) AS score,
+               snippet(posts_fts, 1, '[', ']', '...', 16) AS snippet
+        FROM posts_fts JOIN mental_health_posts p ON p.rowid = posts_fts.rowid
+        WHERE {where}
+        ORDER BY score
+        LIMIT ? OFFSET ?
+    """, params + [page_size, (page - 1) * page_size]).fetchall()
+
+    columns = ('id', 'title', 'author', 'subreddit', 'sentiment', 'url', 'timestamp', 'score', 'snippet')
+    results = [dict(zip(columns, row)) for row in rows]
+    for result in results:
+        result['score'] = round(result['score'], 4)
+
+    return {'query': query, 'total': total, 'page': page, 'page_size': page_size, 'results': results}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Search scraped posts')
+    parser.add_argument('query', nargs='?', default='', help='Search terms, "quoted phrases" and prefix* terms')
+    parser.add_argument('--db', help='Path to scrapper_data.db')
+    parser.add_argument('--sentiment', action='append', help='Only posts with this sentiment (repeatable)')
+    parser.add_argument('--page', type=int, default=1)
+    parser.add_argument('--page-size', type=int, default=DEFAULT_PAGE_SIZE)
+    parser.add_argument('--rebuild', action='store_true', help='Rebuild the index from mental_health_posts first')
+    args = parser.parse_args()
+
+    conn = connect(args.db)
+    ensure_index(conn)
+    if args.rebuild:
+        rebuild_index(conn)
+
+    start = time.time()
+    result = search_posts(conn, args.query, args.sentiment, args.page, args.page_size)
+    result['milliseconds'] = round((time.time() - start) * 1000, 3)
+    conn.close()
+    print(json.dumps(result))
@@ -0,0 +1,6 @@
+"""Make the scraper utils importable the way scraper.py imports them (flat, by module name)."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,67 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import reddit_json
+from reddit_json import fetch_thread, is_thread_url
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+JSON_THREAD = 'https://www.reddit.com/r/SGExams/comments/1nc9gat/jc_burnout/'
+HTML_THREAD = 'https://www.reddit.com/r/SGExams/comments/1nd2xyz/cant_sleep_before_exams/'
+
+
+def test_parse_thread_json_walks_nested_replies():
+    thread = fetch_thread(JSON_THREAD, FIXTURE_DIR)
+
+    post = thread['post']
+    assert post['id'] == 't3_1nc9gat'
+    assert post['title'] == 'JC burnout'
+    assert post['subreddit'] == 'SGExams'
+    assert (post['upvotes'], post['comments']) == (42, 3)
+    assert post['url'] == JSON_THREAD
+    assert post['timestamp'].startswith('2025-09-08T16:00:00')
+
+    comments = thread['comments']
+    assert [c['id'] for c in comments] == ['t1_ndc1a01', 't1_ndc1b02', 't1_ndc1c03']
+    assert comments[1]['parent_id'] == 't1_ndc1a01'
+    assert comments[1]['depth'] == 1
+    assert comments[2]['author'] == '[deleted]'
+    assert all(c['post_id'] == 't3_1nc9gat' for c in comments)
+    assert thread['more'] == ['ndc1d04', 'ndc1e05']
+
+
+def test_parse_thread_html_matches_json_shape():
+    thread = fetch_thread(HTML_THREAD, FIXTURE_DIR)
+
+    post = thread['post']
+    assert post['id'] == 't3_1nd2xyz'
+    assert post['title'] == "Can't sleep before exams"
+    assert post['content'] == 'Every night I lie awake going over notes. Any tips?'
+    assert post['subreddit'] == 'SGExams'
+    assert (post['upvotes'], post['comments']) == (17, 2)
+
+    comments = thread['comments']
+    assert [c['content'] for c in comments] == ['No screens an hour before bed.', 'Will try & report back.']
+    assert comments[0]['parent_id'] == 't3_1nd2xyz'
+    assert comments[1]['parent_id'] == 't1_nde0a01'
+    assert thread['more'] == []
+
+
+def test_fetch_thread_shares_one_client_across_threads():
+    reddit_json.close_shared_clients()
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        threads = list(executor.map(lambda url: fetch_thread(url, FIXTURE_DIR), [JSON_THREAD, HTML_THREAD] * 4))
+
+    assert len(threads) == 8
+    assert list(reddit_json._clients) == [FIXTURE_DIR]
+    reddit_json.close_shared_clients()
+    assert reddit_json._clients == {}
+
+
+def test_is_thread_url():
+    assert is_thread_url(JSON_THREAD)
+    assert is_thread_url('https://old.reddit.com/r/SGExams/comments/1nc9gat')
+    assert not is_thread_url('http://www.reddit.com/r/SGExams/comments/1nc9gat/')
+    assert not is_thread_url('https://www.reddit.com.example.com/r/SGExams/comments/1nc9gat/')
+    assert not is_thread_url('https://www.reddit.com/r/SGExams/')
+    assert not is_thread_url('http://169.254.169.254/latest/meta-data/')
+    assert not is_thread_url(None)
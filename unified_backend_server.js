@@ -4,6 +4,7 @@ import cors from 'cors';
 import path from 'path';
 import { fileURLToPath } from 'url';
 import { spawn } from 'child_process';
+import readline from 'readline';
 import fs from 'fs';
 
 const { Database } = pkg.verbose();
@@ -43,6 +44,10 @@ if (!fs.existsSync(sharedDataDir)) {
 // Initialize database with comprehensive schema
 const initializeDatabase = () => {
   db.serialize(() => {
+    // WAL so the Python scraper can write while the API keeps reading
+    db.run('PRAGMA journal_mode=WAL');
+    db.run('PRAGMA busy_timeout=30000');
+
     // Drop existing chat tables to recreate with new schema
     db.run(`DROP TABLE IF EXISTS chat_messages`);
     db.run(`DROP TABLE IF EXISTS user_conversation_views`);
@@ -422,14 +427,19 @@ const initializeDatabase = () => {
           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         `);
 
-        posts.forEach(post => {
-          insertStmt.run([
-            post.id, post.title, post.content, post.author, post.subreddit,
-            post.upvotes, post.comments, post.timestamp, post.url, post.sentiment, post.platform, post.samh_username
-          ]);
-        });
+        // One transaction for the whole seed set instead of one per row
+        db.serialize(() => {
+          db.run('BEGIN TRANSACTION');
+          posts.forEach(post => {
+            insertStmt.run([
+              post.id, post.title, post.content, post.author, post.subreddit,
+              post.upvotes, post.comments, post.timestamp, post.url, post.sentiment, post.platform, post.samh_username
+            ]);
+          });
 
-        insertStmt.finalize();
+          insertStmt.finalize();
+          db.run('COMMIT');
+        });
     });
   });
 
@@ -799,59 +809,117 @@ const initializeDatabase = () => {
 };
 
 // Python Scraper Function
-function runPythonScraper() {
+// Long-lived `scraper.py --worker` process. Jobs are written to its stdin as JSON
+// lines and its NDJSON progress events are routed back to the job that produced them.
+let scraperWorker = null;
+const scraperJobs = new Map();
+let nextScrapeJobId = 1;
+
+// The scraper only fetches Reddit threads; any other URL is refused before it reaches the worker
+const REDDIT_THREAD_URL = /^https:\/\/(www|old)\.reddit\.com\/r\/\w+\/comments\/[a-z0-9]+(\/[^\s\\]*)?$/i;
+
+// Scrape requests may omit the URL (the scraper's default thread); otherwise it must be a Reddit thread
+function isValidScrapeUrl(url) {
+  return url === undefined || (typeof url === 'string' && REDDIT_THREAD_URL.test(url));
+}
+
+function failScraperJobs(error) {
+  for (const job of scraperJobs.values()) {
+    job.reject(error);
+  }
+  scraperJobs.clear();
+}
+
+function handleScraperEvent(event) {
+  if (event.event === 'ready') {
+    console.log(`🐍 Python scraper worker ready (pid ${event.pid})`);
+    return;
+  }
+
+  const job = scraperJobs.get(event.job);
+  if (!job) {
+    console.error('Scraper event for unknown job:', event);
+    return;
+  }
+
+  if (job.onEvent) {
+    job.onEvent(event);
+  }
+
+  if (event.event === 'finished') {
+    scraperJobs.delete(event.job);
+    console.log(`✅ Scrape job ${event.job} finished in ${event.elapsed}s`);
+    job.resolve(event.result);
+  } else if (event.event === 'error') {
+    scraperJobs.delete(event.job);
+    job.reject(new Error(event.error));
+  }
+}
+
+function getScraperWorker() {
+  if (scraperWorker) {
+    return scraperWorker;
+  }
+
+  const pythonScript = path.join(__dirname, 'reddit_scrapper_dashboard', 'src', 'utils', 'scraper.py');
+
+  console.log('🐍 Starting Python Reddit scraper worker...');
+  console.log('📍 Python script path:', pythonScript);
+
+  const python = spawn('python3', [pythonScript, '--worker'], {
+    stdio: ['pipe', 'pipe', 'pipe']
+  });
+
+  // Events are handled line by line as they arrive instead of buffering all output
+  readline.createInterface({ input: python.stdout }).on('line', (line) => {
+    if (!line.trim()) {
+      return;
+    }
+    try {
+      handleScraperEvent(JSON.parse(line));
+    } catch (e) {
+      console.error('❌ Failed to parse scraper event:', line);
+    }
+  });
+
+  python.stderr.on('data', (data) => {
+    console.error('Python error:', data.toString().trim());
+  });
+
+  python.on('close', (code) => {
+    console.log(`🐍 Python scraper worker exited with code: ${code}`);
+    scraperWorker = null;
+    failScraperJobs(new Error(`Python scraper exited with code ${code}`));
+  });
+
+  python.on('error', (error) => {
+    console.error('❌ Failed to start Python scraper:', error);
+    scraperWorker = null;
+    failScraperJobs(error);
+  });
+
+  scraperWorker = python;
+  return python;
+}
+
+process.on('exit', () => {
+  if (scraperWorker) {
+    scraperWorker.kill();
+  }
+});
+
+// Run one scrape job on the shared worker; onEvent receives its progress events
+function runPythonScraper(url, onEvent) {
   return new Promise((resolve, reject) => {
-    const pythonScript = path.join(__dirname, 'reddit_scrapper_dashboard', 'src', 'utils', 'scraper.py');
-    
-    console.log('🐍 Starting Python Reddit scraper...');
-    console.log('📍 Python script path:', pythonScript);
-    
-    const python = spawn('python3', [pythonScript], {
-      stdio: ['pipe', 'pipe', 'pipe']
-    });
-    
-    let output = '';
-    let errorOutput = '';
-    
-    python.stdout.on('data', (data) => {
-      const chunk = data.toString();
-      output += chunk;
-      console.log('Python output:', chunk.trim());
-    });
-    
-    python.stderr.on('data', (data) => {
-      const chunk = data.toString();
-      errorOutput += chunk;
-      console.error('Python error:', chunk.trim());
-    });
-    
-    python.on('close', (code) => {
-      console.log(`🐍 Python script finished with code: ${code}`);
-      
-      if (code === 0) {
-        try {
-          // Parse the JSON output from the last line
-          const lines = output.trim().split('\n');
-          const jsonLine = lines[lines.length - 1];
-          const result = JSON.parse(jsonLine);
-          console.log('✅ Scraping result:', result);
-          resolve(result);
-        } catch (e) {
-          console.error('❌ Failed to parse Python output:', e);
-          console.error('Raw output:', output);
-          reject(new Error('Failed to parse scraping result'));
-        }
-      } else {
-        console.error('❌ Python script failed');
-        console.error('Error output:', errorOutput);
-        reject(new Error(`Python script failed with code ${code}: ${errorOutput}`));
-      }
-    });
-    
-    python.on('error', (error) => {
-      console.error('❌ Failed to start Python script:', error);
+    const id = String(nextScrapeJobId++);
+    scraperJobs.set(id, { resolve, reject, onEvent });
+
+    try {
+      getScraperWorker().stdin.write(JSON.stringify({ id, url }) + '\n');
+    } catch (error) {
+      scraperJobs.delete(id);
       reject(error);
-    });
+    }
   });
 }
 
@@ -938,8 +1006,12 @@ app.post('/api/scrape', async (req, res) => {
   try {
     console.log('🔍 Received scraping request...');
     
+    if (!isValidScrapeUrl(req.body?.url)) {
+      return res.status(400).json({ success: false, error: 'url must be a Reddit thread (https://www.reddit.com/r/<subreddit>/comments/<id>/...)' });
+    }
+    
     // Run the Python scraper
-    const result = await runPythonScraper();
+    const result = await runPythonScraper(req.body?.url);
     
     // If scraping was successful, you could save the result to database here
     if (result.success) {
@@ -966,6 +1038,26 @@ app.post('/api/scrape', async (req, res) => {
   }
 });
 
+// Reddit Scraper endpoint with live progress: streams the scraper's events as NDJSON
+app.post('/api/scrape/stream', async (req, res) => {
+  if (!isValidScrapeUrl(req.body?.url)) {
+    return res.status(400).json({ error: 'url must be a Reddit thread (https://www.reddit.com/r/<subreddit>/comments/<id>/...)' });
+  }
+
+  res.setHeader('Content-Type', 'application/x-ndjson');
+  res.setHeader('Cache-Control', 'no-cache');
+
+  try {
+    await runPythonScraper(req.body?.url, (event) => {
+      res.write(JSON.stringify(event) + '\n');
+    });
+  } catch (error) {
+    console.error('❌ Scraping error:', error);
+    res.write(JSON.stringify({ event: 'error', error: error.message }) + '\n');
+  }
+  res.end();
+});
+
 // Mood entries endpoints (for SAMH platform)
 app.get('/api/mood-entries', (req, res) => {
   db.all("SELECT * FROM mood_entries ORDER BY timestamp DESC", (err, rows) => {
@@ -1386,7 +1478,13 @@ Respond with ONLY 3 lines, each containing one suggestion. No explanations, no r
     prompt: prompt,
     max_tokens: 100,
     temperature: parseFloat(randomTemp),
-    top_p: parseFloat(randomTopP)
+    top_p: parseFloat(randomTopP),
+    // Suggestions mode: the chatbot parses lines as they stream and stops after 3 distinct ones
+    format: 'json',
+    count: 3,
+    // Lets the chatbot reuse suggestions when the latest turns barely changed
+    conversation_id: conversationId,
+    context: messages.slice(-3).map(msg => ({ role: msg.role, content: msg.content }))
   };
   
   fetch(`${chatbotUrl}/generate`, {
@@ -1399,12 +1497,11 @@ Respond with ONLY 3 lines, each containing one suggestion. No explanations, no r
     if (!response.ok) {
       throw new Error(`Chatbot service error: ${response.status}`);
     }
-    return response.text();
+    return response.json();
   }).then(output => {
-    console.log(`📤 [NVIDIA NIMs] Chatbot response: ${output.trim()}`);
+    console.log(`📤 [NVIDIA NIMs] Chatbot response: ${JSON.stringify(output.suggestions)}`);
     
-    // Parse the response and extract suggestions
-    const suggestions = output.trim().split('\n').filter(line => line.trim()).slice(0, 3);
+    const suggestions = Array.isArray(output.suggestions) ? output.suggestions.slice(0, 3) : [];
     
     if (suggestions.length === 0) {
       throw new Error('No suggestions generated');